@@ -41,6 +41,14 @@ android {
             applicationIdSuffix = ".debug"
             versionNameSuffix = "-DEBUG"
             isDebuggable = true
+            // Screenshot harness: -Ptiderunner.fixtureBaseUrl=http://10.0.2.2:8765/ routes all
+            // API calls to the local fixture server. Empty = live APIs.
+            val fixtureBaseUrl = project.findProperty("tiderunner.fixtureBaseUrl")?.toString() ?: ""
+            buildConfigField("String", "FIXTURE_BASE_URL", "\"$fixtureBaseUrl\"")
+            // -Ptiderunner.tileBaseUrl=http://10.0.2.2:8766/ loads map tiles from the local
+            // tile server (screenshots/helpers/tile_archive.py). Empty = public tile servers.
+            val tileBaseUrl = project.findProperty("tiderunner.tileBaseUrl")?.toString() ?: ""
+            buildConfigField("String", "TILE_BASE_URL", "\"$tileBaseUrl\"")
         }
         release {
             isMinifyEnabled = true
@@ -51,6 +59,8 @@ android {
             )
             isDebuggable = false
             isCrunchPngs = true
+            buildConfigField("String", "FIXTURE_BASE_URL", "\"\"")
+            buildConfigField("String", "TILE_BASE_URL", "\"\"")
             val releaseSigningConfig = signingConfigs.findByName("release")
             if (releaseSigningConfig?.storeFile != null) {
                 signingConfig = releaseSigningConfig
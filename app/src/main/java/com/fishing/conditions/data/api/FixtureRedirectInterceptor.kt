@@ -0,0 +1,32 @@
+package com.fishing.conditions.data.api
+
+import okhttp3.HttpUrl
+import okhttp3.HttpUrl.Companion.toHttpUrl
+import okhttp3.Interceptor
+import okhttp3.Response
+
+/**
+ * Reroutes every API call to a local fixture server (debug builds only).
+ *
+ * `https://api.open-meteo.com/v1/forecast?latitude=35.02` becomes
+ * `<fixtureBaseUrl>/api.open-meteo.com/v1/forecast?latitude=35.02`, so a single
+ * server can answer for every base URL in [com.fishing.conditions.util.Constants].
+ * Installed by NetworkModule only when `BuildConfig.FIXTURE_BASE_URL` is set.
+ */
+class FixtureRedirectInterceptor(fixtureBaseUrl: String) : Interceptor {
+
+    private val fixtureBase: HttpUrl = fixtureBaseUrl.toHttpUrl()
+
+    override fun intercept(chain: Interceptor.Chain): Response {
+        val request = chain.request()
+        return chain.proceed(request.newBuilder().url(redirect(request.url)).build())
+    }
+
+    fun redirect(original: HttpUrl): HttpUrl {
+        val builder = fixtureBase.newBuilder().addPathSegment(original.host)
+        original.encodedPathSegments
+            .filter { it.isNotEmpty() }
+            .forEach { builder.addEncodedPathSegment(it) }
+        return builder.encodedQuery(original.encodedQuery).build()
+    }
+}
@@ -5,6 +5,7 @@ import com.fishing.conditions.data.cache.MarineDataDao
 import com.fishing.conditions.data.cache.entities.MarineDataEntity
 import com.fishing.conditions.data.models.MarineConditions
 import com.fishing.conditions.data.models.Species
+import com.fishing.conditions.util.ReadinessLog
 import kotlinx.coroutines.async
 import kotlinx.coroutines.coroutineScope
 import java.text.SimpleDateFormat
@@ -36,12 +37,17 @@ class MarineDataRepository @Inject constructor(
             // Try cache first
             val cached = marineDataDao.getMarineData(latitude, longitude)
             if (cached != null && !isCacheExpired(cached.timestamp)) {
+                ReadinessLog.mark("cache-hit", latitude, longitude)
                 return entityToMarineConditions(cached)
             }
 
             // Fetch fresh data from APIs
-            fetchMarineConditionsFromAPIs(latitude, longitude)
+            ReadinessLog.mark("fetch-start", latitude, longitude)
+            fetchMarineConditionsFromAPIs(latitude, longitude).also {
+                ReadinessLog.mark("fetch-done", latitude, longitude, if (it != null) "ok" else "empty")
+            }
         } catch (_: Exception) {
+            ReadinessLog.mark("fetch-failed", latitude, longitude)
             // Fall back to cached data even if expired
             marineDataDao.getMarineData(latitude, longitude)?.let {
                 entityToMarineConditions(it)
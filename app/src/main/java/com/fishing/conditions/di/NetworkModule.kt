@@ -2,6 +2,7 @@ package com.fishing.conditions.di
 
 import android.content.Context
 import androidx.room.Room
+import com.fishing.conditions.BuildConfig
 import com.fishing.conditions.data.api.*
 import com.fishing.conditions.data.cache.MarineDataDao
 import com.fishing.conditions.data.cache.MarineDataDatabase
@@ -54,7 +55,12 @@ object NetworkModule {
             level = HttpLoggingInterceptor.Level.BODY
         }
 
-        return OkHttpClient.Builder()
+        val builder = OkHttpClient.Builder()
+        // Debug builds made for the screenshot harness answer from local fixtures
+        if (BuildConfig.FIXTURE_BASE_URL.isNotEmpty()) {
+            builder.addInterceptor(FixtureRedirectInterceptor(BuildConfig.FIXTURE_BASE_URL))
+        }
+        return builder
             .addInterceptor(loggingInterceptor)
             .connectTimeout(30, TimeUnit.SECONDS)
             .readTimeout(30, TimeUnit.SECONDS)
@@ -8,6 +8,7 @@ import androidx.compose.material.icons.Icons
 import androidx.compose.material.icons.filled.LocationOn
 import androidx.compose.material.icons.filled.MoreVert
 import androidx.compose.runtime.*
+import androidx.compose.runtime.saveable.rememberSaveable
 import androidx.compose.ui.Alignment
 import androidx.compose.ui.Modifier
 import androidx.compose.ui.platform.LocalContext
@@ -17,6 +18,7 @@ import androidx.compose.ui.viewinterop.AndroidView
 import androidx.hilt.navigation.compose.hiltViewModel
 import androidx.lifecycle.Lifecycle
 import androidx.lifecycle.LifecycleEventObserver
+import com.fishing.conditions.BuildConfig
 import com.fishing.conditions.ui.components.ConditionsPanel
 import com.fishing.conditions.ui.components.SpeciesFilter
 import com.fishing.conditions.ui.viewmodel.MapViewModel
@@ -26,8 +28,12 @@ import com.google.accompanist.permissions.rememberMultiplePermissionsState
 import com.google.android.gms.location.LocationServices
 import com.google.android.gms.location.Priority
 import org.osmdroid.config.Configuration
+import org.osmdroid.events.MapListener
+import org.osmdroid.events.ScrollEvent
+import org.osmdroid.events.ZoomEvent
 import org.osmdroid.tileprovider.tilesource.TileSourceFactory
 import org.osmdroid.tileprovider.tilesource.OnlineTileSourceBase
+import org.osmdroid.tileprovider.tilesource.XYTileSource
 import org.osmdroid.util.GeoPoint
 import org.osmdroid.util.MapTileIndex
 import org.osmdroid.views.MapView
@@ -49,7 +55,7 @@ fun MapScreen(
     val fishingSuitability by viewModel.fishingSuitability.collectAsState()
     val uiState by viewModel.uiState.collectAsState()
 
-    var selectedDate by remember { mutableStateOf(java.util.Date()) }
+    var selectedDate by rememberSaveable { mutableStateOf(java.util.Date()) }
     var showPrivacyPolicy by remember { mutableStateOf(false) }
     var showMenu by remember { mutableStateOf(false) }
 
@@ -83,7 +89,16 @@ fun MapScreen(
         MapView(context).apply {
             // ── Layer 1: OSM standard tiles as the base map ──────────────────
             // This renders the actual geography: ocean (blue), land, coastlines
-            setTileSource(TileSourceFactory.MAPNIK)
+            // Debug builds for the screenshot harness can load tiles from a local
+            // server; the source keeps the name "Mapnik" so seeded cache entries match
+            val tileBaseUrl = BuildConfig.TILE_BASE_URL
+            if (tileBaseUrl.isEmpty()) {
+                setTileSource(TileSourceFactory.MAPNIK)
+            } else {
+                setTileSource(
+                    XYTileSource("Mapnik", 0, 19, 256, ".png", arrayOf("${tileBaseUrl}osm/"))
+                )
+            }
 
             // ── Layer 2: OpenSeaMap seamark overlay ───────────────────────────
             // These are nautical marks, depth contours, wrecks, buoys etc.
@@ -91,13 +106,16 @@ fun MapScreen(
             val seaMarkTileSource = object : OnlineTileSourceBase(
                 "OpenSeaMap",
                 0, 18, 256, ".png",
-                arrayOf("https://tiles.openseamap.org/seamark/")
+                arrayOf(
+                    if (tileBaseUrl.isEmpty()) "https://tiles.openseamap.org/seamark/"
+                    else "${tileBaseUrl}seamark/"
+                )
             ) {
                 override fun getTileURLString(pMapTileIndex: Long): String {
                     val zoom = MapTileIndex.getZoom(pMapTileIndex)
                     val x = MapTileIndex.getX(pMapTileIndex)
                     val y = MapTileIndex.getY(pMapTileIndex)
-                    return "https://tiles.openseamap.org/seamark/$zoom/$x/$y.png"
+                    return "$baseUrl$zoom/$x/$y.png"
                 }
             }
             val seaMarkOverlay = TilesOverlay(
@@ -107,9 +125,25 @@ fun MapScreen(
             overlays.add(seaMarkOverlay)
 
             setMultiTouchControls(true)
-            controller.setZoom(8.0)
-            // Default to US East Coast — good starting point for Atlantic fishing
-            controller.setCenter(GeoPoint(35.0, -75.0))
+            val camera = viewModel.mapCamera.value
+            if (camera != null) {
+                // Activity recreated (locale or theme change) — back to where the map was
+                controller.setZoom(camera.zoom)
+                controller.setCenter(GeoPoint(camera.latitude, camera.longitude))
+            } else {
+                controller.setZoom(8.0)
+                // Default to US East Coast — good starting point for Atlantic fishing
+                controller.setCenter(GeoPoint(35.0, -75.0))
+            }
+            addMapListener(object : MapListener {
+                override fun onScroll(event: ScrollEvent?): Boolean = saveCamera()
+                override fun onZoom(event: ZoomEvent?): Boolean = saveCamera()
+
+                private fun saveCamera(): Boolean {
+                    viewModel.saveMapCamera(mapCenter.latitude, mapCenter.longitude, zoomLevelDouble)
+                    return false
+                }
+            })
 
             // ── Tap handler: select location ──────────────────────────────────
             overlays.add(object : org.osmdroid.views.overlay.Overlay() {
@@ -123,20 +157,10 @@ fun MapScreen(
                             e?.y?.toInt() ?: 0
                         ) as? GeoPoint
                         geoPoint?.let {
-                            viewModel.updateLocation(it.latitude, it.longitude)
-
-                            // Remove previous selection marker
-                            selectedMarker?.let { marker -> map.overlays.remove(marker) }
-
-                            // Add pin at tapped location
-                            val marker = Marker(map).apply {
-                                position = it
-                                setAnchor(Marker.ANCHOR_CENTER, Marker.ANCHOR_BOTTOM)
-                                title = "%.4f°, %.4f°".format(it.latitude, it.longitude)
-                            }
-                            map.overlays.add(marker)
-                            selectedMarker = marker
-                            map.invalidate()
+                            val title = "%.4f°, %.4f°".format(it.latitude, it.longitude)
+                            viewModel.updateLocation(it.latitude, it.longitude, title)
+                            // Pin at tapped location, replacing the previous selection
+                            selectedMarker = dropPin(map, it, title, selectedMarker)
                         }
                     }
                     return true
@@ -148,6 +172,11 @@ fun MapScreen(
             locationOverlay.enableMyLocation()
             overlays.add(locationOverlay)
             myLocationOverlay = locationOverlay
+
+            // Selected location's pin, on top as when it was first dropped
+            viewModel.currentLocation.value?.let { (lat, lon) ->
+                selectedMarker = dropPin(this, GeoPoint(lat, lon), viewModel.pinTitle.value, null)
+            }
         }
     }
 
@@ -227,20 +256,9 @@ fun MapScreen(
                     getCurrentLocation(context) { lat, lon ->
                         mapView.controller.animateTo(GeoPoint(lat, lon))
                         mapView.controller.setZoom(13.0)
-                        viewModel.updateLocation(lat, lon)
-
-                        // Remove previous marker
-                        selectedMarker?.let { marker -> mapView.overlays.remove(marker) }
-
-                        // Add pin at current location
-                        val marker = Marker(mapView).apply {
-                            position = GeoPoint(lat, lon)
-                            setAnchor(Marker.ANCHOR_CENTER, Marker.ANCHOR_BOTTOM)
-                            title = "My Location"
-                        }
-                        mapView.overlays.add(marker)
-                        selectedMarker = marker
-                        mapView.invalidate()
+                        viewModel.updateLocation(lat, lon, "My Location")
+                        // Pin at current location, replacing the previous one
+                        selectedMarker = dropPin(mapView, GeoPoint(lat, lon), "My Location", selectedMarker)
                     }
                 } else {
                     locationPermissionsState.launchMultiplePermissionRequest()
@@ -302,6 +320,18 @@ fun MapScreen(
     }
 }
 
+private fun dropPin(map: MapView, point: GeoPoint, pinTitle: String?, previous: Marker?): Marker {
+    previous?.let { map.overlays.remove(it) }
+    val marker = Marker(map).apply {
+        position = point
+        setAnchor(Marker.ANCHOR_CENTER, Marker.ANCHOR_BOTTOM)
+        title = pinTitle
+    }
+    map.overlays.add(marker)
+    map.invalidate()
+    return marker
+}
+
 @SuppressLint("MissingPermission")
 private fun getCurrentLocation(
     context: android.content.Context,
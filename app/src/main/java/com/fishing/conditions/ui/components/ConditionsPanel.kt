@@ -18,11 +18,14 @@ import androidx.compose.material.icons.filled.KeyboardArrowUp
 import androidx.compose.material.TextButton
 import androidx.compose.material.AlertDialog
 import androidx.compose.runtime.*
+import androidx.compose.runtime.saveable.rememberSaveable
 import androidx.compose.ui.Alignment
 import androidx.compose.ui.Modifier
 import androidx.compose.ui.graphics.Color
+import androidx.compose.ui.res.stringResource
 import androidx.compose.ui.text.font.FontWeight
 import androidx.compose.ui.unit.dp
+import com.fishing.conditions.R
 import com.fishing.conditions.data.models.FishingSuitability
 import com.fishing.conditions.data.models.MarineConditions
 import java.text.SimpleDateFormat
@@ -37,7 +40,8 @@ fun ConditionsPanel(
     selectedDate: Date = Date(),
     onDateSelected: (Date) -> Unit = {}
 ) {
-    var isExpanded by remember { mutableStateOf(true) }
+    // Saveable, so a configuration change (e.g. an app locale switch) keeps the panel as it was
+    var isExpanded by rememberSaveable { mutableStateOf(true) }
     val scrollState = rememberScrollState()
 
     Card(
@@ -60,7 +64,7 @@ fun ConditionsPanel(
             ) {
                 Column {
                     Text(
-                        text = "Fishing Conditions",
+                        text = stringResource(R.string.fishing_conditions),
                         style = MaterialTheme.typography.h6,
                         fontWeight = FontWeight.Bold
                     )
@@ -120,7 +124,7 @@ fun ConditionsPanel(
 
             // Marine Conditions Header
             Text(
-                text = "Marine Conditions",
+                text = stringResource(R.string.marine_conditions),
                 style = MaterialTheme.typography.h6,
                 fontWeight = FontWeight.Bold
             )
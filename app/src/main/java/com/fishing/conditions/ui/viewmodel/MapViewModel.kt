@@ -7,6 +7,7 @@ import com.fishing.conditions.data.models.MarineConditions
 import com.fishing.conditions.data.models.Species
 import com.fishing.conditions.data.repository.MarineDataRepository
 import com.fishing.conditions.domain.FishingSuitabilityCalculator
+import com.fishing.conditions.util.ReadinessLog
 import dagger.hilt.android.lifecycle.HiltViewModel
 import kotlinx.coroutines.flow.MutableStateFlow
 import kotlinx.coroutines.flow.StateFlow
@@ -35,6 +36,15 @@ class MapViewModel @Inject constructor(
     private val _fishingSuitability = MutableStateFlow<FishingSuitability?>(null)
     val fishingSuitability: StateFlow<FishingSuitability?> = _fishingSuitability.asStateFlow()
 
+    // Map camera and pin title. The MapView is rebuilt whenever the activity
+    // is recreated (app locale or night mode change); it restores both from
+    // here, so the map comes back where it was instead of at the launch view.
+    private val _mapCamera = MutableStateFlow<MapCamera?>(null)
+    val mapCamera: StateFlow<MapCamera?> = _mapCamera.asStateFlow()
+
+    private val _pinTitle = MutableStateFlow<String?>(null)
+    val pinTitle: StateFlow<String?> = _pinTitle.asStateFlow()
+
     fun selectSpecies(species: Species) {
         _selectedSpecies.value = species
         // Recalculate suitability if we have conditions
@@ -42,20 +52,27 @@ class MapViewModel @Inject constructor(
             _currentLocation.value?.let { (lat, lon) ->
                 viewModelScope.launch {
                     _fishingSuitability.value = suitabilityCalculator.calculate(conditions, species, lat, lon)
+                    ReadinessLog.mark("suitability-updated", lat, lon, species.name)
                 }
             }
         }
     }
 
-    fun updateLocation(latitude: Double, longitude: Double) {
+    fun updateLocation(latitude: Double, longitude: Double, pinTitle: String? = null) {
         _currentLocation.value = Pair(latitude, longitude)
+        _pinTitle.value = pinTitle
         loadMarineConditions(latitude, longitude)
     }
 
+    fun saveMapCamera(latitude: Double, longitude: Double, zoom: Double) {
+        _mapCamera.value = MapCamera(latitude, longitude, zoom)
+    }
+
     private fun loadMarineConditions(latitude: Double, longitude: Double) {
         viewModelScope.launch {
             try {
                 _uiState.value = MapUiState.Loading
+                ReadinessLog.mark("loading", latitude, longitude)
                 val conditions = repository.getMarineConditions(latitude, longitude)
 
                 if (conditions != null) {
@@ -67,11 +84,14 @@ class MapViewModel @Inject constructor(
                     }
 
                     _uiState.value = MapUiState.Success(conditions)
+                    ReadinessLog.mark("conditions-loaded", latitude, longitude, _selectedSpecies.value?.name)
                 } else {
                     _uiState.value = MapUiState.Error("No data available for this location")
+                    ReadinessLog.mark("conditions-error", latitude, longitude)
                 }
             } catch (e: Exception) {
                 _uiState.value = MapUiState.Error(e.message ?: "Failed to load marine conditions")
+                ReadinessLog.mark("conditions-error", latitude, longitude)
             }
         }
     }
@@ -82,6 +102,8 @@ class MapViewModel @Inject constructor(
         }
     }
 
+    data class MapCamera(val latitude: Double, val longitude: Double, val zoom: Double)
+
     sealed class MapUiState {
         object Loading : MapUiState()
         data class Success(val conditions: MarineConditions) : MapUiState()
@@ -0,0 +1,25 @@
+package com.fishing.conditions.util
+
+import android.util.Log
+import com.fishing.conditions.BuildConfig
+
+/**
+ * Structured readiness markers for the screenshot harness (debug builds only).
+ *
+ * Each marker is one logcat line under [TAG]: an event name followed by
+ * comma-separated fields, e.g. `conditions-loaded 35.0196,-76.6989,Redfish (Red Drum)`.
+ * screenshots/helpers/logcat.py streams these so the harness can wait on
+ * the data arriving instead of polling the UI. Release builds log nothing.
+ */
+object ReadinessLog {
+
+    const val TAG = "TideRunnerReady"
+
+    fun mark(event: String, vararg fields: Any?) {
+        if (!BuildConfig.DEBUG) return
+        Log.i(TAG, format(event, *fields))
+    }
+
+    fun format(event: String, vararg fields: Any?): String =
+        if (fields.isEmpty()) event else "$event ${fields.joinToString(",") { it?.toString() ?: "" }}"
+}
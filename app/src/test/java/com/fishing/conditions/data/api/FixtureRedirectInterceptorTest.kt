@@ -0,0 +1,42 @@
+package com.fishing.conditions.data.api
+
+import com.google.common.truth.Truth.assertThat
+import okhttp3.HttpUrl.Companion.toHttpUrl
+import org.junit.jupiter.api.DisplayName
+import org.junit.jupiter.api.Test
+
+@DisplayName("FixtureRedirectInterceptor Tests")
+class FixtureRedirectInterceptorTest {
+
+    private val interceptor = FixtureRedirectInterceptor("http://10.0.2.2:8765/")
+
+    @Test
+    fun `prefixes the original host and keeps the path and query`() {
+        val redirected = interceptor.redirect(
+            "https://api.open-meteo.com/v1/forecast?latitude=35.0196&longitude=-76.6989".toHttpUrl()
+        )
+
+        assertThat(redirected.toString()).isEqualTo(
+            "http://10.0.2.2:8765/api.open-meteo.com/v1/forecast?latitude=35.0196&longitude=-76.6989"
+        )
+    }
+
+    @Test
+    fun `keeps versioned base paths such as Stormglass v2`() {
+        val redirected = interceptor.redirect(
+            "https://api.stormglass.io/v2/weather/point?lat=33.49".toHttpUrl()
+        )
+
+        assertThat(redirected.encodedPath).isEqualTo("/api.stormglass.io/v2/weather/point")
+        assertThat(redirected.queryParameter("lat")).isEqualTo("33.49")
+    }
+
+    @Test
+    fun `works with a fixture base url that has no trailing slash`() {
+        val redirected = FixtureRedirectInterceptor("http://127.0.0.1:8765")
+            .redirect("https://api.solunar.org/solunar/35.0,-76.7,20260101,-5".toHttpUrl())
+
+        assertThat(redirected.encodedPath).isEqualTo("/api.solunar.org/solunar/35.0,-76.7,20260101,-5")
+        assertThat(redirected.query).isNull()
+    }
+}
@@ -101,6 +101,21 @@ class MapViewModelTest {
             assertThat(awaitItem()).isInstanceOf(MapViewModel.MapUiState.Error::class.java)
         }
     }
+
+    @Test
+    @DisplayName("Should keep the map camera and pin title for a rebuilt map")
+    fun mapCameraAndPinTitleAreKept() = runTest {
+        coEvery { repository.getMarineConditions(any(), any()) } returns createTestMarineConditions()
+
+        viewModel.saveMapCamera(34.1, -77.9, 13.0)
+        viewModel.updateLocation(34.1, -77.9, "My Location")
+        testDispatcher.scheduler.advanceUntilIdle()
+
+        assertThat(viewModel.mapCamera.value).isEqualTo(MapViewModel.MapCamera(34.1, -77.9, 13.0))
+        assertThat(viewModel.pinTitle.value).isEqualTo("My Location")
+        assertThat(viewModel.currentLocation.value).isEqualTo(Pair(34.1, -77.9))
+    }
+
     private fun createTestMarineConditions(waterTemp: Double = 21.0): MarineConditions {
         return MarineConditions(
             latitude = 37.7749, longitude = -122.4194,
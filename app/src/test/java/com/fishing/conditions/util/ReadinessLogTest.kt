@@ -0,0 +1,26 @@
+package com.fishing.conditions.util
+
+import com.google.common.truth.Truth.assertThat
+import org.junit.jupiter.api.DisplayName
+import org.junit.jupiter.api.Test
+
+@DisplayName("ReadinessLog Tests")
+class ReadinessLogTest {
+
+    @Test
+    fun `formats the event followed by comma separated fields`() {
+        assertThat(ReadinessLog.format("conditions-loaded", 35.0196, -76.6989, "Redfish (Red Drum)"))
+            .isEqualTo("conditions-loaded 35.0196,-76.6989,Redfish (Red Drum)")
+    }
+
+    @Test
+    fun `a marker without fields is just the event name`() {
+        assertThat(ReadinessLog.format("loading")).isEqualTo("loading")
+    }
+
+    @Test
+    fun `null fields are left empty so field positions stay stable`() {
+        assertThat(ReadinessLog.format("conditions-loaded", 35.0, -76.7, null))
+            .isEqualTo("conditions-loaded 35.0,-76.7,")
+    }
+}
@@ -0,0 +1,308 @@
+"""
+Record/replay stand-in for the Appium server.
+
+Lets the harness run without Appium, an emulator or the APK — for testing
+and timing changes to helpers/ and screens/ on a plain Linux box.
+
+record — an HTTP proxy between webdriver.Remote and a real Appium server.
+         Every W3C command and its response is appended to a cassette
+         (JSON lines), with the session id replaced by a placeholder.
+replay — serves a cassette locally. Identical requests are answered with
+         their recorded responses in the order they were recorded (the last
+         one repeats once exhausted, so extra polls still get an answer).
+         Per-command latency is configurable to model a real device.
+
+Usage (from the screenshots/ directory):
+    # 1. Record a real run (Appium on 4723, proxy on 4724)
+    python appium_replay.py record cassettes/phone.jsonl
+    TIDERUNNER_APPIUM_HOST=http://127.0.0.1:4724 bash run_screenshots.sh
+
+    # 2. Replay it — no device needed
+    python appium_replay.py replay cassettes/phone.jsonl --latency-ms 30 \\
+        --latency "POST /session/{sid}/element=80"
+    TIDERUNNER_APPIUM_HOST=http://127.0.0.1:4724 TIDERUNNER_CAPTURE_BACKEND=appium \\
+        python -m pytest tests/test_capture_screenshots.py
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import APPIUM_HOST
+
+DEFAULT_PORT = 4724
+
+# Placeholder written to cassettes instead of the real session id
+SESSION_PLACEHOLDER = "{sid}"
+
+# Session id handed to clients during replay
+REPLAY_SESSION_ID = "replay-session"
+
+_SESSION_RE = re.compile(r"^/session/([^/]+)")
+_ELEMENT_RE = re.compile(r"/element/[^/]+")
+
+
+def command_name(method: str, path: str) -> str:
+    """
+    Collapse a request into its W3C command template, e.g.
+    "POST /session/{sid}/element/{eid}/click". Used for latency rules and
+    for reporting.
+    """
+    path = _SESSION_RE.sub(f"/session/{SESSION_PLACEHOLDER}", path)
+    path = _ELEMENT_RE.sub("/element/{eid}", path)
+    return f"{method} {path}"
+
+
+def _normalise_body(body: bytes) -> str:
+    """Canonical form of a request body so key order never breaks a match."""
+    if not body:
+        return ""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        return body.decode("utf-8", errors="replace")
+
+
+def _request_key(method: str, path: str, body: str) -> str:
+    # New-session capabilities differ per profile and per run; any recorded
+    # session will do
+    if method == "POST" and path == "/session":
+        return "POST /session"
+    return f"{method} {path} {body}"
+
+
+# ---------------------------------------------------------------------------
+# Record
+# ---------------------------------------------------------------------------
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    upstream = APPIUM_HOST
+    cassette = None
+    lock = threading.Lock()
+    session_ids: set[str] = set()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _anonymise(self, text: str) -> str:
+        for sid in self.session_ids:
+            text = text.replace(sid, SESSION_PLACEHOLDER)
+        return text
+
+    def _forward(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        request = urllib.request.Request(
+            self.upstream.rstrip("/") + self.path,
+            data=body if self.command in ("POST", "PUT") else None,
+            method=self.command,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as resp:
+                status, payload = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        text = payload.decode("utf-8", errors="replace")
+        if self.command == "POST" and self.path == "/session" and status == 200:
+            sid = json.loads(text).get("value", {}).get("sessionId")
+            if sid:
+                self.session_ids.add(sid)
+
+        entry = {
+            "method": self.command,
+            "path": self._anonymise(self.path),
+            "body": self._anonymise(_normalise_body(body)),
+            "status": status,
+            "response": self._anonymise(text),
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        with self.lock:
+            self.cassette.write(json.dumps(entry) + "\n")
+            self.cassette.flush()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_DELETE = _forward
+
+
+def record(cassette_path: Path, port: int, upstream: str) -> None:
+    cassette_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cassette_path, "a", encoding="utf-8") as cassette:
+        _RecordingHandler.upstream = upstream
+        _RecordingHandler.cassette = cassette
+        server = ThreadingHTTPServer(("127.0.0.1", port), _RecordingHandler)
+        print(f"[replay] Recording {upstream} → {cassette_path} on port {port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class Cassette:
+    """
+    Recorded responses indexed by request, served in recorded order.
+    """
+
+    def __init__(self, entries: list[dict]) -> None:
+        self._queues: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+        self._lock = threading.Lock()
+        for entry in entries:
+            key = _request_key(entry["method"], entry["path"], entry["body"])
+            self._queues.setdefault(key, []).append(entry)
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        with open(path, encoding="utf-8") as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def next_response(self, method: str, path: str, body: str) -> dict | None:
+        key = _request_key(method, path, body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return queue[min(index, len(queue) - 1)]
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    cassette: Cassette = None
+    default_latency_ms: float | None = 0.0   # None = use recorded latency
+    latency_rules: dict[str, float] = {}
+    stats: dict[str, int] = {}
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _serve(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        path = _SESSION_RE.sub(f"/session/{SESSION_PLACEHOLDER}", self.path)
+        name = command_name(self.command, path)
+        self.stats[name] = self.stats.get(name, 0) + 1
+
+        entry = self.cassette.next_response(self.command, path, _normalise_body(body))
+        if entry is None:
+            print(f"[replay] ⚠️  No recording for {name}")
+            status = 404
+            payload = json.dumps({"value": {
+                "error": "unknown command",
+                "message": f"Not in cassette: {self.command} {path}",
+                "stacktrace": "",
+            }})
+        else:
+            status = entry["status"]
+            payload = entry["response"].replace(SESSION_PLACEHOLDER, REPLAY_SESSION_ID)
+
+        latency = self.latency_rules.get(name, self.default_latency_ms)
+        if latency is None:
+            latency = entry["elapsed_ms"] if entry else 0.0
+        if latency:
+            time.sleep(latency / 1000)
+
+        data = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _serve
+
+
+def make_replay_server(
+    cassette: Cassette,
+    port: int = DEFAULT_PORT,
+    default_latency_ms: float | None = 0.0,
+    latency_rules: dict[str, float] | None = None,
+) -> ThreadingHTTPServer:
+    """
+    Build (but do not start) a replay server. Call serve_forever() on it,
+    typically from a daemon thread when embedding it in another tool.
+    """
+    handler = type("ReplayHandler", (_ReplayHandler,), {
+        "cassette": cassette,
+        "default_latency_ms": default_latency_ms,
+        "latency_rules": dict(latency_rules or {}),
+        "stats": {},
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def _parse_latency_rules(rules: list[str]) -> dict[str, float]:
+    parsed = {}
+    for rule in rules:
+        name, _, value = rule.rpartition("=")
+        if not name:
+            raise ValueError(f"Latency rule must be 'METHOD /path=ms', got '{rule}'")
+        parsed[name.strip()] = float(value)
+    return parsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    rec = sub.add_parser("record", help="proxy to Appium and record a cassette")
+    rec.add_argument("cassette", type=Path)
+    rec.add_argument("--port", type=int, default=DEFAULT_PORT)
+    rec.add_argument("--upstream", default=APPIUM_HOST)
+
+    rep = sub.add_parser("replay", help="serve a recorded cassette")
+    rep.add_argument("cassette", type=Path)
+    rep.add_argument("--port", type=int, default=DEFAULT_PORT)
+    rep.add_argument(
+        "--latency-ms", default="0",
+        help="latency added to every command, or 'recorded' to reuse the recorded timings",
+    )
+    rep.add_argument(
+        "--latency", action="append", default=[], metavar="'METHOD /path=ms'",
+        help="per-command latency override, e.g. 'POST /session/{sid}/element=80'",
+    )
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        record(args.cassette, args.port, args.upstream)
+        return 0
+
+    default_latency = None if args.latency_ms == "recorded" else float(args.latency_ms)
+    server = make_replay_server(
+        Cassette.load(args.cassette),
+        port=args.port,
+        default_latency_ms=default_latency,
+        latency_rules=_parse_latency_rules(args.latency),
+    )
+    print(f"[replay] Serving {args.cassette} on port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
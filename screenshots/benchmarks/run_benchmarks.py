@@ -0,0 +1,292 @@
+"""
+Harness hot-path benchmark.
+
+Runs every shot in the capture plan (shots.toml, see helpers/shot_plan.py)
+against the in-process SimulatedDriver (benchmarks/simulated_device.py),
+in plan order through the same ShotExecutor the suite uses, and reports,
+per shot:
+
+  - Appium commands issued (what a real device would pay a round trip for)
+  - wall time split into sleeps (bare time.sleep outside any wait helper),
+    waits (time inside wait/settle helpers) and work (everything else —
+    commands outside waits plus host-side processing)
+  - p50 / p95 wall time over the iterations
+
+Each shot has a committed budget in benchmarks/budgets.json (maximum
+commands and maximum p95 wall time at the budget's reference latency).
+Any shot over budget fails the run with exit code 1, so harness slowdowns
+show up in review rather than as a slower Play Store refresh.
+
+Usage (from the screenshots/ directory):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --iterations 10 --latency-ms 80
+    python -m benchmarks.run_benchmarks --update-budgets   # after a deliberate change
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import helpers.driver_utils
+import helpers.screenshot
+import helpers.settle
+import helpers.stability
+from benchmarks.simulated_device import SimulatedDriver
+from config.devices import APP_ACTIVITY, APP_PACKAGE, PIXEL_4
+from helpers.app_guard import ensure_app_running
+from helpers.shot_executor import LocationLoadError, ShotExecutor
+from helpers.shot_plan import load_plan
+from screens.map_screen import MapScreen
+
+BUDGETS_PATH = Path(__file__).parent / "budgets.json"
+
+# Headroom applied when --update-budgets writes new limits
+_BUDGET_HEADROOM = 1.25
+
+# Module prefixes whose globals are rebound when instrumenting helpers
+_INSTRUMENTED_PREFIXES = ("helpers.", "screens.", "tests.", "benchmarks.")
+
+
+class ShotTimer:
+    """
+    Splits wall time into sleep / wait / work for the shot being measured.
+    """
+
+    def __init__(self) -> None:
+        self.sleep = 0.0
+        self.wait = 0.0
+        self._wait_depth = 0
+
+    def reset(self) -> None:
+        self.sleep = 0.0
+        self.wait = 0.0
+        self._wait_depth = 0
+
+    def wrap_sleep(self, real_sleep):
+        @functools.wraps(real_sleep)
+        def _sleep(seconds):
+            start = time.perf_counter()
+            real_sleep(seconds)
+            if self._wait_depth == 0:
+                self.sleep += time.perf_counter() - start
+        return _sleep
+
+    def wrap_wait(self, func):
+        @functools.wraps(func)
+        def _wait(*args, **kwargs):
+            self._wait_depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._wait_depth -= 1
+                if self._wait_depth == 0:
+                    self.wait += time.perf_counter() - start
+        return _wait
+
+
+def _rebind(original, replacement) -> None:
+    """Replace every module-global reference to `original` in harness modules."""
+    for name, module in list(sys.modules.items()):
+        if module is None or not name.startswith(_INSTRUMENTED_PREFIXES):
+            continue
+        for attr, value in list(vars(module).items()):
+            if value is original:
+                setattr(module, attr, replacement)
+
+
+@contextlib.contextmanager
+def instrumented(timer: ShotTimer):
+    """Patch time.sleep and the wait helpers for the duration of a run."""
+    real_sleep = time.sleep
+    waits = [
+        helpers.settle.wait_for_ui_idle,
+        helpers.settle.wait_until,
+        helpers.stability.wait_for_stable_frames,
+        helpers.driver_utils.wait_for_text,
+        helpers.driver_utils.wait_for_accessibility_id,
+    ]
+    methods = [
+        "wait_for_conditions_to_load",
+        "_wait_for_loading_to_finish",
+        "wait_for_map_tiles",
+        "wait_for_tile_traffic",
+    ]
+    originals = {m: getattr(MapScreen, m) for m in methods}
+
+    time.sleep = timer.wrap_sleep(real_sleep)
+    wrapped = [(func, timer.wrap_wait(func)) for func in waits]
+    for func, wrapper in wrapped:
+        _rebind(func, wrapper)
+    for name, func in originals.items():
+        setattr(MapScreen, name, timer.wrap_wait(func))
+    try:
+        yield
+    finally:
+        time.sleep = real_sleep
+        for func, wrapper in wrapped:
+            _rebind(wrapper, func)
+        for name, func in originals.items():
+            setattr(MapScreen, name, func)
+
+
+def run_iteration(driver_kwargs: dict, timer: ShotTimer, verbose: bool) -> dict[str, dict]:
+    """Run every planned shot once on a fresh simulated device."""
+    driver = SimulatedDriver(**driver_kwargs)
+    plan = load_plan()
+    executor = ShotExecutor(driver, PIXEL_4, plan)
+    results = {}
+    for shot in plan.shots:
+        timer.reset()
+        commands_before = driver.command_total
+        outcome = "passed"
+        sink = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if verbose else sink):
+            try:
+                ensure_app_running(driver, APP_PACKAGE, APP_ACTIVITY)
+                executor.capture(shot)
+            except LocationLoadError:
+                outcome = "skipped"
+            except Exception as e:
+                outcome = f"failed: {str(e).splitlines()[0]}"
+        wall = time.perf_counter() - start
+        results[shot.filename] = {
+            "outcome": outcome,
+            "commands": driver.command_total - commands_before,
+            "wall": wall,
+            "sleep": timer.sleep,
+            "wait": timer.wait,
+            "work": max(0.0, wall - timer.sleep - timer.wait),
+        }
+    helpers.screenshot.flush_pending_writes()
+    return results
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarise(iterations: list[dict[str, dict]]) -> dict[str, dict]:
+    summary = {}
+    for name in iterations[0]:
+        runs = [it[name] for it in iterations]
+        walls = [r["wall"] for r in runs]
+        summary[name] = {
+            "outcome": runs[-1]["outcome"],
+            "commands": max(r["commands"] for r in runs),
+            "sleep": statistics.mean(r["sleep"] for r in runs),
+            "wait": statistics.mean(r["wait"] for r in runs),
+            "work": statistics.mean(r["work"] for r in runs),
+            "p50": _percentile(walls, 50),
+            "p95": _percentile(walls, 95),
+        }
+    return summary
+
+
+def check_budgets(summary: dict[str, dict], budgets: dict) -> list[str]:
+    """Return one message per shot that exceeds its budget."""
+    violations = []
+    for name, stats in summary.items():
+        budget = budgets.get("shots", {}).get(name)
+        if budget is None:
+            violations.append(f"{name}: no budget committed")
+            continue
+        if stats["commands"] > budget["max_commands"]:
+            violations.append(
+                f"{name}: {stats['commands']} commands > budget {budget['max_commands']}"
+            )
+        if stats["p95"] > budget["max_p95_s"]:
+            violations.append(
+                f"{name}: p95 {stats['p95']:.2f}s > budget {budget['max_p95_s']:.2f}s"
+            )
+        if stats["outcome"] != "passed":
+            violations.append(f"{name}: {stats['outcome']}")
+    return violations
+
+
+def print_report(summary: dict[str, dict]) -> None:
+    print(f"\n{'shot':<60} {'cmds':>5} {'sleep':>6} {'wait':>6} {'work':>6} {'p50':>6} {'p95':>6}")
+    for name, s in summary.items():
+        print(
+            f"{name:<60} {s['commands']:>5} {s['sleep']:>5.2f}s {s['wait']:>5.2f}s "
+            f"{s['work']:>5.2f}s {s['p50']:>5.2f}s {s['p95']:>5.2f}s"
+        )
+    total_cmds = sum(s["commands"] for s in summary.values())
+    total_p50 = sum(s["p50"] for s in summary.values())
+    print(f"{'TOTAL':<60} {total_cmds:>5} {'':>6} {'':>6} {'':>6} {total_p50:>5.2f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=None,
+                        help="base command latency (default: the budget's reference latency)")
+    parser.add_argument("--update-budgets", action="store_true",
+                        help="write measured values plus headroom to budgets.json")
+    parser.add_argument("--json", type=Path, help="also write the summary as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show harness log lines")
+    args = parser.parse_args()
+
+    budgets = json.loads(BUDGETS_PATH.read_text()) if BUDGETS_PATH.exists() else {}
+    latency = args.latency_ms if args.latency_ms is not None else budgets.get("latency_ms", 40.0)
+
+    # Keep benchmark output out of the real output/ folder and off adb
+    os.environ["TIDERUNNER_CAPTURE_BACKEND"] = "appium"
+    helpers.screenshot.OUTPUT_ROOT = Path(tempfile.mkdtemp(prefix="tiderunner-bench-"))
+
+    timer = ShotTimer()
+    iterations = []
+    with instrumented(timer):
+        for i in range(args.iterations):
+            iterations.append(run_iteration({"latency_ms": latency}, timer, args.verbose))
+            print(f"[bench] iteration {i + 1}/{args.iterations} done")
+
+    summary = summarise(iterations)
+    print(f"[bench] simulated latency {latency:.0f} ms/command")
+    print_report(summary)
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2))
+
+    if args.update_budgets:
+        budgets = {
+            "latency_ms": latency,
+            "shots": {
+                name: {
+                    "max_commands": int(s["commands"] * _BUDGET_HEADROOM) + 1,
+                    "max_p95_s": round(s["p95"] * _BUDGET_HEADROOM + 0.05, 2),
+                }
+                for name, s in summary.items()
+            },
+        }
+        BUDGETS_PATH.write_text(json.dumps(budgets, indent=2) + "\n")
+        print(f"[bench] Budgets written to {BUDGETS_PATH.relative_to(SCRIPT_DIR)}")
+        return 0
+
+    if latency != budgets.get("latency_ms"):
+        print("[bench] ⚠️  Latency differs from the budget reference — budgets not enforced")
+        return 0
+
+    violations = check_budgets(summary, budgets)
+    for message in violations:
+        print(f"[bench] ❌  {message}")
+    if not violations:
+        print("[bench] ✅  All shots within budget")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+"""
+In-process simulated TideRunner device.
+
+A stand-in for the Appium WebDriver that models just enough of the app for
+the page objects and helpers to run end to end: the map with its species
+filter and "My Location" FAB, the species dropdown, a loading spinner
+after a location fix, and the ConditionsPanel with a scrollable section
+list. Every driver command sleeps a tunable latency and is counted, so the
+harness cost of each shot can be measured without a device.
+
+Simplifications, deliberately:
+  - the species dropdown exposes every species at once (no lazy scroll)
+  - only nodes inside the viewport are reported, as UiAutomator2 does
+  - animations, scroll flings and tile loading are modelled as "the
+    screen keeps changing until time T"
+"""
+
+import hashlib
+import io
+import math
+import re
+import time
+from xml.sax.saxutils import quoteattr
+
+from PIL import Image
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.command import Command
+
+from config.devices import APP_PACKAGE
+from config.species import ALL_SPECIES
+
+# Captured before any benchmark instrumentation patches time.sleep, so
+# simulated device latency is never mistaken for harness sleeps
+_real_sleep = time.sleep
+
+# Scrollable panel content: (text, offset from top of scroll content, height)
+PANEL_SECTIONS = [
+    ("Fishing Suitability", 0, 90),
+    ("GOOD", 100, 80),
+    ("72", 100, 80),
+    ("🎣 Best Fishing Times Today", 620, 80),
+    ("Marine Conditions", 1560, 80),
+    ("Water Temp", 1660, 60),
+    ("Wave Height", 1760, 60),
+    ("Tide Information", 2360, 80),
+    ("Next High Tide", 2460, 60),
+    ("Sun & Moon", 2900, 80),
+    ("Moon Phase", 3000, 60),
+    ("Solunar Periods (Best Fishing Times)", 3400, 80),
+    ("Data: Open-Meteo + NOAA", 3900, 60),
+]
+PANEL_CONTENT_HEIGHT = 4000
+
+# Fixed (non-scrolling) part of the expanded panel, as screen y ranges
+_PANEL_TOP = 630
+_HEADER = (_PANEL_TOP, 830)
+_DATE_SELECTOR = (830, 1150)
+_COLLAPSED_TOP = 2060
+
+# Command name -> default latency multiplier relative to `latency_ms`.
+# Hierarchy dumps and screenshots are heavier than a single find.
+_LATENCY_WEIGHTS = {
+    "page_source": 2.0,
+    "screenshot": 4.0,
+}
+
+_SELECTOR_RE = re.compile(r'(text|textContains|className)\("(.*)"\)')
+
+
+class SimulatedElement:
+    """Minimal WebElement look-alike returned by find_element()."""
+
+    def __init__(self, driver: "SimulatedDriver", node: dict) -> None:
+        self._driver = driver
+        self._node = node
+        self.text = node.get("text", "")
+
+    def click(self) -> None:
+        self._driver._command("click")
+        self._driver._activate(self._node)
+
+    def get_attribute(self, name: str) -> str | None:
+        return self._node.get({"contentDescription": "desc"}.get(name, name))
+
+
+class SimulatedDriver:
+    """
+    Driver-shaped object backed by a simulated TideRunner UI.
+
+    Args:
+        latency_ms:        Base round-trip latency for every command.
+        latency_overrides: Command name -> latency in ms, e.g.
+                           {"page_source": 150}.
+        load_time:         Seconds the spinner shows after a location fix.
+        animation_time:    Seconds the UI keeps moving after an interaction.
+        tile_time:         Seconds until map tiles stop changing at launch.
+        permission_dialog: Show the location permission dialog at launch.
+    """
+
+    width = 1080
+    height = 2280
+    session_id = "simulated-session"
+
+    def __init__(
+        self,
+        latency_ms: float = 40.0,
+        latency_overrides: dict[str, float] | None = None,
+        load_time: float = 1.2,
+        animation_time: float = 0.3,
+        tile_time: float = 1.0,
+        permission_dialog: bool = False,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.latency_overrides = dict(latency_overrides or {})
+        self.load_time = load_time
+        self.animation_time = animation_time
+        self.capabilities = {"deviceUDID": "simulated", "platformName": "Android"}
+
+        self.command_counts: dict[str, int] = {}
+        self.command_time = 0.0
+
+        now = time.monotonic()
+        self._tiles_ready_at = now + tile_time
+        self._moving_until = now + animation_time
+        self._permission_dialog = permission_dialog
+        self._dropdown_open = False
+        self._selected_species: set[str] = set()
+        self._location: tuple[float, float] | None = None
+        self._loading_until: float | None = None
+        self._panel_loaded = False
+        self._panel_expanded = True
+        self._scroll = 0
+        self._png_cache: dict[str, bytes] = {}
+
+    # ------------------------------------------------------------------
+    # Command accounting
+    # ------------------------------------------------------------------
+
+    @property
+    def command_total(self) -> int:
+        return sum(self.command_counts.values())
+
+    def _command(self, name: str, extra_seconds: float = 0.0) -> None:
+        latency = self.latency_overrides.get(
+            name, self.latency_ms * _LATENCY_WEIGHTS.get(name, 1.0)
+        )
+        self.command_counts[name] = self.command_counts.get(name, 0) + 1
+        seconds = latency / 1000 + extra_seconds
+        self.command_time += seconds
+        _real_sleep(seconds)
+
+    def _touch(self) -> None:
+        """An interaction happened — the UI animates for a moment."""
+        self._moving_until = time.monotonic() + self.animation_time
+
+    # ------------------------------------------------------------------
+    # Simulated UI
+    # ------------------------------------------------------------------
+
+    def _is_loading(self) -> bool:
+        if self._loading_until is None:
+            return False
+        if time.monotonic() < self._loading_until:
+            return True
+        self._loading_until = None
+        self._panel_loaded = True
+        self._touch()
+        return False
+
+    def _nodes(self) -> list[dict]:
+        """Every node currently visible on screen, in document order."""
+        w = self.width
+        nodes = [{"class": "android.widget.FrameLayout", "bounds": (0, 0, w, self.height)}]
+        loading = self._is_loading()
+
+        if self._permission_dialog:
+            for i, label in enumerate(["While using the app", "Only this time", "Don't allow"]):
+                top = 1300 + i * 140
+                nodes.append({"class": "android.widget.Button", "text": label,
+                              "bounds": (140, top, w - 140, top + 120), "action": "permission"})
+            return nodes
+
+        nodes.append({"class": "android.view.View", "desc": "Map", "bounds": (0, 0, w, self.height)})
+        nodes.append({"class": "android.widget.TextView", "text": "Filter by Species",
+                      "bounds": (40, 140, w - 40, 300), "action": "filter"})
+
+        if self._dropdown_open:
+            for i, name in enumerate(ALL_SPECIES):
+                top = 320 + i * 80
+                nodes.append({"class": "android.widget.TextView", "text": name,
+                              "bounds": (60, top, w - 60, top + 76), "action": "species"})
+            return nodes
+
+        nodes.append({"class": "android.widget.Button", "desc": "My Location",
+                      "bounds": (880, 1560, 1040, 1720), "action": "fab"})
+        if loading:
+            nodes.append({"class": "android.widget.ProgressBar",
+                          "bounds": (480, 1080, 600, 1200)})
+        if self._panel_loaded:
+            nodes.extend(self._panel_nodes())
+        return nodes
+
+    def _panel_nodes(self) -> list[dict]:
+        w = self.width
+        if not self._panel_expanded:
+            return [
+                {"class": "android.widget.TextView", "text": "Fishing Conditions",
+                 "bounds": (40, _COLLAPSED_TOP + 40, 700, _COLLAPSED_TOP + 120), "action": "toggle"},
+                {"class": "android.view.View", "desc": "Expand",
+                 "bounds": (940, _COLLAPSED_TOP + 40, 1040, _COLLAPSED_TOP + 140), "action": "toggle"},
+            ]
+
+        nodes = [
+            {"class": "android.widget.TextView", "text": "Fishing Conditions",
+             "bounds": (40, _HEADER[0] + 40, 700, _HEADER[0] + 120), "action": "toggle"},
+            {"class": "android.view.View", "desc": "Collapse",
+             "bounds": (940, _HEADER[0] + 40, 1040, _HEADER[0] + 140), "action": "toggle"},
+            {"class": "android.widget.TextView", "text": "📅 Select Forecast Date",
+             "bounds": (40, _DATE_SELECTOR[0] + 10, 700, _DATE_SELECTOR[0] + 80)},
+        ]
+        for i, label in enumerate(["Today", "Tue", "Wed", "Thu", "Fri"]):
+            left = 40 + i * 200
+            nodes.append({"class": "android.widget.TextView", "text": label,
+                          "bounds": (left, _DATE_SELECTOR[0] + 120, left + 180, _DATE_SELECTOR[0] + 180)})
+
+        viewport_top, viewport_bottom = _DATE_SELECTOR[1], self.height
+        # While moving, positions drift a few px per poll like a real fling
+        drift = int(time.monotonic() * 50) % 7 if time.monotonic() < self._moving_until else 0
+        for text, offset, height in PANEL_SECTIONS:
+            top = viewport_top + offset - self._scroll + drift
+            if top >= viewport_top and top + height <= viewport_bottom:
+                nodes.append({"class": "android.widget.TextView", "text": text,
+                              "bounds": (40, top, w - 40, top + height)})
+        nodes.append({"class": "android.widget.ScrollView", "scrollable": True,
+                      "bounds": (0, viewport_top, w, viewport_bottom)})
+        return nodes
+
+    def _activate(self, node: dict) -> None:
+        action = node.get("action")
+        if action == "permission":
+            self._permission_dialog = False
+        elif action == "filter":
+            self._dropdown_open = not self._dropdown_open
+        elif action == "species":
+            name = node["text"]
+            self._selected_species ^= {name}
+            self._dropdown_open = False
+        elif action == "fab" and self._location is not None:
+            self._panel_loaded = False
+            self._scroll = 0
+            self._loading_until = time.monotonic() + self.load_time
+        elif action == "toggle":
+            self._panel_expanded = not self._panel_expanded
+        self._touch()
+
+    def _find(self, predicate) -> dict | None:
+        for node in self._nodes():
+            if predicate(node):
+                return node
+        return None
+
+    # ------------------------------------------------------------------
+    # WebDriver surface used by helpers/ and screens/
+    # ------------------------------------------------------------------
+
+    @property
+    def page_source(self) -> str:
+        self._command("page_source")
+        parts = ['<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">']
+        for node in self._nodes():
+            left, top, right, bottom = node["bounds"]
+            attrs = {
+                "class": node["class"],
+                "text": node.get("text", ""),
+                "content-desc": node.get("desc", ""),
+                "package": APP_PACKAGE,
+                "scrollable": "true" if node.get("scrollable") else "false",
+                "bounds": f"[{left},{top}][{right},{bottom}]",
+            }
+            rendered = " ".join(f"{k}={quoteattr(v)}" for k, v in attrs.items())
+            parts.append(f"<node {rendered}/>")
+        parts.append("</hierarchy>")
+        return "".join(parts)
+
+    def find_element(self, by: str, value: str) -> SimulatedElement:
+        if "scrollIntoView" in value:
+            return self._scroll_into_view(value)
+        self._command("find_element")
+        if by == "accessibility id":
+            node = self._find(lambda n: n.get("desc") == value)
+        else:
+            match = _SELECTOR_RE.search(value)
+            if not match:
+                raise NoSuchElementException(f"Unsupported selector: {value}")
+            kind, arg = match.groups()
+            if kind == "text":
+                node = self._find(lambda n: n.get("text") == arg)
+            elif kind == "textContains":
+                node = self._find(lambda n: arg in n.get("text", ""))
+            else:
+                node = self._find(lambda n: n["class"] == arg)
+        if node is None:
+            raise NoSuchElementException(f"{by}={value}")
+        return SimulatedElement(self, node)
+
+    def _scroll_into_view(self, value: str) -> SimulatedElement:
+        """
+        UiScrollable.scrollIntoView: done if already visible, otherwise back
+        to the beginning and forward in steps of ~half a viewport.
+        """
+        target = _SELECTOR_RE.search(value.split("scrollIntoView", 1)[1]).group(2)
+        viewport = self.height - _DATE_SELECTOR[1]
+        max_scroll = PANEL_CONTENT_HEIGHT - viewport
+        steps = 0
+        section = next(((o, h) for t, o, h in PANEL_SECTIONS if target in t), None)
+        if section is not None and self._panel_loaded and self._panel_expanded:
+            offset, height = section
+            if not (self._scroll <= offset and offset + height <= self._scroll + viewport):
+                steps = math.ceil(self._scroll / (viewport * 0.55))
+                self._scroll = 0
+                while offset + height > self._scroll + viewport and self._scroll < max_scroll:
+                    self._scroll = min(max_scroll, self._scroll + int(viewport * 0.55))
+                    steps += 1
+        # Each UiScrollable step is a swipe plus an idle wait on the device
+        self._command("find_element", extra_seconds=steps * 0.35)
+        self._touch()
+        node = self._find(lambda n: target in n.get("text", ""))
+        if node is None:
+            raise NoSuchElementException(value)
+        return SimulatedElement(self, node)
+
+    def execute(self, command: str, params: dict | None = None) -> dict:
+        """W3C actions (helpers/driver_utils.drag); each pointer stroke scrolls like a swipe."""
+        if command != Command.W3C_ACTIONS:
+            raise NotImplementedError(command)
+        seconds = 0.0
+        for source in params["actions"]:
+            down = position = None
+            for action in source["actions"]:
+                seconds += action.get("duration", 0) / 1000
+                if action["type"] == "pointerMove":
+                    position = (action["x"], action["y"])
+                elif action["type"] == "pointerDown":
+                    down = position
+                elif action["type"] == "pointerUp" and down and position:
+                    self._scroll_by(down[1], position[1])
+        self._command("actions", extra_seconds=seconds)
+        self._touch()
+        return {"value": None}
+
+    def _scroll_by(self, start_y: int, end_y: int) -> None:
+        # Gestures that end or start over the scroll area move the content
+        in_viewport = max(start_y, end_y) >= _DATE_SELECTOR[1]
+        if self._panel_loaded and self._panel_expanded and in_viewport:
+            max_scroll = PANEL_CONTENT_HEIGHT - (self.height - _DATE_SELECTOR[1])
+            self._scroll = max(0, min(max_scroll, self._scroll + (start_y - end_y)))
+
+    def get_window_size(self) -> dict:
+        self._command("window_size")
+        return {"width": self.width, "height": self.height}
+
+    def get_screenshot_as_png(self) -> bytes:
+        self._command("screenshot")
+        now = time.monotonic()
+        key = "|".join(str(n) for n in self._nodes())
+        if now < self._tiles_ready_at or now < self._moving_until:
+            key += f"|frame{int(now * 20)}"
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        if digest not in self._png_cache:
+            img = Image.new("RGB", (self.width, self.height), tuple(digest[:3]))
+            buf = io.BytesIO()
+            img.save(buf, format="PNG", compress_level=1)
+            self._png_cache[digest] = buf.getvalue()
+        return self._png_cache[digest]
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 0) -> None:
+        self._command("swipe", extra_seconds=duration / 1000)
+        self._scroll_by(start_y, end_y)
+        self._touch()
+
+    def tap(self, positions: list[tuple[int, int]], duration: int | None = None) -> None:
+        self._command("tap")
+        x, y = positions[0]
+        # Last match wins — the topmost node at that point
+        hit = None
+        for node in self._nodes():
+            left, top, right, bottom = node["bounds"]
+            if left <= x <= right and top <= y <= bottom and node.get("action"):
+                hit = node
+        if hit:
+            self._activate(hit)
+
+    def back(self) -> None:
+        self._command("back")
+        self._dropdown_open = False
+        self._touch()
+
+    def set_location(self, latitude: float, longitude: float, altitude: float = 0.0) -> None:
+        self._command("set_location")
+        self._location = (latitude, longitude)
+
+    @property
+    def location(self) -> dict:
+        self._command("location")
+        lat, lon = self._location or (0.0, 0.0)
+        return {"latitude": lat, "longitude": lon, "altitude": 0.0}
+
+    @property
+    def current_package(self) -> str:
+        self._command("current_package")
+        return APP_PACKAGE
+
+    def activate_app(self, app_id: str) -> None:
+        self._command("activate_app")
+
+    def terminate_app(self, app_id: str) -> bool:
+        self._command("terminate_app")
+        return True
+
+    def quit(self) -> None:
+        pass
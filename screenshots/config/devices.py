@@ -3,8 +3,19 @@ Device profile configuration for TideRunner screenshot capture.
 
 The Pixel 4 AVD is the primary device used for Google Play Store screenshots.
 Screen resolution: 1080x2280 @ 440dpi
+
+Each profile carries its own UiAutomator2 `system_port` so that several
+profiles can hold Appium sessions at the same time (see run_parallel.py).
+
+A worker that holds an instance from the emulator pool
+(helpers/emulator_pool.py) gets its device's udid and ports in
+$TIDERUNNER_DEVICE_LEASE; active_device_profile() applies them on top of
+the profile.
 """
 
+import json
+import os
+
 # Primary device: Pixel 4 AVD that is already set up locally
 PIXEL_4 = {
     "avd_name": "Pixel_4",                  # Exact AVD name as reported by the emulator
@@ -13,15 +24,52 @@ PIXEL_4 = {
     "screen_width": 1080,
     "screen_height": 2280,
     "output_folder": "phone",
+    "system_port": 8200,                    # UiAutomator2 server port — unique per profile
 }
 
-# All profiles to run — add tablet profiles here later if needed
+# All profiles to run — add tablet profiles here later if needed.
+# Give every new profile its own "output_folder" and "system_port".
 ALL_DEVICE_PROFILES = [PIXEL_4]
 
+# Environment variable a worker process reads to pick its profile
+# (value is the profile's "output_folder", e.g. "phone")
+DEVICE_PROFILE_ENV = "TIDERUNNER_DEVICE_PROFILE"
+
+# Environment variable carrying a pool lease as JSON:
+# {"udid": "emulator-5556", "system_port": 8211, "chromedriver_port": 9521}
+DEVICE_LEASE_ENV = "TIDERUNNER_DEVICE_LEASE"
+
 # App under test
 APP_PACKAGE = "com.fishing.conditions.debug"
 APP_ACTIVITY = "com.fishing.conditions.ui.MainActivity"
 
-# Appium server
-APPIUM_HOST = "http://127.0.0.1:4723"
+# Appium server. Override with $TIDERUNNER_APPIUM_HOST to go through the
+# record/replay stand-in in appium_replay.py.
+APPIUM_HOST = os.environ.get("TIDERUNNER_APPIUM_HOST", "http://127.0.0.1:4723")
+
+
+
+def get_device_profile(output_folder: str) -> dict:
+    """
+    Look up a profile in ALL_DEVICE_PROFILES by its output folder name.
+
+    Raises:
+        KeyError: If no profile uses that output folder.
+    """
+    for profile in ALL_DEVICE_PROFILES:
+        if profile["output_folder"] == output_folder:
+            return profile
+    known = ", ".join(p["output_folder"] for p in ALL_DEVICE_PROFILES)
+    raise KeyError(f"Unknown device profile '{output_folder}' (known: {known})")
+
 
+def active_device_profile() -> dict:
+    """
+    Return the profile selected via $TIDERUNNER_DEVICE_PROFILE, or PIXEL_4
+    when the variable is unset (plain single-device runs), with the device
+    lease from $TIDERUNNER_DEVICE_LEASE applied when there is one.
+    """
+    name = os.environ.get(DEVICE_PROFILE_ENV)
+    profile = get_device_profile(name) if name else PIXEL_4
+    lease = os.environ.get(DEVICE_LEASE_ENV)
+    return {**profile, **json.loads(lease)} if lease else profile
@@ -0,0 +1,34 @@
+"""
+Species offered in the app's "Filter by Species" dropdown.
+
+Mirrors FishSpeciesDatabase.getAllSpecies() in
+app/src/main/java/com/fishing/conditions/data/models/Species.kt, in the
+same order. Names must match the dropdown text exactly.
+"""
+
+ALL_SPECIES = [
+    # Inshore
+    "Redfish (Red Drum)",
+    "Speckled Trout",
+    "Flounder",
+    "Striped Bass",
+    "Bluefish",
+    "Black Sea Bass",
+    "Tautog (Blackfish)",
+    "Scup (Porgy)",
+    "Weakfish (Gray Trout)",
+    "Summer Flounder",
+    # Offshore
+    "Atlantic Bluefin Tuna",
+    "Blackfin Tuna",
+    "Yellowfin Tuna",
+    "Mahi Mahi (Dolphin Fish)",
+    "Red Grouper",
+    "King Mackerel",
+    "Wahoo",
+    "Cobia",
+    "Spanish Mackerel",
+    "Swordfish",
+    "Atlantic Sailfish",
+    "Greater Amberjack",
+]
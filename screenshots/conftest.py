@@ -14,53 +14,194 @@ Prerequisites before running:
 
 import os
 import sys
-import time
 
 import pytest
-from appium import webdriver
-from appium.options.common.base import AppiumOptions
 
 # Make helpers/screens importable from any test file
 sys.path.insert(0, os.path.dirname(__file__))
 
-from config.devices import PIXEL_4, APP_PACKAGE, APP_ACTIVITY, APPIUM_HOST
+from config.devices import active_device_profile, APP_PACKAGE, APP_ACTIVITY, APPIUM_HOST
 from helpers.app_guard import ensure_app_running
+from helpers.capture import device_serial, print_capture_report
+from helpers import fixture_server, logcat, profiler, tile_archive, watchdog
+from helpers.screenshot import OUTPUT_ROOT, flush_pending_writes
+from helpers.session import acquire_session, broker_url, create_session
+from helpers.settle import wait_for_ui_idle
+from helpers.shot_plan import current_shard
 
 
-def _build_options(device_profile: dict) -> AppiumOptions:
+def pytest_addoption(parser):
+    parser.addoption(
+        "--fresh", action="store_true", default=False,
+        help="ignore the capture checkpoint and recapture every shot",
+    )
+    parser.addoption(
+        "--locales", nargs="+", default=None, metavar="LOCALE",
+        help="capture every shot in each of these app locales (e.g. de-DE fr-FR) "
+             "into output/<folder>/<locale>/",
+    )
+    parser.addoption(
+        "--themes", nargs="+", default=None, choices=("light", "dark"), metavar="THEME",
+        help="capture every shot in each theme (light, dark), saved as <filename>_<theme>.png",
+    )
+    parser.addoption(
+        "--profile", action="store_true", default=False,
+        help="record every Appium command (helpers/profiler.py) and write a Chrome trace",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Appium command profiler (--profile)
+# ---------------------------------------------------------------------------
+
+def pytest_configure(config):
+    if config.getoption("--profile"):
+        profiler.start_profiler()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    prof = profiler.active_profiler()
+    if prof is not None:
+        prof.begin_test(item.nodeid)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item, nextitem):
+    prof = profiler.active_profiler()
+    if prof is not None:
+        prof.end_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    prof = profiler.active_profiler()
+    if prof is None or report.when != "call":
+        return
+    try:
+        from pytest_html import extras
+    except ImportError:
+        return
+    table = prof.html_table(item.nodeid)
+    if table:
+        report.extras = getattr(report, "extras", []) + [extras.html(table)]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session, exitstatus):
+    prof = profiler.active_profiler()
+    if prof is not None and prof.records:
+        name = profiler.TRACE_NAME
+        shard = current_shard()
+        if shard is not None:
+            # Shards share the profile's folder
+            name = name.replace(".json", f".shard-{shard[0]}.json")
+        prof.write_trace(OUTPUT_ROOT / active_device_profile()["output_folder"] / name)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    prof = profiler.active_profiler()
+    if prof is not None and prof.records:
+        total = sum(r.duration for r in prof.records)
+        trace = f" — trace: {prof.trace_path}" if prof.trace_path else ""
+        prefix.append(f"<p>Appium: {len(prof.records)} commands, {total:.1f}s on the wire{trace}</p>")
+
+
+def pytest_terminal_summary(terminalreporter):
+    prof = profiler.active_profiler()
+    if prof is None:
+        return
+    report = prof.terminal_report()
+    if report:
+        terminalreporter.write_line("\n" + report)
+    if prof.trace_path:
+        terminalreporter.write_line(f"[profile] Chrome trace: {prof.trace_path}")
+
+
+def pytest_unconfigure(config):
+    profiler.stop_profiler()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def api_fixtures():
     """
-    Build Appium capabilities using AppiumOptions for UiAutomator2.
+    Session-scoped autouse fixture that serves recorded API responses.
 
-    AppiumOptions.load_capabilities() is used instead of UiAutomator2Options
-    because Appium-Python-Client 3.1.0 does not re-export UiAutomator2Options
-    from appium.options — it only exists deep in the submodule tree and the
-    top-level __init__.py is empty. AppiumOptions is the stable public API.
+    Only active when $TIDERUNNER_API_FIXTURES is set (to a recorded date,
+    or "latest"), and only useful with a debug APK built with
+    -Ptiderunner.fixtureBaseUrl. Every forecast then comes from
+    fixtures/api/ instead of the live APIs. Under run_parallel.py the
+    runner serves them for every worker, and this does nothing.
     """
-    caps = {
-        # W3C standard
-        "platformName": "Android",
-        # Appium-prefixed caps
-        "appium:deviceName": device_profile["device_name"],
-        "appium:platformVersion": device_profile["platform_version"],
-        "appium:avd": device_profile["avd_name"],
-        "appium:automationName": "UiAutomator2",
-        # App under test — debug variant
-        "appium:appPackage": APP_PACKAGE,
-        "appium:appActivity": APP_ACTIVITY,
-        # Don't reinstall / reset between sessions — speeds up iteration
-        "appium:noReset": True,
-        "appium:fullReset": False,
-        # Auto-grant all runtime permissions (location, etc.)
-        "appium:autoGrantPermissions": True,
-        # Timeouts
-        "appium:newCommandTimeout": 120,
-        "appium:uiautomator2ServerLaunchTimeout": 60000,
-    }
-    return AppiumOptions().load_capabilities(caps)
+    setting = os.environ.get(fixture_server.FIXTURE_ENV)
+    if not setting or os.environ.get(fixture_server.SHARED_SERVERS_ENV):
+        yield None
+        return
+    server = fixture_server.start_in_background(date=None if setting == "latest" else setting)
+    for name in fixture_server.missing_locations(server.fixture_date):
+        print(f"[fixture] ⚠️  No API fixtures for {name} — its shots will show errors")
+    yield server
+    print(f"\n[fixture] API fixture hits: {server.RequestHandlerClass.stats}")
+    server.shutdown()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def map_tiles():
+    """
+    Session-scoped autouse fixture for the local map tile pipeline.
+
+    Only active when $TIDERUNNER_TILE_ARCHIVE is set ("offline" to 404 on
+    tiles that are not archived, anything else to fetch and archive them).
+    Seeds the app's osmdroid cache from fixtures/tiles/ before any session
+    starts and serves misses to a -Ptiderunner.tileBaseUrl debug build.
+    Under run_parallel.py the runner serves the tiles for every worker, so
+    this only seeds the worker's own device.
+    """
+    setting = os.environ.get(tile_archive.TILE_ARCHIVE_ENV)
+    if not setting:
+        yield None
+        return
+    tile_archive.seed_device_cache(active_device_profile().get("udid") or os.environ.get("ANDROID_SERIAL"))
+    if os.environ.get(fixture_server.SHARED_SERVERS_ENV):
+        yield None
+        return
+    server = tile_archive.start_in_background(offline=setting == "offline")
+    yield server
+    tile_archive.stop_active_server()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def screenshot_writer():
+    """
+    Session-scoped autouse fixture that drains the background PNG writer.
+
+    take_screenshot() returns as soon as the frame is captured and
+    validated; encoding and disk writes finish in the background. At the
+    end of the session this waits for all of them and fails loudly if any
+    write went wrong, so a missing PNG can never pass silently.
+    """
+    yield
+    written = flush_pending_writes()
+    print(f"\n[fixture] Flushed {len(written)} screenshot write(s)")
 
 
 @pytest.fixture(scope="module")
-def driver():
+def device_profile():
+    """
+    Returns the device profile dict used by the current test module.
+    Tests use this to pass to take_screenshot().
+
+    Selected with $TIDERUNNER_DEVICE_PROFILE (set by run_parallel.py);
+    defaults to PIXEL_4.
+    """
+    return active_device_profile()
+
+
+@pytest.fixture(scope="module")
+def driver(device_profile):
     """
     Module-scoped Appium WebDriver fixture.
 
@@ -68,32 +209,49 @@ def driver():
     across all screenshot captures. This avoids the 10–15 s restart
     penalty between every individual shot.
 
+    With $TIDERUNNER_SESSION_BROKER set, the warm session held by
+    session_broker.py is reused instead, and left running on teardown so
+    the next run can attach to it too.
+
+    Also streams the app's logcat readiness markers (helpers/logcat.py)
+    for the session's device, so conditions loads are awaited on the
+    marker rather than by polling the UI, and starts the app watchdog
+    (helpers/watchdog.py) that the per-test health check relies on.
+
     Yields the driver, then quits the session on teardown.
     """
-    options = _build_options(PIXEL_4)
+    brokered = False
+    url = broker_url()
+    if url:
+        try:
+            drv = acquire_session(device_profile, url)
+            brokered = True
+        except ConnectionError as e:
+            print(f"\n[fixture] ⚠️  {e} — opening a fresh session")
 
-    print(f"\n[fixture] Connecting to Appium at {APPIUM_HOST}...")
-    drv = webdriver.Remote(APPIUM_HOST, options=options)
+    if not brokered:
+        print(f"\n[fixture] Connecting to Appium at {APPIUM_HOST} ({device_profile['device_name']})...")
+        drv = create_session(device_profile)
+
+    logcat.start_reader(device_serial(drv))
+    watchdog.start_watchdog(device_serial(drv), APP_PACKAGE)
 
     # Allow the app to fully launch and render before any test runs
-    time.sleep(4)
+    wait_for_ui_idle(drv, ceiling=10.0, label="app launch")
     print("[fixture] App launched — ready for screenshot capture")
 
     yield drv
 
+    print_capture_report()
+    logcat.stop_reader()
+    watchdog.stop_watchdog()
+    if brokered:
+        print("\n[fixture] Leaving brokered session running for the next run")
+        return
     print("\n[fixture] Tearing down Appium session")
     drv.quit()
 
 
-@pytest.fixture(scope="module")
-def device_profile():
-    """
-    Returns the device profile dict used by the current test module.
-    Tests use this to pass to take_screenshot().
-    """
-    return PIXEL_4
-
-
 @pytest.fixture(scope="module")
 def app_guard(driver):
     """
@@ -120,12 +278,22 @@ def auto_app_health_check(request, driver):
     (e.g. an OS dialog pushed it back), it will be automatically
     restarted so the test still has a valid app to interact with.
 
+    With the adb watchdog running this is a local flag check — no device
+    round trip unless something actually went wrong. Crashes and ANRs
+    during a test are reported against that test.
+
     This means you never need to manually call app_guard() — it happens
     silently before every single test.
     """
     # Only run the guard for tests that receive the 'driver' fixture
     # (i.e. actual screenshot tests, not collection-only runs)
-    if "driver" in request.fixturenames:
-        ensure_app_running(driver, APP_PACKAGE, APP_ACTIVITY)
-
-
+    if "driver" not in request.fixturenames:
+        yield
+        return
+    ensure_app_running(driver, APP_PACKAGE, APP_ACTIVITY)
+    wd = watchdog.active_watchdog()
+    seen = wd.incident_count if wd else 0
+    yield
+    if wd is not None:
+        for incident in wd.incidents_since(seen):
+            print(f"\n[watchdog] ⚠️  App {incident} during {request.node.name}")
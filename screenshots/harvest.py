@@ -0,0 +1,195 @@
+"""
+Bulk forecast harvest across location × species × forecast day.
+
+Sweeps every preset in config/locations.ALL_LOCATIONS, every species in
+config/species.ALL_SPECIES and every day of the 10-day date strip, and
+writes one CSV row per combination: suitability rating and score plus the
+panel's marine, tide and sun/moon values. Used to regression-check the
+suitability engine against the app as shipped.
+
+Each combination is read from a single hierarchy dump — no screenshots,
+no scrolling. The session reports invisible elements, so sections below
+the fold are in the same dump.
+
+State is carried between steps by the same ShotExecutor the screenshot
+suite uses: each location is loaded once, then only the species (outer)
+and the date card (inner) change. With the logcat reader running, a
+species switch is awaited on the app's suitability-updated marker.
+
+Rows are flushed as they are read. Rerunning with the same --out resumes
+after the last combination already in the file.
+
+Usage (from the screenshots/ directory, with Appium and the emulator up):
+    python harvest.py
+    python harvest.py --locations NEUSE_RIVER_POINT FRYING_PAN_TOWER --days 3
+    python harvest.py --species "Cobia" "Wahoo" --out output/harvest/offshore.csv
+"""
+
+import argparse
+import csv
+import datetime
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import config.locations as locations
+from config.devices import APP_ACTIVITY, APP_PACKAGE, active_device_profile
+from config.species import ALL_SPECIES
+from helpers import logcat, screenshot, watchdog
+from helpers.app_guard import ensure_app_running
+from helpers.capture import device_serial
+from helpers.hierarchy import HierarchySnapshot
+from helpers.session import create_session
+from helpers.shot_executor import LocationLoadError, ShotExecutor
+from helpers.shot_plan import Shot
+from screens.conditions_panel import CONDITION_LABELS, ConditionsPanel
+
+# Days in the app's forecast date strip
+FORECAST_DAYS = 10
+
+# Longest to wait for the app to log a species' suitability recalculation
+_SUITABILITY_TIMEOUT = 5.0
+
+KEY_COLUMNS = ["location", "species", "day"]
+COLUMNS = (
+    KEY_COLUMNS
+    + ["date", "lat", "lon", "rating", "score"]
+    + list(CONDITION_LABELS.values())
+    + ["shown_date", "data_source", "harvested_at"]
+)
+
+
+def preset_name(location: dict) -> str:
+    """The config.locations variable name of a preset dict (e.g. "FRYING_PAN_TOWER")."""
+    return next(name for name, value in vars(locations).items() if value is location)
+
+
+def harvest_steps(location_names: list[str], species: list[str], days: int) -> list[Shot]:
+    """
+    One Shot per combination, in sweep order. The section is the date
+    strip, which is visible whenever the panel is expanded, so no step
+    scrolls.
+    """
+    combinations = [
+        (location, name, day)
+        for location in location_names
+        for name in species
+        for day in range(days)
+    ]
+    return [
+        Shot({
+            "filename": f"harvest_{index:05d}",
+            "location": location,
+            "species": name,
+            "date": day,
+            "section": "date_selector",
+        }, index)
+        for index, (location, name, day) in enumerate(combinations)
+    ]
+
+
+def _done_keys(path: Path) -> set[tuple[str, str, str]]:
+    if not path.exists():
+        return set()
+    with open(path, newline="", encoding="utf-8") as f:
+        return {tuple(row[c] for c in KEY_COLUMNS) for row in csv.DictReader(f)}
+
+
+def harvest(driver, device_profile: dict, steps: list[Shot], out: Path) -> int:
+    """Run `steps`, appending a row per step to `out`. Returns rows written."""
+    executor = ShotExecutor(driver, device_profile)
+    panel = ConditionsPanel(driver, device_profile)
+    done = _done_keys(out)
+    if done:
+        print(f"[harvest] {len(done)} combination(s) already in {out.name} — resuming")
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not out.exists() or out.stat().st_size == 0
+    written = 0
+    failed_locations: set[str] = set()
+    started = time.perf_counter()
+
+    with open(out, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        if new_file:
+            writer.writeheader()
+
+        for step in steps:
+            if (step.location, step.species, str(step.date)) in done or step.location in failed_locations:
+                continue
+            ensure_app_running(driver, APP_PACKAGE, APP_ACTIVITY)
+
+            reader = logcat.active_reader()
+            since = reader.mark() if reader else 0
+            species_changes = executor.state["species"] != step.species
+            try:
+                executor.prepare(step)
+            except LocationLoadError as e:
+                print(f"[harvest] ⚠️  {e} — skipping {step.location}")
+                failed_locations.add(step.location)
+                continue
+            if reader and species_changes:
+                reader.wait_for(
+                    "suitability-updated", lambda e: e.detail == step.species,
+                    timeout=_SUITABILITY_TIMEOUT, since=since,
+                )
+
+            values = panel.read_conditions(HierarchySnapshot.capture(driver))
+            lat, lon = step.coords
+            day = datetime.date.today() + datetime.timedelta(days=step.date)
+            writer.writerow({
+                "location": step.location, "species": step.species, "day": step.date,
+                "date": day.isoformat(), "lat": lat, "lon": lon,
+                **values,
+                "harvested_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            })
+            f.flush()
+            written += 1
+            print(f"[harvest] {step.location} / {step.species} / +{step.date}d: "
+                  f"{values['rating']} {values['score']}")
+
+    elapsed = time.perf_counter() - started
+    rate = f" ({elapsed / written:.2f}s each)" if written else ""
+    print(f"\n[harvest] {written} row(s) in {elapsed:.0f}s{rate} → {out}")
+    executor.report()
+    return written
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", nargs="+", help="preset names from config/locations.py (default: ALL_LOCATIONS)")
+    parser.add_argument("--species", nargs="+", help="species names (default: every species)")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS, help="forecast days from today (default: 10)")
+    parser.add_argument("--out", type=Path, help="CSV path (default: output/harvest/<folder>_<today>.csv)")
+    args = parser.parse_args()
+
+    location_names = args.locations or [preset_name(loc) for loc in locations.ALL_LOCATIONS]
+    species = args.species or ALL_SPECIES
+    days = max(1, min(args.days, FORECAST_DAYS))
+    profile = active_device_profile()
+    out = args.out or (
+        screenshot.OUTPUT_ROOT / "harvest" / f"{profile['output_folder']}_{datetime.date.today()}.csv"
+    )
+    steps = harvest_steps(location_names, species, days)
+    print(f"[harvest] {len(location_names)} location(s) × {len(species)} species × {days} day(s) "
+          f"= {len(steps)} combinations")
+
+    driver = create_session(profile)
+    try:
+        # One dump must cover the whole panel, including sections below the fold
+        driver.update_settings({"allowInvisibleElements": True})
+        logcat.start_reader(device_serial(driver))
+        watchdog.start_watchdog(device_serial(driver), APP_PACKAGE)
+        harvest(driver, profile, steps, out)
+    finally:
+        logcat.stop_reader()
+        watchdog.stop_watchdog()
+        driver.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,9 +12,16 @@ TideRunner's MapScreen uses for the "My Location" FAB. No ADB console port
 is required — the command goes through the UiAutomator2 server.
 """
 
-import time
-
 from appium.webdriver import Remote as AppiumDriver
+from selenium.common.exceptions import WebDriverException
+
+from helpers.settle import wait_until
+
+# Max time to wait for the device to report the injected fix (seconds)
+_LOCATION_SETTLE_CEILING = 1.5
+
+# Coordinates are compared with this tolerance (≈ 1 m)
+_LOCATION_TOLERANCE_DEG = 1e-5
 
 
 def set_appium_location(
@@ -38,5 +45,17 @@ def set_appium_location(
     """
     driver.set_location(lat, lon, altitude)
     print(f"[location] Set via Appium geolocation: lat={lat}, lon={lon}, alt={altitude}")
-    # Give FusedLocationProviderClient a moment to pick up the new fix
-    time.sleep(1.5)
+
+    # Wait until the device reports the new fix rather than a blind 1.5 s
+    def _fix_applied() -> bool:
+        try:
+            current = driver.location
+        except WebDriverException:
+            return False
+        return (
+            abs(current.get("latitude", 0.0) - lat) < _LOCATION_TOLERANCE_DEG
+            and abs(current.get("longitude", 0.0) - lon) < _LOCATION_TOLERANCE_DEG
+        )
+
+    if not wait_until(_fix_applied, ceiling=_LOCATION_SETTLE_CEILING, poll_interval=0.1):
+        print("[location] ⚠️  Device did not report the new fix in time — continuing")
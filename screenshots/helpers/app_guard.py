@@ -5,13 +5,29 @@ Used before each screenshot capture to guarantee we're not taking a blank
 screen, a crashed app, or the wrong activity.
 """
 
-import time
 import subprocess
 
 from appium.webdriver import Remote as AppiumDriver
-from appium.webdriver.common.appiumby import AppiumBy
 from selenium.common.exceptions import WebDriverException
 
+from helpers.hierarchy import HierarchySnapshot
+from helpers.settle import wait_for_ui_idle, wait_until
+from helpers.watchdog import active_watchdog
+
+# Number of full restarts performed by ensure_app_running(). A restart wipes
+# the app's in-memory state (location, species, scroll), so anything that
+# tracks that state compares this counter to know when to start over.
+_restart_count = 0
+
+# Recovery ceilings (seconds); each wait ends as soon as the app reports back
+_RESUME_CEILING = 5.0
+_STOP_CEILING = 5.0
+_RESTART_CEILING = 15.0
+
+
+def restart_count() -> int:
+    return _restart_count
+
 
 def get_foreground_package(driver: AppiumDriver) -> str | None:
     """
@@ -36,6 +52,16 @@ def is_app_in_foreground(driver: AppiumDriver, app_package: str) -> bool:
     return result
 
 
+def _wait_for_foreground(driver: AppiumDriver, app_package: str, ceiling: float, watchdog) -> bool:
+    if watchdog is not None:
+        return watchdog.wait_until_foreground(ceiling)
+    return wait_until(
+        lambda: get_foreground_package(driver) == app_package,
+        ceiling=ceiling,
+        poll_interval=0.25,
+    )
+
+
 def ensure_app_running(driver: AppiumDriver, app_package: str, app_activity: str) -> None:
     """
     Ensures the TideRunner app is running and in the foreground.
@@ -44,98 +70,101 @@ def ensure_app_running(driver: AppiumDriver, app_package: str, app_activity: str
     activity, this will bring it back to the foreground or restart it.
 
     Strategy:
-      1. Check if the correct package is in the foreground.
-      2. If not — try activate_app() first (fast resume).
-      3. If that fails or the wrong activity is showing — full restart
-         via terminate + activate.
+      1. Check the app's health — from the adb watchdog's local flag when
+         helpers/watchdog.py is running (no device round trip), otherwise
+         by asking Appium for the foreground package.
+      2. If it was only backgrounded — try activate_app() first (fast resume).
+      3. If that fails, or the app crashed or stopped responding — full
+         restart via terminate + activate.
+
+    Every recovery step waits for the app to report back (up to a ceiling)
+    rather than sleeping for a fixed time.
 
     Args:
         driver:       Active Appium WebDriver.
         app_package:  e.g. "com.fishing.conditions.debug"
         app_activity: e.g. "com.fishing.conditions.ui.MainActivity"
     """
-    if is_app_in_foreground(driver, app_package):
+    global _restart_count
+    watchdog = active_watchdog()
+    if watchdog is not None:
+        if watchdog.healthy:
+            return  # All good
+        print(f"[guard] Watchdog: app {watchdog.describe()}")
+        problem = watchdog.problem
+        if not watchdog.running:
+            # A cold start loses the in-memory state just like a restart
+            _restart_count += 1
+    elif is_app_in_foreground(driver, app_package):
         return  # All good
+    else:
+        problem = None
 
-    print(f"[guard] App not in foreground — attempting to resume...")
-
-    try:
-        # Fast path: bring existing instance to foreground
-        driver.activate_app(app_package)
-        time.sleep(2.0)
-
-        if is_app_in_foreground(driver, app_package):
-            print(f"[guard] App resumed successfully via activate_app()")
-            return
-    except WebDriverException as e:
-        print(f"[guard] activate_app() failed: {e}")
+    if problem is None:
+        print(f"[guard] App not in foreground — attempting to resume...")
+        try:
+            # Fast path: bring existing instance to foreground
+            driver.activate_app(app_package)
+            if _wait_for_foreground(driver, app_package, _RESUME_CEILING, watchdog):
+                print(f"[guard] App resumed successfully via activate_app()")
+                return
+        except WebDriverException as e:
+            print(f"[guard] activate_app() failed: {e}")
 
     # Slow path: full restart
+    _restart_count += 1
     print(f"[guard] Performing full app restart...")
     try:
         driver.terminate_app(app_package)
-        time.sleep(1.0)
+        if watchdog is not None:
+            watchdog.wait_until_stopped(_STOP_CEILING)
     except WebDriverException:
         pass  # Already dead — that's fine
+    if watchdog is not None:
+        watchdog.acknowledge()
 
     try:
         driver.activate_app(app_package)
-        time.sleep(3.0)
-        print(f"[guard] App restarted successfully")
+        if _wait_for_foreground(driver, app_package, _RESTART_CEILING, watchdog):
+            wait_for_ui_idle(driver, ceiling=10.0, label="app restart")
+            print(f"[guard] App restarted successfully")
+        else:
+            print(f"[guard] ⚠️  App not in foreground {_RESTART_CEILING:.0f}s after restart")
     except WebDriverException as e:
         print(f"[guard] ⚠️  Could not restart app: {e}")
 
 
-def verify_screen_elements(driver: AppiumDriver, expected_elements: list[str]) -> list[str]:
+def verify_screen_elements(
+    driver: AppiumDriver,
+    expected_elements: list[str],
+    snapshot: HierarchySnapshot | None = None,
+) -> list[str]:
     """
     Checks that the expected UI elements are currently visible on screen.
 
+    The page source is fetched once and every expected string is matched
+    locally against it (exact text, then text contains, then accessibility
+    id), rather than making up to three Appium round trips per string.
+
     Args:
         driver:            Active Appium WebDriver.
         expected_elements: List of text strings or accessibility IDs that
                            should be visible before taking a screenshot.
+        snapshot:          Optional snapshot of the current screen to reuse.
+                           One is captured if not given.
 
     Returns:
         List of elements that were NOT found (empty = all present = good).
     """
+    if snapshot is None:
+        snapshot = HierarchySnapshot.capture(driver)
+
     missing = []
     for element_text in expected_elements:
-        found = False
-
-        # Try exact text match first
-        try:
-            driver.find_element(
-                AppiumBy.ANDROID_UIAUTOMATOR,
-                f'new UiSelector().text("{element_text}")'
-            )
-            found = True
-        except Exception:
-            pass
-
-        # Fall back to text contains
-        if not found:
-            try:
-                driver.find_element(
-                    AppiumBy.ANDROID_UIAUTOMATOR,
-                    f'new UiSelector().textContains("{element_text}")'
-                )
-                found = True
-            except Exception:
-                pass
-
-        # Fall back to accessibility ID
-        if not found:
-            try:
-                driver.find_element(AppiumBy.ACCESSIBILITY_ID, element_text)
-                found = True
-            except Exception:
-                pass
-
-        if not found:
+        if snapshot.contains(element_text):
+            print(f"[verify] ✅  Found: '{element_text}'")
+        else:
             missing.append(element_text)
             print(f"[verify] ⚠️  Expected element not found: '{element_text}'")
-        else:
-            print(f"[verify] ✅  Found: '{element_text}'")
 
     return missing
-
@@ -0,0 +1,84 @@
+"""
+Per-app locale switching over adb.
+
+Android 13 (API 33) and later keep a locale per app, set from the shell
+with `cmd locale set-app-locales`. Changing it recreates the app's
+activity in the new locale. The process, its ViewModels and the Appium
+session all stay alive, and the panel and date strip keep their saveable
+state. The rebuilt map restores its camera and location pin from
+MapViewModel, so a shot's screen comes back ready to capture. Nothing is
+reinstalled, and the system locale is left alone.
+
+As with a theme switch (helpers/ui_mode.py), waits started right after the
+command could settle on the old activity's frames, so switch() first waits
+for the watchdog to see the activity relaunched and for the pixels to change.
+
+An empty locale list returns the app to the system locale.
+"""
+
+import re
+import time
+
+import adbutils
+from appium.webdriver import Remote as AppiumDriver
+
+from helpers import strings, watchdog
+from helpers.settle import wait_for_ui_idle
+from helpers.stability import sample_frame, wait_for_frame_change
+
+# First API level with per-app locales
+PER_APP_LOCALE_SDK = 33
+
+# Longest to wait for the activity relaunch, and then for the redraw (seconds)
+_RELAUNCH_TIMEOUT = 5.0
+_REDRAW_TIMEOUT = 5.0
+
+_LOCALES_RE = re.compile(r"\[(.*)\]")
+
+
+class AppLocale:
+    """Reads and sets one app's locale on one device."""
+
+    def __init__(self, serial: str | None, package: str) -> None:
+        self._device = adbutils.adb.device(serial=serial)
+        self._package = package
+        sdk = int(self._device.shell("getprop ro.build.version.sdk").strip() or 0)
+        if sdk < PER_APP_LOCALE_SDK:
+            raise RuntimeError(
+                f"Per-app locales need Android 13 (API {PER_APP_LOCALE_SDK}) or later; "
+                f"{self._device.serial} runs API {sdk}"
+            )
+
+    def current(self) -> str | None:
+        """The app's own locale tag, or None when it follows the system locale."""
+        output = self._device.shell(f"cmd locale get-app-locales {self._package}")
+        match = _LOCALES_RE.search(output)
+        if match is None:
+            return None
+        return match.group(1).split(",")[0] or None
+
+    def switch(self, driver: AppiumDriver, locale: str | None) -> float:
+        """
+        Put the app in `locale` (None = system locale), wait for its activity
+        to come back, and resolve lookups in that locale from then on.
+
+        Returns:
+            Seconds the switch took.
+        """
+        start = time.monotonic()
+        if self.current() != locale:
+            label = f"locale {locale or 'system'}"
+            wd = watchdog.active_watchdog()
+            relaunches = wd.relaunch_count if wd is not None else 0
+            before = sample_frame(driver)
+            self._device.shell(
+                f"cmd locale set-app-locales {self._package} --locales '{locale or ''}'"
+            )
+            if wd is not None and not wd.wait_for_relaunch(relaunches, _RELAUNCH_TIMEOUT):
+                print(f"[locale] ⚠️  No activity relaunch within {_RELAUNCH_TIMEOUT:.0f}s")
+            wait_for_frame_change(driver, before, ceiling=_REDRAW_TIMEOUT, label=label)
+            wait_for_ui_idle(driver, label=label)
+        strings.set_locale(locale)
+        elapsed = time.monotonic() - start
+        print(f"[locale] App locale {locale or 'system default'} ({elapsed:.1f}s)")
+        return elapsed
@@ -0,0 +1,266 @@
+"""
+Screen capture backends.
+
+Two ways to get the pixels of the current frame:
+
+  appium — driver.get_screenshot_as_png(). The device encodes a PNG, the
+           UiAutomator2 server base64s it, Appium relays it over HTTP and
+           Python decodes it again. Always available.
+  adb    — `adb exec-out screencap` (raw, no -p) through adbutils. The raw
+           RGBA framebuffer comes straight over the adb socket and is
+           encoded to PNG on the host, skipping the on-device PNG encode
+           and the base64/HTTP hop.
+
+Pick one with $TIDERUNNER_CAPTURE_BACKEND ("adb", "appium" or "auto",
+the default). "auto" uses adb when the session's device is reachable and
+falls back to Appium for the rest of the session on the first adb error.
+
+Backends return a CapturedFrame. Its size is known immediately; the PNG
+encode is deferred to frame.encode() so it can run off the test thread
+(see helpers/screenshot.py).
+
+Every capture records wall-clock latency and host CPU time per backend;
+print_capture_report() summarises them at the end of a run.
+"""
+
+import io
+import os
+import statistics
+import struct
+import time
+
+import adbutils
+from appium.webdriver import Remote as AppiumDriver
+from PIL import Image
+
+CAPTURE_BACKEND_ENV = "TIDERUNNER_CAPTURE_BACKEND"
+
+# screencap pixel format id for RGBA_8888 (android.graphics.PixelFormat)
+_PIXEL_FORMAT_RGBA_8888 = 1
+
+# zlib level for host-side encoding. Level 1 is several times faster than
+# the default 6 at 1080x2280 for a few percent larger files.
+_PNG_COMPRESS_LEVEL = 1
+
+# 8-byte PNG signature followed by the IHDR chunk length and type
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_IHDR_PREFIX = b"\x00\x00\x00\rIHDR"
+
+# backend name -> list of (wall seconds, host cpu seconds)
+_STATS: dict[str, list[tuple[float, float]]] = {}
+
+# session id -> backend chosen for that session
+_SESSION_BACKENDS: dict[str, "AppiumCapture | AdbFramebufferCapture"] = {}
+
+
+def png_dimensions(png_bytes: bytes) -> tuple[int, int]:
+    """
+    Read (width, height) straight from a PNG's IHDR header, without
+    decoding the image.
+
+    Raises:
+        ValueError: If the bytes are not a PNG.
+    """
+    if png_bytes[:8] != _PNG_SIGNATURE or png_bytes[8:16] != _IHDR_PREFIX:
+        raise ValueError("Not a PNG (missing signature or IHDR chunk)")
+    return struct.unpack(">II", png_bytes[16:24])
+
+
+class CapturedFrame:
+    """
+    One captured frame. Holds either finished PNG bytes or raw RGBA pixels;
+    width and height are always available without decoding.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        png_bytes: bytes | None = None,
+        rgba: bytes | None = None,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self._png_bytes = png_bytes
+        self._rgba = rgba
+
+    @classmethod
+    def from_png(cls, png_bytes: bytes) -> "CapturedFrame":
+        width, height = png_dimensions(png_bytes)
+        return cls(width, height, png_bytes=png_bytes)
+
+    def to_image(self) -> Image.Image:
+        """The frame as a PIL image (raw frames are wrapped without a copy)."""
+        if self._rgba is not None:
+            return Image.frombuffer(
+                "RGBA", (self.width, self.height), self._rgba, "raw", "RGBA", 0, 1
+            )
+        return Image.open(io.BytesIO(self._png_bytes))
+
+    def encode(self, optimize: bool = False) -> bytes:
+        """
+        Return PNG bytes for the frame. Raw frames are encoded here;
+        finished PNGs are returned as-is unless `optimize` asks for a
+        smaller re-encode.
+        """
+        if self._png_bytes is not None and not optimize:
+            return self._png_bytes
+        img = self.to_image()
+        buf = io.BytesIO()
+        # Play Store rejects screenshots with an alpha channel
+        options = {"optimize": True} if optimize else {"compress_level": _PNG_COMPRESS_LEVEL}
+        img.convert("RGB").save(buf, format="PNG", **options)
+        return buf.getvalue()
+
+
+class AppiumCapture:
+    """Capture through the Appium screenshot endpoint."""
+
+    name = "appium"
+
+    def __init__(self, driver: AppiumDriver) -> None:
+        self._driver = driver
+
+    def grab(self) -> CapturedFrame:
+        return CapturedFrame.from_png(self._driver.get_screenshot_as_png())
+
+
+class AdbFramebufferCapture:
+    """Capture the raw framebuffer over adb and encode the PNG on the host."""
+
+    name = "adb"
+
+    def __init__(self, serial: str | None) -> None:
+        self._device = adbutils.adb.device(serial=serial)
+
+    def read_raw(self) -> tuple[int, int, bytes]:
+        """
+        Return (width, height, RGBA bytes) for the current frame.
+
+        screencap's raw output is a little-endian header followed by the
+        pixels: width, height, format — plus a colour-space word on
+        Android 9+, which is why the header length is inferred.
+        """
+        conn = self._device.open_transport()
+        try:
+            conn.send_command("exec:screencap")
+            conn.check_okay()
+            data = conn.read_until_close(encoding=None)
+        finally:
+            conn.close()
+
+        if len(data) < 12:
+            raise RuntimeError(f"screencap returned {len(data)} bytes")
+        width, height, pixel_format = struct.unpack_from("<III", data, 0)
+        if pixel_format != _PIXEL_FORMAT_RGBA_8888:
+            raise RuntimeError(f"Unsupported screencap pixel format {pixel_format}")
+
+        pixel_bytes = width * height * 4
+        header = len(data) - pixel_bytes
+        if header not in (12, 16):
+            raise RuntimeError(
+                f"Unexpected screencap size {len(data)} for {width}x{height}"
+            )
+        return width, height, data[header:]
+
+    def grab(self) -> CapturedFrame:
+        width, height, pixels = self.read_raw()
+        return CapturedFrame(width, height, rgba=pixels)
+
+
+def device_serial(driver: AppiumDriver) -> str | None:
+    """The adb serial of the session's device, as reported by UiAutomator2."""
+    caps = driver.capabilities or {}
+    return caps.get("deviceUDID") or caps.get("udid")
+
+
+def get_capture_backend(driver: AppiumDriver):
+    """
+    Return the capture backend for this driver's session, creating it on
+    first use according to $TIDERUNNER_CAPTURE_BACKEND.
+    """
+    backend = _SESSION_BACKENDS.get(driver.session_id)
+    if backend is not None:
+        return backend
+
+    choice = os.environ.get(CAPTURE_BACKEND_ENV, "auto").lower()
+    if choice == "appium":
+        backend = AppiumCapture(driver)
+    else:
+        try:
+            backend = AdbFramebufferCapture(device_serial(driver))
+        except Exception as e:
+            if choice == "adb":
+                raise
+            print(f"[capture] adb unavailable ({e}) — using Appium screenshots")
+            backend = AppiumCapture(driver)
+
+    print(f"[capture] Using '{backend.name}' capture backend")
+    _SESSION_BACKENDS[driver.session_id] = backend
+    return backend
+
+
+def capture_frame(driver: AppiumDriver) -> CapturedFrame:
+    """
+    Capture the current frame with the session's backend, falling back to
+    Appium if the adb path fails in "auto" mode.
+    """
+    backend = get_capture_backend(driver)
+    try:
+        return _timed(backend)
+    except Exception as e:
+        if backend.name == "appium" or os.environ.get(CAPTURE_BACKEND_ENV) == "adb":
+            raise
+        print(f"[capture] ⚠️  adb capture failed ({e}) — falling back to Appium")
+        fallback = AppiumCapture(driver)
+        _SESSION_BACKENDS[driver.session_id] = fallback
+        return _timed(fallback)
+
+
+def capture_png(driver: AppiumDriver) -> bytes:
+    """Capture the current frame and encode it to PNG on the calling thread."""
+    return capture_frame(driver).encode()
+
+
+def _timed(backend) -> CapturedFrame:
+    """Grab a frame, recording the critical-path latency and host CPU."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    frame = backend.grab()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    _STATS.setdefault(backend.name, []).append((wall, cpu))
+    print(f"[capture] {backend.name}: {wall * 1000:.0f} ms wall, {cpu * 1000:.0f} ms host CPU")
+    return frame
+
+
+def benchmark_backends(driver: AppiumDriver, shots: int = 5) -> None:
+    """
+    Capture the current screen `shots` times with each backend and print
+    the comparison. Useful when deciding whether adb is worth it on a host.
+    """
+    backends = [AppiumCapture(driver)]
+    try:
+        backends.append(AdbFramebufferCapture(device_serial(driver)))
+    except Exception as e:
+        print(f"[capture] adb backend unavailable for benchmark: {e}")
+    for backend in backends:
+        for _ in range(shots):
+            _timed(backend)
+    print_capture_report()
+
+
+def print_capture_report() -> None:
+    """Print per-backend capture latency and host CPU for this run."""
+    if not _STATS:
+        return
+    print("\n[capture] Backend     shots  median wall  max wall  median CPU")
+    for name, samples in _STATS.items():
+        walls = [w for w, _ in samples]
+        cpus = [c for _, c in samples]
+        print(
+            f"[capture] {name:<10} {len(samples):>6} "
+            f"{statistics.median(walls) * 1000:>9.0f} ms "
+            f"{max(walls) * 1000:>6.0f} ms "
+            f"{statistics.median(cpus) * 1000:>8.0f} ms"
+        )
@@ -0,0 +1,242 @@
+"""
+Content-addressed capture store and per-shot input keys.
+
+Incremental capture rests on two pieces:
+
+Input keys — CaptureInputs hashes everything a shot's pixels depend on:
+
+    APK          sha256 of the APK installed on the device (adb)
+    device       the device profile (minus run-only settings like ports)
+    locale       the device's system locale, or the locale matrix
+    theme        the device's night mode, or the theme variants
+    shot         the manifest entry: location, species, date, section, …
+    data         the recorded API fixtures for the shot's location, or
+                 today's date when running against the live APIs
+
+helpers/checkpoint.py stores the key with every passed shot, and a rerun
+skips any shot whose key is unchanged.
+
+Store — every PNG is written once to output/.store/<sha256>.png, sharded
+by the first two hex digits. The named files under output/<output_folder>/
+are hard links into the store, or copies where the filesystem cannot link.
+A recapture that produces the same bytes rewrites nothing. collect_garbage()
+replaces the old wipe of the output folder: it removes PNGs that are no
+longer in the manifest, then store entries that no named file refers to.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import adbutils
+
+import config.locations as locations
+from helpers import fixture_server
+from helpers.shot_plan import Shot
+from helpers.ui_mode import device_night_mode
+
+STORE_DIR = ".store"
+
+# Profile keys that change how a run connects, not what it captures
+_RUN_ONLY_KEYS = {"system_port", "chromedriver_port", "udid", "avd_name"}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+def blob_path(output_root: Path, digest: str) -> Path:
+    return output_root / STORE_DIR / digest[:2] / f"{digest}.png"
+
+
+def store_and_link(output_root: Path, png_bytes: bytes, dest: Path) -> bool:
+    """
+    Put `png_bytes` in the store and make `dest` refer to it.
+
+    Returns:
+        False if `dest` already held exactly these bytes (nothing written).
+    """
+    digest = _sha256(png_bytes)
+    blob = blob_path(output_root, digest)
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f"{blob.name}.{os.getpid()}.{threading.get_ident()}.part")
+        tmp.write_bytes(png_bytes)
+        os.replace(tmp, blob)
+
+    if dest.exists() and (os.path.samefile(dest, blob) or _file_sha256(dest) == digest):
+        return False
+
+    # Link next to the destination and rename, so a crash never leaves a
+    # half-written PNG under the final name
+    tmp = dest.with_suffix(".png.part")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, dest)
+    return True
+
+
+def collect_garbage(output_root: Path, folder: Path, keep: set[str]) -> tuple[int, int, int]:
+    """
+    Remove PNGs in `folder` whose names are not in `keep` (paths relative to
+    `folder` without extension, e.g. "03_tide" or "de-DE/03_tide"), then
+    every store entry no named PNG under the output root still refers to.
+    Only `folder` and the subfolders named in `keep` are swept, so a run
+    without a locale matrix leaves the locale folders alone.
+
+    Returns:
+        (named PNGs removed, store entries removed, store bytes freed)
+    """
+    removed_pngs = 0
+    swept = {folder} | {folder / Path(name).parent for name in keep}
+    for directory in swept:
+        if not directory.exists():
+            continue
+        for f in directory.glob("*.png.part"):
+            f.unlink()
+        for f in directory.glob("*.png"):
+            if f.relative_to(folder).with_suffix("").as_posix() not in keep:
+                f.unlink()
+                removed_pngs += 1
+
+    store = output_root / STORE_DIR
+    if not store.exists():
+        return removed_pngs, 0, 0
+
+    referenced = {
+        _file_sha256(f)
+        for f in output_root.rglob("*.png")
+        # .store itself, and caches such as the compositor's .layers
+        if not any(part.startswith(".") for part in f.relative_to(output_root).parts)
+    }
+    removed_blobs = freed = 0
+    for blob in store.glob("*/*"):
+        if blob.name.endswith(".part") or blob.stem not in referenced:
+            freed += blob.stat().st_size
+            blob.unlink()
+            removed_blobs += 1
+    for shard in store.iterdir():
+        if shard.is_dir() and not any(shard.iterdir()):
+            shard.rmdir()
+    return removed_pngs, removed_blobs, freed
+
+
+# ---------------------------------------------------------------------------
+# Input keys
+# ---------------------------------------------------------------------------
+
+def installed_apk_hash(serial: str | None, package: str) -> str | None:
+    """sha256 of the package's base APK on the device, or None without adb."""
+    try:
+        device = adbutils.adb.device(serial=serial)
+        path = device.shell(f"pm path {package}").strip().splitlines()
+        base = next((p[len("package:"):] for p in path if p.endswith("base.apk")), None)
+        if base is None and path:
+            base = path[0][len("package:"):]
+        if not base:
+            return None
+        output = device.shell(f"sha256sum {base}").split()
+        return output[0] if output else None
+    except Exception:
+        return None
+
+
+def device_locale(serial: str | None) -> str | None:
+    """The device's system locale (e.g. "en-US"), or None without adb."""
+    try:
+        device = adbutils.adb.device(serial=serial)
+        for prop in ("persist.sys.locale", "ro.product.locale"):
+            value = device.shell(f"getprop {prop}").strip()
+            if value:
+                return value
+    except Exception:
+        pass
+    return None
+
+
+def _tree_hash(paths: list[Path]) -> str:
+    digest = hashlib.sha256()
+    for root in paths:
+        if not root.exists():
+            continue
+        for f in sorted(p for p in root.rglob("*") if p.is_file()):
+            digest.update(str(f.relative_to(root.parent)).encode("utf-8"))
+            digest.update(f.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class CaptureInputs:
+    """
+    Everything outside the manifest that a run's screenshots depend on,
+    read once per run, and the per-shot key built from it.
+    """
+
+    def __init__(self, device_profile: dict, serial: str | None, package: str,
+                 locales: list[str] | None = None, themes: list[str] | None = None) -> None:
+        self.apk = installed_apk_hash(serial, package)
+        # Variant captures set the app locale and night mode themselves
+        self.locale = ",".join(locales) if locales else device_locale(serial)
+        self.theme = ",".join(themes) if themes else device_night_mode(serial)
+        self.profile = {k: v for k, v in device_profile.items() if k not in _RUN_ONLY_KEYS}
+        self.fixture_date = self._fixture_date()
+        self._data_hashes: dict[str | None, str] = {}
+
+    @staticmethod
+    def _fixture_date() -> str | None:
+        setting = os.environ.get(fixture_server.FIXTURE_ENV)
+        if not setting:
+            return None
+        if setting != "latest":
+            return setting
+        dates = fixture_server.recorded_dates()
+        return dates[-1] if dates else None
+
+    def data_hash(self, location: str | None) -> str:
+        """Hash of the API data a shot at `location` (preset name) is drawn from."""
+        if location not in self._data_hashes:
+            if self.fixture_date is None:
+                # Live APIs: assume the data holds for the day
+                self._data_hashes[location] = f"live:{datetime.date.today().isoformat()}"
+            else:
+                date_dir = fixture_server.FIXTURE_ROOT / self.fixture_date
+                dirs = [date_dir / fixture_server.SHARED_LOCATION]
+                if location is not None:
+                    slug = fixture_server.location_slug(getattr(locations, location)["name"])
+                    dirs.append(date_dir / slug)
+                self._data_hashes[location] = f"{self.fixture_date}:{_tree_hash(dirs)}"
+        return self._data_hashes[location]
+
+    def key(self, shot: Shot) -> str:
+        return hashlib.sha256(json.dumps({
+            "apk": self.apk or "unknown",
+            "device": self.profile,
+            "locale": self.locale or "unknown",
+            "theme": self.theme or "unknown",
+            "shot": shot.fingerprint,
+            "data": self.data_hash(shot.location),
+        }, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def describe(self) -> str:
+        apk = self.apk[:12] if self.apk else "unknown (no adb — APK changes go undetected)"
+        data = f"fixtures {self.fixture_date}" if self.fixture_date else "live APIs"
+        return (f"APK {apk}, locale {self.locale or 'unknown'}, "
+                f"night mode {self.theme or 'unknown'}, {data}")
@@ -0,0 +1,127 @@
+"""
+Per-device capture checkpoint.
+
+Records the outcome of every shot in output/<output_folder>/checkpoint.json
+as soon as it is known — for a passed shot, once its PNGs are on disk
+(see record_passed). The next run skips shots that already passed, so
+it resumes at the first missing or failed one instead of starting again
+from shot 1. One flaky API response costs that one shot, not the whole
+suite.
+
+A passed shot is only trusted if its PNG still exists and its input key
+is unchanged: the manifest entry plus the installed APK, device profile,
+locale and API fixture data (helpers/capture_store.CaptureInputs). Editing
+a shot in shots.toml, or re-recording one location's fixtures, recaptures
+just the shots concerned; a new APK recaptures everything. Pass --fresh
+to pytest, or delete the file, to recapture everything regardless.
+
+Shards of one profile (run_parallel.py --shards) share the file. Every
+update re-reads it under an exclusive lock and changes only its own
+entries, so concurrent shards do not overwrite each other's outcomes.
+"""
+
+import datetime
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+
+from helpers.capture_store import CaptureInputs
+from helpers.screenshot import OUTPUT_ROOT, when_written
+from helpers.shot_plan import Shot
+
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+class Checkpoint:
+    """
+    Shot outcomes for one device profile, written through on every update.
+    """
+
+    def __init__(self, path: Path, inputs: CaptureInputs | None = None, outputs=None) -> None:
+        self.path = path
+        self.inputs = inputs
+        # shot -> PNG names it produces (see ShotExecutor.output_names)
+        self.outputs = outputs or (lambda shot: [shot.filename])
+        self._lock = threading.Lock()
+        self._shots = self._read()
+
+    def _read(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8")).get("shots", {})
+        except ValueError:
+            print(f"[checkpoint] ⚠️  Ignoring unreadable {self.path.name}")
+            return {}
+
+    @classmethod
+    def for_profile(cls, device_profile: dict, inputs: CaptureInputs | None = None,
+                    outputs=None) -> "Checkpoint":
+        return cls(OUTPUT_ROOT / device_profile["output_folder"] / CHECKPOINT_NAME, inputs, outputs)
+
+    def key(self, shot: Shot) -> str:
+        """The shot's input key; just the manifest entry without CaptureInputs."""
+        return self.inputs.key(shot) if self.inputs is not None else shot.fingerprint
+
+    def is_done(self, shot: Shot) -> bool:
+        """True if the shot passed with the same inputs and its PNGs are still there."""
+        entry = self._shots.get(shot.filename)
+        if not entry or entry["status"] != "passed":
+            return False
+        if entry.get("key") != self.key(shot):
+            return False
+        return all((self.path.parent / f"{name}.png").exists() for name in self.outputs(shot))
+
+    def record(self, shot: Shot, status: str, message: str = "") -> None:
+        """Record a shot's outcome ("passed", "failed" or "skipped") and save."""
+        entry = {
+            "status": status,
+            "key": self.key(shot),
+            "message": message,
+            "at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        self._update(lambda shots: shots.update({shot.filename: entry}))
+
+    def record_passed(self, shot: Shot, written: list[Path]) -> None:
+        """
+        Record `shot` as passed once its PNGs in `written` are on disk.
+
+        take_screenshot() writes in the background; recording straight away
+        would let an older PNG under the same name pass is_done() if the run
+        dies before the new one lands. A failed write is recorded "failed".
+        """
+        def done(error: BaseException | None) -> None:
+            if error is None:
+                self.record(shot, "passed")
+            else:
+                self.record(shot, "failed", f"PNG write failed: {error!r}")
+
+        when_written(written, done)
+
+    def reset(self, shots: list[Shot] | None = None) -> None:
+        """Forget `shots`, or every shot when None."""
+        def forget(entries: dict) -> None:
+            if shots is None:
+                entries.clear()
+            for shot in shots or []:
+                entries.pop(shot.filename, None)
+
+        self._update(forget)
+
+    def pending(self, shots: list[Shot]) -> list[Shot]:
+        """Shots that still need capturing, in the given order."""
+        return [shot for shot in shots if not self.is_done(shot)]
+
+    def _update(self, change) -> None:
+        """Apply `change` to the entries on disk and write them back, under the file lock."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path.with_suffix(".json.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            shots = self._read()
+            change(shots)
+            tmp = self.path.with_suffix(f".json.{os.getpid()}.part")
+            tmp.write_text(json.dumps({"shots": shots}, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._shots = shots
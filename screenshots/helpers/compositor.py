@@ -0,0 +1,373 @@
+"""
+Play Store listing images: every capture framed, on a gradient, captioned.
+
+For every device profile, every manifest capture in output/<output_folder>/
+— locale subfolders and `_light` / `_dark` theme variants included — is
+composited from the template in listing.toml:
+
+  1. background   vertical gradient at the listing's canvas size
+  2. frame        device bezel with a drop shadow, around the screen area
+  3. screen       the capture, scaled and clipped to rounded corners
+  4. caption      marketing text from the shot filename, wrapped and centred
+
+and written to output/framed/<output_folder>/[<locale>/]<name>.png through
+the capture store.
+
+Everything that does not depend on the capture's pixels is a layer, cached
+in output/.layers/ under a hash of the template keys and content it is drawn
+from: the gradient per template, the frame and screen mask per template and
+screen size, the caption per text, font and size. Each worker process also
+keeps the layers it has loaded, so a listing draws each one once.
+
+A listing image is keyed by its template, caption and capture bytes; the
+keys are kept in output/framed/framed.json. Images whose key is unchanged
+are skipped without starting a worker, so after a recapture only the
+changed shots are redone, and a finished listing takes seconds. The rest
+are composited in a process pool across shots, profiles and locales.
+
+Usage (from the screenshots/ directory):
+    python -m helpers.compositor                   # all profiles
+    python -m helpers.compositor --profile phone
+    python -m helpers.compositor --force           # redo every image
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont
+
+SCRIPT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import ALL_DEVICE_PROFILES, get_device_profile
+from helpers import screenshot
+from helpers.capture_store import store_and_link
+from helpers.shot_plan import find_captures, load_manifest
+
+LISTING_PATH = SCRIPT_DIR / "listing.toml"
+FRAMED_DIR = "framed"
+LAYER_DIR = ".layers"
+INDEX_NAME = "framed.json"
+
+# Template keys each layer is drawn from
+_BACKGROUND_KEYS = ("canvas", "background")
+_FRAME_KEYS = ("canvas", "screen_top", "bezel", "corner_radius", "frame_color", "shadow")
+_CAPTION_KEYS = ("font", "font_sha", "font_size", "caption_width", "caption_lines",
+                 "line_spacing", "text_color")
+
+# Smallest caption size before a long caption is left to overflow its lines
+_MIN_FONT_SIZE = 24
+
+# Supersampling factor for anti-aliased rounded corners
+_SUPERSAMPLE = 4
+
+_NUMBER_RE = re.compile(r"^\d+_")
+
+# Layers loaded or drawn by this process, by cache name
+_LAYERS: dict[str, Image.Image] = {}
+
+
+def _hash(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Templates and captions
+# ---------------------------------------------------------------------------
+
+def load_listing(path: Path = LISTING_PATH) -> dict:
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def template_for(listing: dict, output_folder: str, theme: str | None = None,
+                 base_dir: Path = SCRIPT_DIR) -> dict:
+    """
+    The flat template for one profile and theme: [template.default], then
+    [template.<output_folder>], then their [.<theme>] tables. A font path
+    is resolved against `base_dir` and its content hash added as "font_sha".
+
+    Raises:
+        KeyError: If neither the profile nor "default" has a template.
+    """
+    templates = listing.get("template", {})
+    tables = [templates[name] for name in ("default", output_folder) if name in templates]
+    if not tables:
+        raise KeyError(f"No [template.{output_folder}] or [template.default] in {LISTING_PATH.name}")
+    template = {}
+    for table in tables:
+        template.update({k: v for k, v in table.items() if not isinstance(v, dict)})
+    for table in tables:
+        template.update(table.get(theme, {}) if theme else {})
+
+    template["font_sha"] = ""
+    if template.get("font"):
+        font = (base_dir / template["font"]).resolve()
+        template["font"] = str(font)
+        template["font_sha"] = hashlib.sha256(font.read_bytes()).hexdigest()
+    return template
+
+
+def caption_for(listing: dict, filename: str, locale: str | None = None) -> str:
+    """
+    The caption of one shot: [captions.<locale>], then [captions.default],
+    then the filename without its number, in sentence case.
+    """
+    captions = listing.get("captions", {})
+    for table in (captions.get(locale or "", {}), captions.get("default", {})):
+        if filename in table:
+            return table[filename]
+    text = _NUMBER_RE.sub("", filename).replace("_", " ")
+    return text[:1].upper() + text[1:]
+
+
+# ---------------------------------------------------------------------------
+# Layers
+# ---------------------------------------------------------------------------
+
+def _layer(cache: Path, kind: str, key: str, draw) -> tuple[Image.Image, bool]:
+    """
+    The cached layer `kind`-`key`, drawn with `draw()` on a miss.
+
+    Returns:
+        (layer, True if it was drawn now)
+    """
+    name = f"{kind}-{key[:24]}"
+    if name in _LAYERS:
+        return _LAYERS[name], False
+    path = cache / f"{name}.png"
+    drawn = not path.exists()
+    if drawn:
+        image = draw()
+        cache.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.part")
+        image.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, path)
+    else:
+        with Image.open(path) as cached:
+            image = cached.copy()
+    _LAYERS[name] = image
+    return image, drawn
+
+
+def _rgb(color: str) -> tuple[int, int, int]:
+    return ImageColor.getrgb(color)[:3]
+
+
+def draw_background(template: dict) -> Image.Image:
+    width, height = template["canvas"]
+    top, bottom = (np.array(_rgb(c), dtype=np.float32) for c in template["background"])
+    t = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    rows = (top * (1 - t) + bottom * t).astype(np.uint8)
+    pixels = np.broadcast_to(rows[:, None, :], (height, width, 3))
+    return Image.fromarray(np.ascontiguousarray(pixels), "RGB").convert("RGBA")
+
+
+def rounded_mask(size: tuple[int, int], radius: int) -> Image.Image:
+    """Anti-aliased rounded rectangle filling `size`, as an "L" mask."""
+    width, height = size
+    big = Image.new("L", (width * _SUPERSAMPLE, height * _SUPERSAMPLE), 0)
+    ImageDraw.Draw(big).rounded_rectangle(
+        (0, 0, big.width - 1, big.height - 1), radius=radius * _SUPERSAMPLE, fill=255,
+    )
+    return big.resize(size, Image.LANCZOS)
+
+
+def screen_origin(template: dict, screen: tuple[int, int]) -> tuple[int, int]:
+    return (template["canvas"][0] - screen[0]) // 2, template["screen_top"]
+
+
+def draw_frame(template: dict, screen: tuple[int, int]) -> Image.Image:
+    """Canvas-sized layer: the device body around a screen of size `screen`, and its shadow."""
+    bezel, shadow = template["bezel"], template["shadow"]
+    left, top = screen_origin(template, screen)
+    body_size = (screen[0] + 2 * bezel, screen[1] + 2 * bezel)
+    shape = rounded_mask(body_size, template["corner_radius"] + bezel)
+
+    layer = Image.new("RGBA", tuple(template["canvas"]), (0, 0, 0, 0))
+    if shadow:
+        alpha = Image.new("L", layer.size, 0)
+        alpha.paste(shape.point(lambda v: v * 45 // 100), (left - bezel, top - bezel + shadow // 2))
+        layer.putalpha(alpha.filter(ImageFilter.GaussianBlur(shadow)))
+    body = Image.new("RGBA", body_size, (*_rgb(template["frame_color"]), 255))
+    body.putalpha(shape)
+    layer.alpha_composite(body, (left - bezel, top - bezel))
+    return layer
+
+
+def _font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size) if path else ImageFont.load_default(size=size)
+
+
+def _wrap(text: str, font: ImageFont.FreeTypeFont, width: int) -> list[str]:
+    lines: list[str] = []
+    for word in text.split():
+        if lines and font.getlength(f"{lines[-1]} {word}") <= width:
+            lines[-1] = f"{lines[-1]} {word}"
+        else:
+            lines.append(word)
+    return lines
+
+
+def draw_caption(template: dict, text: str) -> Image.Image:
+    """
+    The caption, centred in a caption_width-wide block. Text that needs more
+    than caption_lines lines at font_size is set smaller until it fits.
+    """
+    size = template["font_size"]
+    font = _font(template["font"], size)
+    lines = _wrap(text, font, template["caption_width"])
+    while len(lines) > template["caption_lines"] and size > _MIN_FONT_SIZE:
+        size = max(_MIN_FONT_SIZE, size * 9 // 10)
+        font = _font(template["font"], size)
+        lines = _wrap(text, font, template["caption_width"])
+
+    ascent, descent = font.getmetrics()
+    step = ascent + descent + template["line_spacing"]
+    height = max(1, len(lines) * step - template["line_spacing"])
+    layer = Image.new("RGBA", (template["caption_width"], height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for i, line in enumerate(lines):
+        draw.text((layer.width // 2, i * step), line, font=font,
+                  fill=_rgb(template["text_color"]), anchor="ma")
+    return layer
+
+
+# ---------------------------------------------------------------------------
+# Compositing
+# ---------------------------------------------------------------------------
+
+def frame_shot(job: dict) -> dict:
+    """
+    Composite one listing image. Runs in a worker process, so the job and
+    the result are plain dicts.
+    """
+    template, cache = job["template"], Path(job["output_root"]) / LAYER_DIR
+    pick = lambda keys: {k: template[k] for k in keys}
+
+    with Image.open(job["capture"]) as image:
+        capture = image.convert("RGB")
+    width = template["screen_width"]
+    screen_size = (width, round(capture.height * width / capture.width))
+    screen = capture.resize(screen_size, Image.LANCZOS)
+
+    layers = [
+        _layer(cache, "background", _hash(pick(_BACKGROUND_KEYS)), lambda: draw_background(template)),
+        _layer(cache, "frame", _hash(pick(_FRAME_KEYS), screen_size),
+               lambda: draw_frame(template, screen_size)),
+        _layer(cache, "mask", _hash(template["corner_radius"], screen_size),
+               lambda: rounded_mask(screen_size, template["corner_radius"])),
+        _layer(cache, "caption", _hash(pick(_CAPTION_KEYS), job["caption"]),
+               lambda: draw_caption(template, job["caption"])),
+    ]
+    (background, _), (frame, _), (mask, _), (caption, _) = layers
+    drawn = sum(1 for _, was_drawn in layers if was_drawn)
+
+    canvas = background.copy()
+    canvas.alpha_composite(frame)
+    canvas.paste(screen, screen_origin(template, screen_size), mask)
+    canvas.alpha_composite(caption, ((canvas.width - caption.width) // 2, template["caption_top"]))
+
+    buffer = io.BytesIO()
+    canvas.convert("RGB").save(buffer, "PNG")
+    written = store_and_link(Path(job["output_root"]), buffer.getvalue(), Path(job["dest"]))
+    return {"image": job["image"], "status": "framed" if written else "unchanged", "layers_drawn": drawn}
+
+
+def frame_all(profiles: list[dict], workers: int | None = None, force: bool = False,
+              listing_path: Path = LISTING_PATH) -> dict:
+    """Frame every capture of `profiles`; returns the run summary."""
+    started = time.perf_counter()
+    listing = load_listing(listing_path)
+    names = {shot.filename for shot in load_manifest()}
+    root = screenshot.OUTPUT_ROOT / FRAMED_DIR
+    index_path = root / INDEX_NAME
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+
+    templates: dict[tuple, dict] = {}
+    jobs, expected, skipped = [], set(), 0
+    for profile in profiles:
+        folder = profile["output_folder"]
+        for png, shot, locale, theme in find_captures(screenshot.OUTPUT_ROOT / folder, names):
+            if (folder, theme) not in templates:
+                templates[folder, theme] = template_for(listing, folder, theme, listing_path.parent)
+            template = templates[folder, theme]
+            caption = caption_for(listing, shot, locale)
+            image = (Path(folder) / png.relative_to(screenshot.OUTPUT_ROOT / folder)).as_posix()
+            dest = root / image
+            key = _hash(template, caption, hashlib.sha256(png.read_bytes()).hexdigest())
+            expected.add(image)
+            if not force and index.get(image) == key and dest.exists():
+                skipped += 1
+                continue
+            jobs.append({
+                "image": image, "capture": str(png), "dest": str(dest), "key": key,
+                "template": template, "caption": caption,
+                "output_root": str(screenshot.OUTPUT_ROOT),
+            })
+
+    results = []
+    if jobs:
+        for job in jobs:
+            Path(job["dest"]).parent.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(frame_shot, jobs))
+    index.update({job["image"]: job["key"] for job in jobs})
+
+    # Drop images whose capture is gone (shot removed, locale or theme dropped)
+    removed = 0
+    for profile in profiles:
+        for png in sorted((root / profile["output_folder"]).rglob("*.png")):
+            image = png.relative_to(root).as_posix()
+            if image not in expected:
+                png.unlink()
+                index.pop(image, None)
+                removed += 1
+
+    root.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(json.dumps(index, indent=2, sort_keys=True), encoding="utf-8")
+    framed = sum(1 for r in results if r["status"] == "framed")
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "images": len(expected),
+        "framed": framed,
+        "unchanged": skipped + len(results) - framed,
+        "removed": removed,
+        "layers_drawn": sum(r["layers_drawn"] for r in results),
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", action="append", help="output folder of a device profile (repeatable)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--listing", type=Path, default=LISTING_PATH, help="template file (default: listing.toml)")
+    parser.add_argument("--force", action="store_true", help="redo every image, even if its inputs are unchanged")
+    args = parser.parse_args()
+
+    profiles = [get_device_profile(p) for p in args.profile] if args.profile else ALL_DEVICE_PROFILES
+
+    summary = frame_all(profiles, args.workers, args.force, args.listing.resolve())
+    for r in summary["results"]:
+        if r["status"] == "framed":
+            print(f"[frame] 🖼️  {r['image']}")
+    print(f"\n[frame] {summary['images']} image(s) in {summary['seconds']:.1f}s: "
+          f"{summary['framed']} framed, {summary['unchanged']} unchanged, {summary['removed']} removed; "
+          f"{summary['layers_drawn']} layer(s) drawn")
+    print(f"[frame] Listing: {(screenshot.OUTPUT_ROOT / FRAMED_DIR).relative_to(SCRIPT_DIR)}/")
+    return 0 if summary["images"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,10 @@ General Appium driver utilities.
 
 Provides wait helpers, permission grant shortcuts, and dialog dismissal
 so individual tests stay focused on navigation rather than boilerplate.
-"""
 
-import time
+Finders take English text and look for its form in the active locale
+(helpers/strings.py).
+"""
 
 from appium.webdriver import Remote as AppiumDriver
 from appium.webdriver.common.appiumby import AppiumBy
@@ -14,9 +15,16 @@ from selenium.common.exceptions import (
     TimeoutException,
     WebDriverException,
 )
+from selenium.webdriver.common.actions import interaction
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.common.actions.pointer_input import PointerInput
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from helpers.hierarchy import HierarchySnapshot
+from helpers.settle import wait_for_ui_idle
+from helpers.strings import localize
+
 
 # ---------------------------------------------------------------------------
 # Wait helpers
@@ -31,7 +39,7 @@ def wait_for_text(driver: AppiumDriver, text: str, timeout: int = 20) -> bool:
     try:
         WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located(
-                (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{text}")')
+                (AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{localize(text)}")')
             )
         )
         return True
@@ -48,7 +56,7 @@ def wait_for_accessibility_id(
     """
     try:
         WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((AppiumBy.ACCESSIBILITY_ID, acc_id))
+            EC.presence_of_element_located((AppiumBy.ACCESSIBILITY_ID, localize(acc_id)))
         )
         return True
     except TimeoutException:
@@ -56,40 +64,53 @@ def wait_for_accessibility_id(
         return False
 
 
-def find_by_text(driver: AppiumDriver, text: str):
+def find_by_text(driver: AppiumDriver, text: str, snapshot: HierarchySnapshot | None = None):
     """
     Find a single element by its exact visible text.
     Returns the element or None.
+
+    Pass a HierarchySnapshot to answer the lookup locally instead of
+    making an Appium round trip.
     """
+    if snapshot is not None:
+        return snapshot.find_text(text)
     try:
         return driver.find_element(
-            AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{text}")'
+            AppiumBy.ANDROID_UIAUTOMATOR, f'new UiSelector().text("{localize(text)}")'
         )
     except NoSuchElementException:
         return None
 
 
-def find_by_text_contains(driver: AppiumDriver, partial_text: str):
+def find_by_text_contains(
+    driver: AppiumDriver, partial_text: str, snapshot: HierarchySnapshot | None = None
+):
     """
     Find a single element whose text contains the given substring.
     Returns the element or None.
     """
+    if snapshot is not None:
+        return snapshot.find_text_contains(partial_text)
     try:
         return driver.find_element(
             AppiumBy.ANDROID_UIAUTOMATOR,
-            f'new UiSelector().textContains("{partial_text}")',
+            f'new UiSelector().textContains("{localize(partial_text)}")',
         )
     except NoSuchElementException:
         return None
 
 
-def find_by_accessibility_id(driver: AppiumDriver, acc_id: str):
+def find_by_accessibility_id(
+    driver: AppiumDriver, acc_id: str, snapshot: HierarchySnapshot | None = None
+):
     """
     Find a single element by its content description / accessibility id.
     Returns the element or None.
     """
+    if snapshot is not None:
+        return snapshot.find_accessibility_id(acc_id)
     try:
-        return driver.find_element(AppiumBy.ACCESSIBILITY_ID, acc_id)
+        return driver.find_element(AppiumBy.ACCESSIBILITY_ID, localize(acc_id))
     except NoSuchElementException:
         return None
 
@@ -110,14 +131,17 @@ def grant_location_permissions(driver: AppiumDriver) -> None:
         "Allow",
         "ALLOW",
     ]
-    # Give the dialog up to 5 s to appear
-    time.sleep(2)
+    # Give the dialog up to 5 s to appear. Once the launch UI has stopped
+    # changing the dialog is either showing or it is not coming.
+    snapshot = wait_for_ui_idle(driver, ceiling=5.0, label="launch")
+    if snapshot is None:
+        snapshot = HierarchySnapshot.capture(driver)
     for btn_text in permission_buttons:
-        elem = find_by_text(driver, btn_text)
+        elem = snapshot.find_text(btn_text)
         if elem:
             elem.click()
             print(f"[permissions] Granted via: '{btn_text}'")
-            time.sleep(1)
+            wait_for_ui_idle(driver, label="permission dialog")
             return
     print("[permissions] No permission dialog found — already granted or not shown.")
 
@@ -130,7 +154,7 @@ def dismiss_any_dialog(driver: AppiumDriver) -> None:
         elem = find_by_text(driver, btn)
         if elem:
             elem.click()
-            time.sleep(0.5)
+            wait_for_ui_idle(driver, label="dialog dismiss")
             return
 
 
@@ -138,9 +162,12 @@ def dismiss_any_dialog(driver: AppiumDriver) -> None:
 # Scroll helpers
 # ---------------------------------------------------------------------------
 
-def scroll_down(driver: AppiumDriver, swipes: int = 1) -> None:
+def scroll_down(driver: AppiumDriver, swipes: int = 1) -> HierarchySnapshot | None:
     """
     Scroll down within the conditions panel using a swipe gesture.
+
+    Returns the settled hierarchy snapshot once the scroll has come to rest
+    (None if it was still moving at the settle ceiling).
     """
     size = driver.get_window_size()
     width = size["width"]
@@ -150,14 +177,18 @@ def scroll_down(driver: AppiumDriver, swipes: int = 1) -> None:
     start_y = int(height * 0.65)
     end_y = int(height * 0.35)
 
+    # swipe() blocks until the gesture completes, so only the trailing
+    # fling after the last swipe needs to settle
     for _ in range(swipes):
         driver.swipe(start_x, start_y, start_x, end_y, duration=600)
-        time.sleep(0.5)
+    return wait_for_ui_idle(driver, label="scroll")
 
 
-def scroll_up(driver: AppiumDriver, swipes: int = 1) -> None:
+def scroll_up(driver: AppiumDriver, swipes: int = 1) -> HierarchySnapshot | None:
     """
     Scroll up within the conditions panel using a swipe gesture.
+
+    Returns the settled hierarchy snapshot, like scroll_down().
     """
     size = driver.get_window_size()
     width = size["width"]
@@ -167,7 +198,59 @@ def scroll_up(driver: AppiumDriver, swipes: int = 1) -> None:
     start_y = int(height * 0.35)
     end_y = int(height * 0.65)
 
+    # swipe() blocks until the gesture completes, so only the trailing
+    # fling after the last swipe needs to settle
     for _ in range(swipes):
         driver.swipe(start_x, start_y, start_x, end_y, duration=600)
-        time.sleep(0.5)
+    return wait_for_ui_idle(driver, label="scroll")
+
+
+
+def drag(
+    driver: AppiumDriver,
+    x: int,
+    strokes: list[tuple[int, int]],
+    stroke_ms: int = 400,
+) -> HierarchySnapshot | None:
+    """
+    Drag content by exact distances in a single W3C actions command.
+
+    Each (start_y, end_y) stroke presses, moves slowly and holds still
+    before lifting, so the list stops where the finger stopped instead of
+    flinging on. Several strokes travel further than one screen but still
+    cost one round trip.
 
+    Returns the settled hierarchy snapshot, like scroll_down().
+    """
+    touch = PointerInput(interaction.POINTER_TOUCH, "touch")
+    for start_y, end_y in strokes:
+        touch.create_pointer_move(duration=0, x=x, y=start_y)
+        touch.create_pointer_down(button=0)
+        touch.create_pause(0.05)
+        touch.create_pointer_move(duration=stroke_ms, x=x, y=end_y)
+        # Holding still zeroes the release velocity, so there is no fling
+        touch.create_pause(0.15)
+        touch.create_pointer_up(0)
+    builder = ActionBuilder(driver, mouse=touch)
+    builder.perform()
+    return wait_for_ui_idle(driver, label="drag")
+
+
+def scroll_into_view(driver: AppiumDriver, partial_text: str, scrollable_instance: int = 0) -> bool:
+    """
+    Let UiAutomator scroll the n-th scrollable container until an element
+    containing `partial_text` is visible — one Appium command, however many
+    scrolls it takes on the device.
+
+    Returns True if the element is now on screen.
+    """
+    try:
+        driver.find_element(
+            AppiumBy.ANDROID_UIAUTOMATOR,
+            f"new UiScrollable(new UiSelector().scrollable(true).instance({scrollable_instance}))"
+            f'.scrollIntoView(new UiSelector().textContains("{localize(partial_text)}"))',
+        )
+    except NoSuchElementException:
+        return False
+    wait_for_ui_idle(driver, label="scroll into view")
+    return True
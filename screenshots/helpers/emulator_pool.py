@@ -0,0 +1,391 @@
+"""
+Headless emulator pool.
+
+Boots N instances of the AVD named in config/devices.py and hands them out
+to workers one at a time, so throughput scales with the cores given to the
+pool instead of stopping at one emulator started by hand.
+
+  - every instance runs with -read-only, so several can share one AVD. The
+    AVD's userdata, including the installed debug APK, is the starting point
+    for all of them, and nothing they write is saved back
+  - each instance gets its own console/adb port pair (5554/5555, 5556/5557,
+    …), UiAutomator2 systemPort and Chromedriver port. Ports already bound on
+    this machine, such as an emulator started from Android Studio, are skipped
+  - an instance is ready once `getprop sys.boot_completed` reports 1
+  - lease() blocks until an instance is free. release() health-checks it
+    (process alive, adb state "device", still booted). An unhealthy
+    instance is killed and rebooted on the same ports in the background
+
+A worker process is told which device it holds with $TIDERUNNER_DEVICE_LEASE
+(see DeviceLease.to_env). config/devices.active_device_profile() merges the
+lease into the profile, and helpers/session.build_options() then targets
+that device by udid.
+
+Usage (from the screenshots/ directory):
+    python -m helpers.emulator_pool                 # one instance per 2 cores
+    python -m helpers.emulator_pool --instances 3   # prints a lease per instance
+    python -m helpers.emulator_pool --cores 8 --apk ../app/build/outputs/apk/debug/app-debug.apk
+
+run_parallel.py --emulators N starts a pool for the duration of the run.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import adbutils
+
+SCRIPT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import DEVICE_LEASE_ENV, PIXEL_4
+from helpers import screenshot
+
+# Emulator console ports are even; adb listens on console + 1
+CONSOLE_PORT_BASE = 5554
+CONSOLE_PORT_MAX = 5682
+
+# Above the profiles' own system_port values (8200…) and Chromedriver's
+# default 9515, so pool sessions never collide with single-device runs
+SYSTEM_PORT_BASE = 8210
+CHROMEDRIVER_PORT_BASE = 9520
+
+# Virtual CPUs per instance (-cores); also sets the default pool size
+CORES_PER_INSTANCE = 2
+
+DEFAULT_BOOT_TIMEOUT = 300.0
+
+_BOOT_POLL_INTERVAL = 2.0
+
+# Seconds to wait for an emulator to exit on SIGTERM before killing it
+_SHUTDOWN_TIMEOUT = 20.0
+
+_EMULATOR_FLAGS = [
+    "-read-only", "-no-window", "-no-audio", "-no-boot-anim",
+    "-no-snapshot-save", "-gpu", "swiftshader_indirect",
+]
+
+
+def emulator_binary() -> str:
+    """Path to the SDK's emulator binary."""
+    found = shutil.which("emulator")
+    if found:
+        return found
+    for root in (os.environ.get("ANDROID_HOME"), os.environ.get("ANDROID_SDK_ROOT"),
+                 str(Path.home() / "Android" / "Sdk")):
+        if root and (Path(root) / "emulator" / "emulator").exists():
+            return str(Path(root) / "emulator" / "emulator")
+    raise FileNotFoundError(
+        "Android emulator not found — put $ANDROID_HOME/emulator on PATH or set ANDROID_HOME"
+    )
+
+
+def _port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("127.0.0.1", port))
+            return True
+        except OSError:
+            return False
+
+
+def _free_ports(base: int, count: int, step: int = 1, limit: int | None = None,
+                width: int = 1) -> list[int]:
+    """`count` ports from `base` upwards, each with `width` consecutive ports free."""
+    ports = []
+    port = base
+    while len(ports) < count:
+        if limit is not None and port > limit:
+            raise RuntimeError(f"Only {len(ports)} free port(s) between {base} and {limit}")
+        if all(_port_free(port + k) for k in range(width)):
+            ports.append(port)
+        port += step
+    return ports
+
+
+class DeviceLease:
+    """The connection settings one worker needs to drive a pool instance."""
+
+    def __init__(self, udid: str, system_port: int, chromedriver_port: int) -> None:
+        self.udid = udid
+        self.system_port = system_port
+        self.chromedriver_port = chromedriver_port
+
+    def as_profile_overrides(self) -> dict:
+        return {
+            "udid": self.udid,
+            "system_port": self.system_port,
+            "chromedriver_port": self.chromedriver_port,
+        }
+
+    def to_env(self) -> dict[str, str]:
+        # ANDROID_SERIAL points adb (and adbutils callers without a driver,
+        # such as the tile cache seeding) at the leased device, not whichever
+        # one the parent shell had selected
+        return {DEVICE_LEASE_ENV: json.dumps(self.as_profile_overrides()), "ANDROID_SERIAL": self.udid}
+
+
+class EmulatorInstance:
+    """One headless emulator on a fixed set of ports."""
+
+    def __init__(self, index: int, avd_name: str, console_port: int,
+                 system_port: int, chromedriver_port: int, cores: int) -> None:
+        self.index = index
+        self.avd_name = avd_name
+        self.console_port = console_port
+        self.adb_port = console_port + 1
+        self.serial = f"emulator-{console_port}"
+        self.lease = DeviceLease(self.serial, system_port, chromedriver_port)
+        self.cores = cores
+        self.process: subprocess.Popen | None = None
+        self.boots = 0
+        self._log = None
+
+    @property
+    def log_path(self) -> Path:
+        return screenshot.OUTPUT_ROOT / "emulators" / f"{self.serial}.log"
+
+    def start(self) -> None:
+        """Launch the emulator process (returns before it has booted)."""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        cmd = [
+            emulator_binary(), "-avd", self.avd_name,
+            "-port", str(self.console_port), "-cores", str(self.cores),
+            *_EMULATOR_FLAGS,
+        ]
+        self.process = subprocess.Popen(cmd, stdout=self._log, stderr=subprocess.STDOUT)
+        self.boots += 1
+        print(f"[pool] Starting {self.serial} (pid {self.process.pid}, "
+              f"systemPort {self.lease.system_port}) → {self.log_path}")
+
+    def _adb_device(self) -> adbutils.AdbDevice:
+        return adbutils.adb.device(serial=self.serial)
+
+    def booted(self) -> bool:
+        try:
+            return self._adb_device().shell("getprop sys.boot_completed").strip() == "1"
+        except Exception:
+            return False
+
+    def wait_for_boot(self, timeout: float = DEFAULT_BOOT_TIMEOUT) -> None:
+        """
+        Raises:
+            RuntimeError: If the process exits or boot does not finish in time.
+        """
+        start = time.monotonic()
+        while not self.booted():
+            if self.process is not None and self.process.poll() is not None:
+                raise RuntimeError(
+                    f"{self.serial} exited with code {self.process.returncode} while booting "
+                    f"(see {self.log_path})"
+                )
+            if time.monotonic() - start > timeout:
+                raise RuntimeError(f"{self.serial} did not boot within {timeout:.0f}s")
+            time.sleep(_BOOT_POLL_INTERVAL)
+        # Animations off, as on the hand-managed AVD
+        device = self._adb_device()
+        for setting in ("window_animation_scale", "transition_animation_scale",
+                        "animator_duration_scale"):
+            device.shell(f"settings put global {setting} 0")
+        print(f"[pool] {self.serial} booted in {time.monotonic() - start:.0f}s")
+
+    def healthy(self) -> bool:
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            if self._adb_device().get_state() != "device":
+                return False
+        except Exception:
+            return False
+        return self.booted()
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=_SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+class EmulatorPool:
+    """
+    A fixed number of emulator instances, leased to one worker at a time.
+    """
+
+    def __init__(self, instances: int, avd_name: str = PIXEL_4["avd_name"],
+                 cores_per_instance: int = CORES_PER_INSTANCE,
+                 boot_timeout: float = DEFAULT_BOOT_TIMEOUT, apk: Path | None = None) -> None:
+        if instances < 1:
+            raise ValueError("An emulator pool needs at least one instance")
+        self.boot_timeout = boot_timeout
+        self.apk = apk
+        console_ports = _free_ports(CONSOLE_PORT_BASE, instances, step=2,
+                                    limit=CONSOLE_PORT_MAX, width=2)
+        system_ports = _free_ports(SYSTEM_PORT_BASE, instances)
+        chromedriver_ports = _free_ports(CHROMEDRIVER_PORT_BASE, instances)
+        self.instances = [
+            EmulatorInstance(i, avd_name, console_ports[i], system_ports[i],
+                             chromedriver_ports[i], cores_per_instance)
+            for i in range(instances)
+        ]
+        self._ready: list[EmulatorInstance] = []
+        self._failed: list[EmulatorInstance] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "EmulatorPool":
+        """Launch every instance; each becomes leasable as soon as it has booted."""
+        for instance in self.instances:
+            instance.start()
+            threading.Thread(target=self._boot, args=(instance,), daemon=True,
+                             name=f"boot-{instance.serial}").start()
+        return self
+
+    def _boot(self, instance: EmulatorInstance) -> None:
+        try:
+            if instance.process is None:
+                instance.start()
+            instance.wait_for_boot(self.boot_timeout)
+            if self.apk is not None:
+                instance._adb_device().install(str(self.apk), silent=True)
+        except Exception as e:
+            print(f"[pool] ⚠️  {instance.serial} failed to boot: {e}")
+            instance.stop()
+            with self._cond:
+                self._failed.append(instance)
+                self._cond.notify_all()
+            return
+        with self._cond:
+            if self._closed:
+                instance.stop()
+                return
+            self._ready.append(instance)
+            self._cond.notify_all()
+
+    def wait_until_ready(self, timeout: float | None = None) -> int:
+        """Block until every instance has booted or failed. Returns the number ready."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self._ready) + len(self._failed) == len(self.instances),
+                timeout=timeout if timeout is not None else self.boot_timeout + 30,
+            )
+            return len(self._ready)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for instance in self.instances:
+            instance.stop()
+        print(f"[pool] Stopped {len(self.instances)} emulator(s)")
+
+    def __enter__(self) -> "EmulatorPool":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Leasing
+    # ------------------------------------------------------------------
+
+    def lease(self, timeout: float | None = None) -> EmulatorInstance:
+        """
+        Take a booted instance, waiting for one to come free.
+
+        Raises:
+            RuntimeError: If every instance failed to boot, or the pool is closed.
+            TimeoutError: If none came free within `timeout` seconds.
+        """
+        with self._cond:
+            ok = self._cond.wait_for(
+                lambda: self._ready or self._closed or len(self._failed) == len(self.instances),
+                timeout=timeout,
+            )
+            if self._closed:
+                raise RuntimeError("Emulator pool is closed")
+            if not self._ready:
+                if not ok:
+                    raise TimeoutError(f"No emulator came free within {timeout:.0f}s")
+                raise RuntimeError("Every emulator in the pool failed to boot")
+            return self._ready.pop(0)
+
+    def release(self, instance: EmulatorInstance) -> None:
+        """Return an instance; an unhealthy one is rebooted before it is leased again."""
+        if self._closed:
+            return
+        if instance.healthy():
+            with self._cond:
+                self._ready.append(instance)
+                self._cond.notify_all()
+            return
+        print(f"[pool] ⚠️  {instance.serial} is unhealthy — recycling")
+        instance.stop()
+        threading.Thread(target=self._boot, args=(instance,), daemon=True,
+                         name=f"boot-{instance.serial}").start()
+
+
+def default_instances(cores: int | None = None) -> int:
+    """Pool size for a core budget: one instance per CORES_PER_INSTANCE cores."""
+    return max(1, (cores or os.cpu_count() or CORES_PER_INSTANCE) // CORES_PER_INSTANCE)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--instances", type=int,
+                        help="emulators to boot (default: --cores / 2)")
+    parser.add_argument("--cores", type=int, help="cores to give the pool (default: all)")
+    parser.add_argument("--avd", default=PIXEL_4["avd_name"], help="AVD name (default: %(default)s)")
+    parser.add_argument("--apk", type=Path, help="APK to install on every instance after boot")
+    parser.add_argument("--boot-timeout", type=float, default=DEFAULT_BOOT_TIMEOUT)
+    args = parser.parse_args()
+
+    pool = EmulatorPool(args.instances or default_instances(args.cores), args.avd,
+                        boot_timeout=args.boot_timeout, apk=args.apk)
+    with pool:
+        ready = pool.wait_until_ready()
+        print(f"\n[pool] {ready}/{len(pool)} emulator(s) ready. Point a run at one with:")
+        for instance in pool.instances:
+            if instance.healthy():
+                print(f"  {DEVICE_LEASE_ENV}='{json.dumps(instance.lease.as_profile_overrides())}'")
+        print("[pool] Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(30)
+                # Nothing leases in this mode: check the idle instances and
+                # recycle the dead ones (booting ones are not in the list)
+                with pool._cond:
+                    idle = list(pool._ready)
+                for instance in idle:
+                    if not instance.healthy():
+                        with pool._cond:
+                            pool._ready.remove(instance)
+                        pool.release(instance)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
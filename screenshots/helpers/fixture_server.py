@@ -0,0 +1,259 @@
+"""
+Offline fixture server for the app's marine / weather APIs.
+
+Debug builds made with
+    ./gradlew assembleDebug -Ptiderunner.fixtureBaseUrl=http://10.0.2.2:8765/
+send every API call (NOAA, Open-Meteo, OpenWeather, Stormglass, Solunar,
+IPGeolocation) to this server instead of the internet. The app's
+FixtureRedirectInterceptor rewrites
+    https://api.open-meteo.com/v1/forecast?latitude=…
+to
+    http://10.0.2.2:8765/api.open-meteo.com/v1/forecast?latitude=…
+so the first path segment is always the original host.
+
+Responses are recorded once per (date, location preset) and replayed for
+every later run, which makes captures deterministic and the "loading"
+phase near-instant:
+
+    fixtures/api/<date>/<location>/<host>/<path>__<query hash>.json
+
+<location> is the preset from config/locations.py nearest the request's
+coordinates. Requests without coordinates (e.g. NOAA datagetter by station
+id) live under "_shared". Dates and API keys are left out of the query
+hash so a recording keeps matching on later days.
+
+Usage (from the screenshots/ directory):
+    python -m helpers.fixture_server --record        # forward misses upstream and save them
+    python -m helpers.fixture_server                 # replay the latest recorded date
+    python -m helpers.fixture_server --date 2026-06-01
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import re
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.locations import ALL_LOCATIONS
+
+FIXTURE_ENV = "TIDERUNNER_API_FIXTURES"
+FIXTURE_ROOT = SCRIPT_DIR / "fixtures" / "api"
+DEFAULT_PORT = 8765
+
+# Set by run_parallel.py for its workers: the runner serves the API fixtures
+# and map tiles once for all of them, so the workers' session fixtures must
+# not bind the same ports again
+SHARED_SERVERS_ENV = "TIDERUNNER_SHARED_SERVERS"
+
+# Query parameters that change every day or per developer and must not
+# affect which fixture is served
+_VOLATILE_PARAMS = {"begin_date", "end_date", "date", "apiKey", "appid", "key"}
+
+_LAT_PARAMS = ("lat", "latitude")
+_LON_PARAMS = ("lon", "long", "longitude")
+
+# Solunar encodes its arguments in the path: /solunar/{lat},{lon},{yyyymmdd},{tz}
+_PATH_COORDS_RE = re.compile(r"(-?\d+\.\d+),(-?\d+\.\d+)")
+_PATH_DATE_RE = re.compile(r"\b\d{8}\b|\b\d{4}-\d{2}-\d{2}\b")
+
+SHARED_LOCATION = "_shared"
+
+
+def location_slug(name: str) -> str:
+    """Filesystem-safe slug for a location preset name."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def nearest_location(lat: float, lon: float) -> str:
+    """Slug of the preset in ALL_LOCATIONS closest to (lat, lon)."""
+    nearest = min(ALL_LOCATIONS, key=lambda loc: math.hypot(loc["lat"] - lat, loc["lon"] - lon))
+    return location_slug(nearest["name"])
+
+
+def _request_coordinates(path: str, query: dict[str, list[str]]) -> tuple[float, float] | None:
+    lat = next((query[p][0] for p in _LAT_PARAMS if p in query), None)
+    lon = next((query[p][0] for p in _LON_PARAMS if p in query), None)
+    if lat is not None and lon is not None:
+        return float(lat), float(lon)
+    match = _PATH_COORDS_RE.search(path)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    return None
+
+
+def fixture_relpath(request_path: str) -> Path:
+    """
+    Map a redirected request ("/<host>/<path>?<query>") to its fixture path
+    relative to the date folder.
+    """
+    parsed = urllib.parse.urlsplit(request_path)
+    query = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+    host, _, path = parsed.path.lstrip("/").partition("/")
+
+    coords = _request_coordinates(path, query)
+    location = nearest_location(*coords) if coords else SHARED_LOCATION
+
+    stable_query = sorted(
+        (k, v) for k, values in query.items() if k not in _VOLATILE_PARAMS for v in values
+    )
+    stable_path = _PATH_DATE_RE.sub("{date}", path)
+    digest = hashlib.sha1(
+        f"{stable_path}?{urllib.parse.urlencode(stable_query)}".encode("utf-8")
+    ).hexdigest()[:12]
+
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", stable_path).strip("_") or "index"
+    return Path(location) / host / f"{name}__{digest}.json"
+
+
+def recorded_dates(root: Path = FIXTURE_ROOT) -> list[str]:
+    """Dates that have fixtures, oldest first."""
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir())
+
+
+def missing_locations(date: str, root: Path = FIXTURE_ROOT) -> list[str]:
+    """Names of location presets with no fixtures recorded for `date`."""
+    return [
+        loc["name"] for loc in ALL_LOCATIONS
+        if not (root / date / location_slug(loc["name"])).exists()
+    ]
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    date_dir: Path = None
+    record_mode = False
+    lock = threading.Lock()
+    stats: dict[str, int] = {}
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _count(self, outcome: str) -> None:
+        with self.lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    def _fetch_upstream(self) -> dict:
+        host, _, rest = self.path.lstrip("/").partition("/")
+        request = urllib.request.Request(f"https://{host}/{rest}", headers={"User-Agent": "TideRunner"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as resp:
+                status, body, ctype = resp.status, resp.read(), resp.headers.get("Content-Type")
+        except urllib.error.HTTPError as e:
+            status, body, ctype = e.code, e.read(), e.headers.get("Content-Type")
+        return {
+            "status": status,
+            "content_type": ctype or "application/json",
+            "body": body.decode("utf-8", errors="replace"),
+        }
+
+    def do_GET(self) -> None:
+        fixture_path = self.date_dir / fixture_relpath(self.path)
+
+        if fixture_path.exists():
+            fixture = json.loads(fixture_path.read_text(encoding="utf-8"))
+            self._count("hit")
+        elif self.record_mode:
+            fixture = self._fetch_upstream()
+            if fixture["status"] == 200:
+                fixture_path.parent.mkdir(parents=True, exist_ok=True)
+                fixture_path.write_text(json.dumps(fixture, indent=2), encoding="utf-8")
+                print(f"[fixtures] Recorded {fixture_path.relative_to(FIXTURE_ROOT)}")
+            self._count("recorded")
+        else:
+            print(f"[fixtures] ⚠️  No fixture for {self.path}")
+            fixture = {
+                "status": 404,
+                "content_type": "application/json",
+                "body": json.dumps({"error": f"No fixture for {self.path}"}),
+            }
+            self._count("miss")
+
+        data = fixture["body"].encode("utf-8")
+        self.send_response(fixture["status"])
+        self.send_header("Content-Type", fixture["content_type"])
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_fixture_server(
+    date: str | None = None,
+    port: int = DEFAULT_PORT,
+    record: bool = False,
+    root: Path = FIXTURE_ROOT,
+) -> ThreadingHTTPServer:
+    """
+    Build (but do not start) a fixture server.
+
+    Args:
+        date:   Recorded date to serve (YYYY-MM-DD). Defaults to the latest
+                recorded date, or today when recording.
+        port:   Port to listen on (all interfaces, so the emulator's
+                10.0.2.2 alias reaches it).
+        record: Forward missing fixtures upstream and save them.
+
+    Raises:
+        FileNotFoundError: If replaying and no fixtures exist.
+    """
+    if date is None:
+        dates = recorded_dates(root)
+        if record:
+            date = datetime.date.today().isoformat()
+        elif dates:
+            date = dates[-1]
+        else:
+            raise FileNotFoundError(
+                f"No API fixtures under {root} — run `python -m helpers.fixture_server --record` first"
+            )
+    handler = type("FixtureHandler", (_FixtureHandler,), {
+        "date_dir": root / date,
+        "record_mode": record,
+        "stats": {},
+    })
+    server = ThreadingHTTPServer(("0.0.0.0", port), handler)
+    server.fixture_date = date
+    return server
+
+
+def start_in_background(date: str | None = None, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Start a replay server on a daemon thread and return it."""
+    server = make_fixture_server(date=date, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[fixtures] Serving API fixtures for {server.fixture_date} on port {port}")
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--date", help="recorded date to serve (default: latest, or today with --record)")
+    parser.add_argument("--record", action="store_true", help="forward misses upstream and save them")
+    args = parser.parse_args()
+
+    server = make_fixture_server(date=args.date, port=args.port, record=args.record)
+    mode = "Recording" if args.record else "Serving"
+    print(f"[fixtures] {mode} API fixtures for {server.fixture_date} on port {args.port}")
+    for name in missing_locations(server.fixture_date):
+        print(f"[fixtures] ⚠️  No fixtures yet for {name}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"[fixtures] {server.RequestHandlerClass.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
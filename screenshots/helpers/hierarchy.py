@@ -0,0 +1,216 @@
+"""
+UI hierarchy snapshot helper.
+
+Fetches the UiAutomator2 page source ONCE and indexes every node by its
+text, content-desc and resource-id, so any number of lookups against the
+same screen state are answered locally instead of costing one Appium
+round trip (and possibly one implicit wait) each.
+
+A snapshot describes the screen at the moment it was taken. Take a fresh
+one after any tap, swipe or navigation:
+
+    snap = HierarchySnapshot.capture(driver)
+    if snap.find_text("Fishing Conditions"):
+        ...
+
+Text and content-desc lookups take the English text. While a locale is
+active (helpers/strings.py), they match its translation first and the
+English text second.
+"""
+
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+
+from appium.webdriver import Remote as AppiumDriver
+
+from helpers.strings import localize
+
+# UiAutomator2 reports bounds as "[left,top][right,bottom]"
+_BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+# Attributes that describe *what* is on screen. Used for the content hash so
+# that focus/selection flicker does not count as a change of screen state.
+_HASHED_ATTRIBUTES = ("class", "text", "content-desc", "resource-id", "bounds")
+
+# Class name Compose / View spinners are reported under
+PROGRESS_BAR_CLASS = "android.widget.ProgressBar"
+
+
+def parse_bounds(raw: str | None) -> tuple[int, int, int, int] | None:
+    """
+    Parse a UiAutomator2 bounds string into (left, top, right, bottom).
+    Returns None if the string is missing or malformed.
+    """
+    if not raw:
+        return None
+    match = _BOUNDS_RE.fullmatch(raw.strip())
+    if not match:
+        return None
+    return tuple(int(v) for v in match.groups())
+
+
+class SnapshotNode:
+    """
+    A single node from a hierarchy snapshot.
+
+    Exposes the handful of attributes the harness reads, plus click(),
+    which taps the centre of the node's bounds. That keeps the
+    `if elem: elem.click()` idiom used throughout screens/ working whether
+    the element came from a live lookup or from a snapshot.
+    """
+
+    def __init__(self, driver: AppiumDriver | None, attrib: dict[str, str]) -> None:
+        self._driver = driver
+        self.attrib = attrib
+        self.text = attrib.get("text", "")
+        self.content_desc = attrib.get("content-desc", "")
+        self.resource_id = attrib.get("resource-id", "")
+        self.class_name = attrib.get("class", "")
+        self.bounds = parse_bounds(attrib.get("bounds"))
+
+    def __repr__(self) -> str:
+        label = self.text or self.content_desc or self.resource_id or self.class_name
+        return f"SnapshotNode({label!r}, bounds={self.bounds})"
+
+    @property
+    def center(self) -> tuple[int, int] | None:
+        if self.bounds is None:
+            return None
+        left, top, right, bottom = self.bounds
+        return (left + right) // 2, (top + bottom) // 2
+
+    def get_attribute(self, name: str) -> str | None:
+        """Mirror WebElement.get_attribute() for the common attribute names."""
+        aliases = {"contentDescription": "content-desc", "resourceId": "resource-id",
+                   "className": "class"}
+        return self.attrib.get(aliases.get(name, name))
+
+    def click(self) -> None:
+        """Tap the centre of the node's bounds."""
+        if self._driver is None or self.center is None:
+            raise RuntimeError(f"Cannot click {self!r}: no driver or bounds")
+        self._driver.tap([self.center])
+
+
+def _candidates(text: str) -> tuple[str, ...]:
+    """The active locale's form of `text`, then the English text itself."""
+    localized = localize(text)
+    return (localized, text) if localized != text else (text,)
+
+
+class HierarchySnapshot:
+    """
+    In-memory index over a single UiAutomator2 page source dump.
+    """
+
+    def __init__(self, page_source: str, driver: AppiumDriver | None = None) -> None:
+        self.page_source = page_source
+        self.nodes: list[SnapshotNode] = []
+        self._by_text: dict[str, list[SnapshotNode]] = {}
+        self._by_desc: dict[str, list[SnapshotNode]] = {}
+        self._by_resource_id: dict[str, list[SnapshotNode]] = {}
+        self._by_class: dict[str, list[SnapshotNode]] = {}
+
+        root = ET.fromstring(page_source)
+        for elem in root.iter():
+            if elem is root and not elem.attrib:
+                continue
+            node = SnapshotNode(driver, dict(elem.attrib))
+            self.nodes.append(node)
+            if node.text:
+                self._by_text.setdefault(node.text, []).append(node)
+            if node.content_desc:
+                self._by_desc.setdefault(node.content_desc, []).append(node)
+            if node.resource_id:
+                self._by_resource_id.setdefault(node.resource_id, []).append(node)
+            if node.class_name:
+                self._by_class.setdefault(node.class_name, []).append(node)
+
+    @classmethod
+    def capture(cls, driver: AppiumDriver) -> "HierarchySnapshot":
+        """Fetch the page source once and build the index."""
+        return cls(driver.page_source, driver=driver)
+
+    # ------------------------------------------------------------------
+    # Lookups — each mirrors one of the live finders in driver_utils
+    # ------------------------------------------------------------------
+
+    def find_text(self, text: str) -> SnapshotNode | None:
+        """Equivalent of UiSelector().text(text)."""
+        for candidate in _candidates(text):
+            matches = self._by_text.get(candidate)
+            if matches:
+                return matches[0]
+        return None
+
+    def find_text_contains(self, partial_text: str) -> SnapshotNode | None:
+        """Equivalent of UiSelector().textContains(partial_text)."""
+        exact = self.find_text(partial_text)
+        if exact:
+            return exact
+        for candidate in _candidates(partial_text):
+            for text, matches in self._by_text.items():
+                if candidate in text:
+                    return matches[0]
+        return None
+
+    def find_accessibility_id(self, acc_id: str) -> SnapshotNode | None:
+        """Equivalent of AppiumBy.ACCESSIBILITY_ID (content-desc)."""
+        for candidate in _candidates(acc_id):
+            matches = self._by_desc.get(candidate)
+            if matches:
+                return matches[0]
+        return None
+
+    def find_resource_id(self, resource_id: str) -> SnapshotNode | None:
+        matches = self._by_resource_id.get(resource_id)
+        return matches[0] if matches else None
+
+    def find_all_by_class(self, class_name: str) -> list[SnapshotNode]:
+        return list(self._by_class.get(class_name, []))
+
+    def scrollables(self) -> list[SnapshotNode]:
+        """
+        Scrollable containers in document order — the order UiSelector's
+        .scrollable(true).instance(n) counts them in.
+        """
+        return [node for node in self.nodes if node.attrib.get("scrollable") == "true"]
+
+    def texts(self) -> list[str]:
+        """All visible text values, in document order."""
+        return [node.text for node in self.nodes if node.text]
+
+    def contains(self, text: str) -> bool:
+        """
+        True if any node matches `text` by exact text, text substring or
+        content-desc — the same three-way fallback verify_screen_elements
+        has always used.
+        """
+        return bool(
+            self.find_text(text)
+            or self.find_text_contains(text)
+            or self.find_accessibility_id(text)
+        )
+
+    def has_progress_bar(self) -> bool:
+        """True if a loading spinner (CircularProgressIndicator) is on screen."""
+        return bool(self._by_class.get(PROGRESS_BAR_CLASS))
+
+    # ------------------------------------------------------------------
+    # State fingerprint
+    # ------------------------------------------------------------------
+
+    def content_hash(self) -> str:
+        """
+        Stable hash of what the screen shows. Two snapshots with the same
+        hash describe the same UI state, including element positions, so an
+        in-flight scroll or animation produces a different hash each poll.
+        """
+        digest = hashlib.sha1()
+        for node in self.nodes:
+            for attr in _HASHED_ATTRIBUTES:
+                digest.update(node.attrib.get(attr, "").encode("utf-8"))
+                digest.update(b"\x1f")
+            digest.update(b"\x1e")
+        return digest.hexdigest()
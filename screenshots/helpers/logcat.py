@@ -0,0 +1,226 @@
+"""
+Logcat-streamed readiness markers.
+
+Debug builds log one line per data milestone under the TideRunnerReady tag
+(app/src/main/java/com/fishing/conditions/util/ReadinessLog.kt):
+
+    loading              lat,lon
+    cache-hit            lat,lon
+    fetch-start          lat,lon
+    fetch-done           lat,lon,ok|empty
+    fetch-failed         lat,lon
+    conditions-loaded    lat,lon,species
+    conditions-error     lat,lon
+    suitability-updated  lat,lon,species
+
+A LogcatReader streams just that tag over adb on a background thread and
+turns each line into a ReadinessEvent. Waits become subscriptions:
+wait_for() blocks on a condition variable and returns within milliseconds
+of the marker being logged — no UiAutomator2 round trips, no poll interval.
+
+Take a mark() before triggering an action and pass it as `since`, so only
+markers logged after the action count.
+
+Enabled by default; set $TIDERUNNER_LOGCAT=0 to fall back to UI polling.
+"""
+
+import os
+import re
+import socket
+import threading
+import time
+from typing import Callable, Iterable
+
+import adbutils
+
+LOGCAT_ENV = "TIDERUNNER_LOGCAT"
+READINESS_TAG = "TideRunnerReady"
+
+# Markers that end a conditions load, one way or the other
+LOAD_OUTCOMES = ("conditions-loaded", "conditions-error")
+
+# `logcat -v epoch`: "  1760000000.123  4321  4321 I TideRunnerReady: loading 35.0196,-76.6989"
+_LINE = re.compile(
+    r"^\s*(?P<time>\d+\.\d+)\s+\d+\s+\d+\s+[VDIWEF]\s+(?P<tag>[^:]+?)\s*:\s?(?P<message>.*)$"
+)
+
+_ACTIVE_READER: "LogcatReader | None" = None
+
+
+def parse_line(line: str) -> tuple[float, str, str] | None:
+    """(device epoch time, tag, message) of a `-v epoch` line, or None for headers."""
+    match = _LINE.match(line.rstrip("\r\n"))
+    if not match:
+        return None
+    return float(match.group("time")), match.group("tag"), match.group("message")
+
+
+def open_stream(device: adbutils.AdbDevice, args: str):
+    """
+    Start `logcat -v epoch <args>` from the device's current time and return
+    (connection, binary line file). Only lines logged from now on are
+    streamed; the buffers themselves are left intact for crash logs.
+    """
+    device_now = device.shell("date +%s").strip()
+    conn = device.shell(f"logcat -v epoch -T {device_now}.000 {args}", stream=True)
+    conn.conn.settimeout(None)
+    return conn, conn.conn.makefile("rb")
+
+
+def close_stream(conn) -> None:
+    try:
+        # close() alone does not wake a reader thread blocked in recv()
+        conn.conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conn.close()
+
+
+class ReadinessEvent:
+    """One readiness marker from the app."""
+
+    def __init__(self, name: str, fields: list[str], device_time: float) -> None:
+        self.name = name
+        self.fields = fields
+        self.device_time = device_time
+        self.received = time.monotonic()
+
+    @classmethod
+    def parse(cls, message: str, device_time: float) -> "ReadinessEvent":
+        name, _, rest = message.strip().partition(" ")
+        return cls(name, rest.split(",") if rest else [], device_time)
+
+    @property
+    def coords(self) -> tuple[float, float] | None:
+        try:
+            return float(self.fields[0]), float(self.fields[1])
+        except (IndexError, ValueError):
+            return None
+
+    @property
+    def detail(self) -> str:
+        """Everything after lat,lon (species names may contain commas)."""
+        return ",".join(self.fields[2:])
+
+    def __repr__(self) -> str:
+        return f"ReadinessEvent({self.name} {','.join(self.fields)})"
+
+
+class LogcatReader:
+    """
+    Streams the readiness tag from one device's logcat in the background.
+    """
+
+    def __init__(self, serial: str | None, tag: str = READINESS_TAG) -> None:
+        self._device = adbutils.adb.device(serial=serial)
+        self._tag = tag
+        self._events: list[ReadinessEvent] = []
+        self._cond = threading.Condition()
+        self._conn = None
+        self._stream = None
+        self._alive = False
+
+    @property
+    def alive(self) -> bool:
+        return self._alive
+
+    @property
+    def markers_seen(self) -> bool:
+        """True once the app has logged any marker — i.e. the build emits them."""
+        return bool(self._events)
+
+    def start(self) -> "LogcatReader":
+        self._conn, self._stream = open_stream(self._device, f"-s {self._tag}:I")
+        self._alive = True
+        threading.Thread(target=self._run, name="logcat-reader", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            close_stream(conn)
+
+    def _run(self) -> None:
+        try:
+            for raw in self._stream:
+                self._handle(raw.decode("utf-8", "replace"))
+        except (OSError, ValueError, AttributeError):
+            pass  # connection closed by stop() or adb went away
+        finally:
+            with self._cond:
+                self._alive = False
+                self._cond.notify_all()
+
+    def _handle(self, line: str) -> None:
+        parsed = parse_line(line)
+        if parsed is None or parsed[1] != self._tag:
+            return  # "--------- beginning of main" and the like
+        device_time, _, message = parsed
+        event = ReadinessEvent.parse(message, device_time)
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def mark(self) -> int:
+        """Position in the event stream; pass to wait_for(since=…)."""
+        with self._cond:
+            return len(self._events)
+
+    def wait_for(
+        self,
+        names: str | Iterable[str],
+        predicate: Callable[[ReadinessEvent], bool] | None = None,
+        timeout: float = 10.0,
+        since: int = 0,
+    ) -> ReadinessEvent | None:
+        """
+        Block until a marker named in `names` (and matching `predicate`) is
+        logged at or after position `since`.
+
+        Returns the event, or None on timeout or if the stream has ended.
+        """
+        wanted = {names} if isinstance(names, str) else set(names)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            index = since
+            while True:
+                for event in self._events[index:]:
+                    if event.name in wanted and (predicate is None or predicate(event)):
+                        return event
+                index = len(self._events)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._alive:
+                    return None
+                self._cond.wait(remaining)
+
+
+def start_reader(serial: str | None) -> LogcatReader | None:
+    """
+    Start the reader for this run unless disabled with $TIDERUNNER_LOGCAT=0.
+    Returns None (and waits keep polling the UI) if adb is unavailable.
+    """
+    global _ACTIVE_READER
+    stop_reader()
+    if os.environ.get(LOGCAT_ENV, "1") == "0":
+        return None
+    try:
+        _ACTIVE_READER = LogcatReader(serial).start()
+    except Exception as e:
+        print(f"[logcat] adb unavailable ({e}) — waits will poll the UI")
+        return None
+    print(f"[logcat] Streaming '{READINESS_TAG}' markers from {serial or 'the default device'}")
+    return _ACTIVE_READER
+
+
+def active_reader() -> LogcatReader | None:
+    """The running reader, or None when waits should poll the UI."""
+    if _ACTIVE_READER is not None and _ACTIVE_READER.alive:
+        return _ACTIVE_READER
+    return None
+
+
+def stop_reader() -> None:
+    global _ACTIVE_READER
+    if _ACTIVE_READER is not None:
+        _ACTIVE_READER.stop()
+        _ACTIVE_READER = None
@@ -0,0 +1,280 @@
+"""
+Appium wire-level command profiler.
+
+Wraps selenium's RemoteConnection.execute — the single path every Appium
+command takes, whichever helper issued it — and records for each command:
+
+  - W3C command name (findElement, getPageSource, actions, …) and locator
+  - latency, and request / response JSON payload size
+  - the page-object method (screens/) and harness helper (helpers/) that
+    issued it, found by walking the call stack
+  - the test that was running
+
+At the end of a run the records are written as a Chrome trace
+(output/<output_folder>/appium_trace.json — open it in chrome://tracing or
+https://ui.perfetto.dev), every test gets a per-command summary table in
+the pytest-html report, and the terminal summary lists the commands and
+callers that cost the most.
+
+Enable with `pytest --profile` (run_screenshots.sh passes options through).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from html import escape
+from pathlib import Path
+
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+SCRIPT_DIR = Path(__file__).parent.parent
+TRACE_NAME = "appium_trace.json"
+
+_SCREENS_DIR = str(SCRIPT_DIR / "screens") + os.sep
+_HELPERS_DIR = str(SCRIPT_DIR / "helpers") + os.sep
+
+# Locators longer than this are shortened in tables and traces
+_MAX_LOCATOR = 90
+
+_ACTIVE_PROFILER: "CommandProfiler | None" = None
+
+
+class CommandRecord:
+    """One Appium command as it went over the wire."""
+
+    __slots__ = (
+        "name", "locator", "start", "duration", "request_bytes", "response_bytes",
+        "page_object", "helper", "test", "thread", "error",
+    )
+
+    def __init__(self, name: str, locator: str, start: float, test: str) -> None:
+        self.name = name
+        self.locator = locator
+        self.start = start
+        self.duration = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.page_object = ""
+        self.helper = ""
+        self.test = test
+        self.thread = threading.get_native_id()
+        self.error = ""
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} {self.locator}" if self.locator else self.name
+
+
+def _locator(params: dict | None) -> str:
+    if not isinstance(params, dict) or "using" not in params:
+        return ""
+    locator = f"{params['using']}={params.get('value', '')}"
+    return locator if len(locator) <= _MAX_LOCATOR else locator[:_MAX_LOCATOR - 1] + "…"
+
+
+def _payload_size(payload) -> int:
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _callers() -> tuple[str, str]:
+    """(innermost page-object method, innermost harness helper) on the stack."""
+    page_object = helper = ""
+    frame = sys._getframe(2)  # skip this function and the execute() wrapper
+    while frame is not None and not (page_object and helper):
+        path = frame.f_code.co_filename
+        if not page_object and path.startswith(_SCREENS_DIR):
+            page_object = frame.f_code.co_qualname
+        elif not helper and path.startswith(_HELPERS_DIR) and not path.endswith("profiler.py"):
+            helper = f"{Path(path).stem}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return page_object, helper
+
+
+class CommandProfiler:
+    """
+    Records every Appium command while installed.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[CommandRecord] = []
+        self.test_spans: list[tuple[str, float, float]] = []
+        self.origin = time.perf_counter()
+        self._test = "<setup>"
+        self._test_start = self.origin
+        self._lock = threading.Lock()
+        self._original_execute = None
+        self.trace_path: Path | None = None
+
+    # ------------------------------------------------------------------
+    # Hook
+    # ------------------------------------------------------------------
+
+    def install(self) -> "CommandProfiler":
+        original = RemoteConnection.execute
+        profiler = self
+
+        def execute(connection, command, params):
+            record = CommandRecord(command, _locator(params), time.perf_counter(), profiler._test)
+            record.request_bytes = _payload_size(params)
+            record.page_object, record.helper = _callers()
+            try:
+                response = original(connection, command, params)
+            except Exception as e:
+                record.error = type(e).__name__
+                raise
+            finally:
+                record.duration = time.perf_counter() - record.start
+                with profiler._lock:
+                    profiler.records.append(record)
+            record.response_bytes = _payload_size(response.get("value") if isinstance(response, dict) else response)
+            return response
+
+        self._original_execute = original
+        RemoteConnection.execute = execute
+        return self
+
+    def uninstall(self) -> None:
+        if self._original_execute is not None:
+            RemoteConnection.execute = self._original_execute
+            self._original_execute = None
+
+    # ------------------------------------------------------------------
+    # Test attribution
+    # ------------------------------------------------------------------
+
+    def begin_test(self, nodeid: str) -> None:
+        self._test = nodeid
+        self._test_start = time.perf_counter()
+
+    def end_test(self) -> None:
+        self.test_spans.append((self._test, self._test_start, time.perf_counter()))
+        self._test = "<teardown>"
+
+    def records_for(self, test: str) -> list[CommandRecord]:
+        with self._lock:
+            return [r for r in self.records if r.test == test]
+
+    # ------------------------------------------------------------------
+    # Summaries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def summarise(records: list[CommandRecord], key=lambda r: r.label) -> list[dict]:
+        """Group records by `key`, most expensive first."""
+        groups: dict[str, dict] = {}
+        for r in records:
+            group = groups.setdefault(key(r) or "—", {
+                "key": key(r) or "—", "count": 0, "total": 0.0, "max": 0.0,
+                "request_bytes": 0, "response_bytes": 0,
+            })
+            group["count"] += 1
+            group["total"] += r.duration
+            group["max"] = max(group["max"], r.duration)
+            group["request_bytes"] += r.request_bytes
+            group["response_bytes"] += r.response_bytes
+        return sorted(groups.values(), key=lambda g: g["total"], reverse=True)
+
+    def html_table(self, test: str, limit: int = 15) -> str:
+        """Per-command summary of one test, for the pytest-html report."""
+        records = self.records_for(test)
+        if not records:
+            return ""
+        total = sum(r.duration for r in records)
+        rows = "".join(
+            f"<tr><td>{escape(g['key'])}</td><td>{g['count']}</td>"
+            f"<td>{g['total'] * 1000:.0f}</td><td>{g['total'] / g['count'] * 1000:.0f}</td>"
+            f"<td>{g['max'] * 1000:.0f}</td><td>{g['response_bytes'] / 1024:.1f}</td></tr>"
+            for g in self.summarise(records)[:limit]
+        )
+        return (
+            f"<p><b>Appium commands:</b> {len(records)} in {total:.2f}s</p>"
+            "<table><tr><th>command</th><th>count</th><th>total ms</th>"
+            "<th>mean ms</th><th>max ms</th><th>response KiB</th></tr>"
+            f"{rows}</table>"
+        )
+
+    def terminal_report(self, limit: int = 12) -> str:
+        with self._lock:
+            records = list(self.records)
+        if not records:
+            return ""
+        total = sum(r.duration for r in records)
+        lines = [f"[profile] {len(records)} Appium commands, {total:.1f}s on the wire"]
+        for title, key in (
+            ("command", lambda r: r.label),
+            ("caller", lambda r: r.page_object or r.helper),
+        ):
+            lines.append(f"\n[profile] {'top ' + title:<72} {'count':>6} {'total':>8} {'mean':>7}")
+            for g in self.summarise(records, key)[:limit]:
+                lines.append(
+                    f"[profile] {g['key'][:72]:<72} {g['count']:>6} "
+                    f"{g['total']:>7.2f}s {g['total'] / g['count'] * 1000:>5.0f}ms"
+                )
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Chrome trace
+    # ------------------------------------------------------------------
+
+    def trace_events(self) -> list[dict]:
+        """
+        Chrome trace_event "complete" events: one per command on its
+        thread's track, plus one per test on a separate "tests" track.
+        """
+        def us(t: float) -> int:
+            return int((t - self.origin) * 1_000_000)
+
+        pid = os.getpid()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "TideRunner screenshots"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "tests"}},
+        ]
+        for test, start, end in self.test_spans:
+            events.append({"name": test, "cat": "test", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": us(start), "dur": us(end) - us(start)})
+        with self._lock:
+            records = list(self.records)
+        for r in records:
+            events.append({
+                "name": r.label, "cat": "appium", "ph": "X", "pid": pid, "tid": r.thread,
+                "ts": us(r.start), "dur": max(1, int(r.duration * 1_000_000)),
+                "args": {
+                    "command": r.name, "locator": r.locator, "test": r.test,
+                    "page_object": r.page_object, "helper": r.helper,
+                    "request_bytes": r.request_bytes, "response_bytes": r.response_bytes,
+                    **({"error": r.error} if r.error else {}),
+                },
+            })
+        return events
+
+    def write_trace(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}),
+            encoding="utf-8",
+        )
+        self.trace_path = path
+        return path
+
+
+def start_profiler() -> CommandProfiler:
+    global _ACTIVE_PROFILER
+    stop_profiler()
+    _ACTIVE_PROFILER = CommandProfiler().install()
+    return _ACTIVE_PROFILER
+
+
+def active_profiler() -> CommandProfiler | None:
+    return _ACTIVE_PROFILER
+
+
+def stop_profiler() -> None:
+    global _ACTIVE_PROFILER
+    if _ACTIVE_PROFILER is not None:
+        _ACTIVE_PROFILER.uninstall()
+        _ACTIVE_PROFILER = None
@@ -8,13 +8,27 @@ submission and manual review.
 File naming convention:
     {shot_number:02d}_{short_descriptor}.png
     e.g.  01_map_overview_gulf_coast.png
+
+Only the capture and the size check run on the test thread. PNG encoding,
+optional optimisation and the disk write are handed to a small bounded
+worker pool so the test can move straight on to the next navigation.
+flush_pending_writes() waits for them and raises any write error; the
+conftest calls it at session teardown. when_written() reports on just
+the writes of one shot, for the checkpoint.
+
+PNGs are kept content-addressed in output/.store/ (helpers/capture_store.py)
+and the named files link into it, so a recapture that comes out
+byte-identical rewrites nothing.
 """
 
 import os
-import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-from PIL import Image
+from helpers.capture import CapturedFrame, capture_frame
+from helpers.capture_store import collect_garbage, store_and_link
+from helpers.stability import DEFAULT_CEILING, wait_for_stable_frames
 
 # Root output folder (relative to this file → screenshots/output/)
 OUTPUT_ROOT = Path(__file__).parent.parent / "output"
@@ -22,57 +36,183 @@ OUTPUT_ROOT = Path(__file__).parent.parent / "output"
 # Minimum short-side dimension required by Google Play Store
 PLAY_STORE_MIN_PX = 1000
 
-
-def take_screenshot(driver, filename: str, device_profile: dict) -> Path:
+# Set to "1" to spend extra (background) CPU on smaller PNGs
+PNG_OPTIMIZE_ENV = "TIDERUNNER_PNG_OPTIMIZE"
+
+# Background writer threads, and how many shots may be queued or in flight
+# at once. A raw 1080x2280 frame is ~10 MB, so the queue is kept short;
+# take_screenshot blocks once it is full.
+_WRITER_THREADS = 2
+_MAX_PENDING_WRITES = 4
+
+_writer = ThreadPoolExecutor(max_workers=_WRITER_THREADS, thread_name_prefix="png-writer")
+_pending_slots = threading.BoundedSemaphore(_MAX_PENDING_WRITES)
+_pending: list[Future] = []
+# dest -> its latest queued write, until the next flush
+_queued: dict[Path, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def take_screenshot(
+    driver,
+    filename: str,
+    device_profile: dict,
+    stable_regions=None,
+    stable_ceiling: float = DEFAULT_CEILING,
+    subfolder: str | None = None,
+) -> Path:
     """
     Capture a screenshot and save it to the correct output sub-folder.
 
+    The pixels come from the session's capture backend (see
+    helpers/capture.py) — adb framebuffer when available, Appium otherwise.
+    With `stable_regions`, frames are sampled until those regions hold
+    still (helpers/stability.py) and the stable frame itself is saved, so
+    nothing is captured mid-animation.
+
     Args:
         driver:         Active Appium WebDriver instance.
         filename:       Descriptive filename WITHOUT extension.
                         Example: "01_map_overview_gulf_coast"
         device_profile: Device dict from config/devices.py (must contain
                         "output_folder" key).
+        stable_regions: (x0, y0, x1, y1) screen fractions that must hold
+                        still before capturing; None captures immediately.
+        stable_ceiling: Longest to wait for stability (seconds). The shot
+                        is taken anyway, with a warning, once it passes.
+        subfolder:      Folder under the output folder to save into (the
+                        locale, in a locale matrix run).
 
     Returns:
-        Path to the saved PNG file.
+        Path the PNG will be saved to. The write happens in the background;
+        call flush_pending_writes() before reading the file, or
+        when_written() to hear when it is done.
 
     Raises:
         ValueError: If the captured image is smaller than Play Store minimum.
     """
     folder = OUTPUT_ROOT / device_profile["output_folder"]
+    if subfolder:
+        folder = folder / subfolder
     folder.mkdir(parents=True, exist_ok=True)
 
     dest = folder / f"{filename}.png"
 
-    # Appium returns raw PNG bytes
-    png_bytes = driver.get_screenshot_as_png()
-    dest.write_bytes(png_bytes)
-
-    # Validate dimensions for Play Store compliance
-    with Image.open(dest) as img:
-        width, height = img.size
-        short_side = min(width, height)
-        if short_side < PLAY_STORE_MIN_PX:
-            raise ValueError(
-                f"Screenshot '{filename}' is too small for Play Store: "
-                f"{width}x{height} (min {PLAY_STORE_MIN_PX}px on short side)."
-            )
-        print(
-            f"[screenshot] Saved: {dest.relative_to(OUTPUT_ROOT.parent)} "
-            f"({width}x{height})"
+    # adb framebuffer or Appium, per $TIDERUNNER_CAPTURE_BACKEND
+    frame = None
+    if stable_regions:
+        frame = wait_for_stable_frames(driver, stable_regions, ceiling=stable_ceiling, label=filename)
+    if frame is None:
+        frame = capture_frame(driver)
+
+    # Validate dimensions for Play Store compliance — known from the raw
+    # frame or the PNG IHDR header, no decode needed
+    short_side = min(frame.width, frame.height)
+    if short_side < PLAY_STORE_MIN_PX:
+        raise ValueError(
+            f"Screenshot '{filename}' is too small for Play Store: "
+            f"{frame.width}x{frame.height} (min {PLAY_STORE_MIN_PX}px on short side)."
         )
 
+    _submit_write(frame, dest)
     return dest
 
 
-def clear_output_folder(device_profile: dict) -> None:
+def _submit_write(frame: CapturedFrame, dest: Path) -> Future:
+    """Queue a frame for encoding and writing, blocking if the queue is full."""
+    optimize = os.environ.get(PNG_OPTIMIZE_ENV) == "1"
+    _pending_slots.acquire()
+    try:
+        future = _writer.submit(_encode_and_write, frame, dest, optimize)
+    except BaseException:
+        _pending_slots.release()
+        raise
+    future.add_done_callback(lambda _: _pending_slots.release())
+    with _pending_lock:
+        _pending.append(future)
+        _queued[dest] = future
+    return future
+
+
+def _encode_and_write(frame: CapturedFrame, dest: Path, optimize: bool) -> Path:
+    png_bytes = frame.encode(optimize=optimize)
+    changed = store_and_link(OUTPUT_ROOT, png_bytes, dest)
+    print(
+        f"[screenshot] {'Saved' if changed else 'Unchanged'}: {dest.relative_to(OUTPUT_ROOT.parent)} "
+        f"({frame.width}x{frame.height}, {len(png_bytes) // 1024} KB)"
+    )
+    return dest
+
+
+def flush_pending_writes() -> list[Path]:
     """
-    Remove all PNGs from a device's output folder before a fresh run.
+    Wait for every queued screenshot to be encoded and written.
+
+    Returns:
+        Paths written since the last flush.
+
+    Raises:
+        RuntimeError: If any write failed (all failures are listed).
     """
-    folder = OUTPUT_ROOT / device_profile["output_folder"]
-    if folder.exists():
-        for f in folder.glob("*.png"):
-            f.unlink()
-        print(f"[screenshot] Cleared: {folder}")
+    with _pending_lock:
+        futures = list(_pending)
+        _pending.clear()
+        _queued.clear()
+
+    written, errors = [], []
+    for future in futures:
+        try:
+            written.append(future.result())
+        except Exception as e:
+            errors.append(e)
+
+    if errors:
+        details = "\n".join(f"  - {e!r}" for e in errors)
+        raise RuntimeError(f"{len(errors)} screenshot write(s) failed:\n{details}")
+    return written
+
+
+def when_written(paths: list[Path], callback) -> None:
+    """
+    Call `callback(error)` once the background writes to `paths` have all
+    finished — error is None if every one succeeded, else the first failure.
 
+    The callback runs on a writer thread, or straight away when none of
+    `paths` has a write queued (already flushed, or never captured).
+    """
+    with _pending_lock:
+        futures = [_queued[path] for path in paths if path in _queued]
+    if not futures:
+        callback(None)
+        return
+
+    left = len(futures)
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+
+    def done(future: Future) -> None:
+        nonlocal left
+        with lock:
+            if future.exception() is not None:
+                errors.append(future.exception())
+            left -= 1
+            finished = left == 0
+        if finished:
+            callback(errors[0] if errors else None)
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+def clear_output_folder(device_profile: dict, keep: set[str] | frozenset = frozenset()) -> None:
+    """
+    Garbage-collect a device's output folder: remove PNGs whose names are
+    not in `keep` (filenames without extension), then store entries that no
+    output folder refers to any more. With the default, every PNG goes.
+    """
+    flush_pending_writes()
+    folder = OUTPUT_ROOT / device_profile["output_folder"]
+    removed, blobs, freed = collect_garbage(OUTPUT_ROOT, folder, set(keep))
+    if removed or blobs:
+        print(f"[screenshot] Cleaned {folder}: {removed} stale PNG(s), "
+              f"{blobs} store entr{'y' if blobs == 1 else 'ies'} ({freed // 1024} KB)")
@@ -0,0 +1,106 @@
+"""
+Learned per-device layout of the ConditionsPanel's scrolling column.
+
+Every time the panel is on screen, the positions of the section headers it
+shows are folded into a map of where each header sits in the column's
+content. With that map, screens/conditions_panel.py turns "get from the
+header I can see to the header I want" into one drag of a known distance
+instead of a swipe-and-look search.
+
+The map also keeps the distance each drag stroke loses to touch slop on
+this device, measured from where headers actually land.
+
+Stored per device profile in output/<output_folder>/section_layout.json,
+next to the capture checkpoint. Positions are content pixels from an
+arbitrary origin; only the differences between them are used. Section
+heights vary a little with the forecast data, so positions are refreshed
+from every snapshot and a jump is always checked where it landed.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from helpers import screenshot
+
+LAYOUT_NAME = "section_layout.json"
+
+# Section header texts in the scrolling column, top to bottom (substrings of
+# the rendered text, which may carry an emoji prefix or a suffix)
+SECTION_HEADERS = (
+    "Fishing Suitability",
+    "Best Fishing Times Today",
+    "Marine Conditions",
+    "Tide Information",
+    "Sun & Moon",
+    "Solunar Periods",
+)
+
+
+class SectionLayout:
+    """
+    Header positions in the panel's scroll content, plus per-stroke drag loss.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self.positions: dict[str, int] = {}
+        self.drag_loss = 0.0
+        self._dirty = False
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self.positions = {k: int(v) for k, v in data.get("positions", {}).items()}
+                self.drag_loss = float(data.get("drag_loss", 0.0))
+            except ValueError:
+                print(f"[layout] ⚠️  Ignoring unreadable {path.name}")
+
+    @classmethod
+    def for_profile(cls, device_profile: dict) -> "SectionLayout":
+        return cls(screenshot.OUTPUT_ROOT / device_profile["output_folder"] / LAYOUT_NAME)
+
+    def learn(self, visible: dict[str, int]) -> None:
+        """
+        Fold in the screen tops of the headers visible in one snapshot.
+
+        The first known header on screen anchors the others; with nothing
+        known yet, the screen itself is the origin.
+        """
+        if not visible:
+            return
+        anchor = next((h for h in SECTION_HEADERS if h in visible and h in self.positions), None)
+        if anchor is None and self.positions:
+            return  # Nothing to tie these headers to the rest of the map
+        offset = self.positions[anchor] - visible[anchor] if anchor else 0
+        for header, top in visible.items():
+            position = top + offset
+            if self.positions.get(header) != position:
+                self.positions[header] = position
+                self._dirty = True
+
+    def distance(self, from_header: str, to_header: str) -> int | None:
+        """Content pixels from one header to another, if both are known."""
+        if from_header in self.positions and to_header in self.positions:
+            return self.positions[to_header] - self.positions[from_header]
+        return None
+
+    def record_drag(self, strokes: int, shortfall: int) -> None:
+        """
+        Adjust the per-stroke loss after a drag fell `shortfall` pixels short
+        of its target (negative = overshot). Half of the error is applied,
+        which converges without chasing the odd noisy landing.
+        """
+        if strokes:
+            self.drag_loss = max(0.0, self.drag_loss + 0.5 * shortfall / strokes)
+            self._dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.part")
+        tmp.write_text(json.dumps(
+            {"positions": self.positions, "drag_loss": round(self.drag_loss, 1)}, indent=2
+        ), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
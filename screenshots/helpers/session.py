@@ -0,0 +1,124 @@
+"""
+Appium session creation and reattachment.
+
+Every pytest run used to open a fresh webdriver.Remote, paying the
+UiAutomator2 server launch and the app launch each time. The session broker
+(session_broker.py) keeps one warm session per device profile alive between
+runs. A run asks the broker for that profile's session id, and
+attach_session() wraps it in a driver without creating a new session.
+
+Set $TIDERUNNER_SESSION_BROKER to the broker URL (or "1" for the default
+http://127.0.0.1:4725) to enable reuse; leave it unset for the old
+one-session-per-run behaviour.
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+
+from appium import webdriver
+from appium.options.common.base import AppiumOptions
+
+from config.devices import APP_ACTIVITY, APP_PACKAGE, APPIUM_HOST
+
+SESSION_BROKER_ENV = "TIDERUNNER_SESSION_BROKER"
+DEFAULT_BROKER_URL = "http://127.0.0.1:4725"
+
+# Generous, because a cold session can include the UiAutomator2 server launch
+_BROKER_TIMEOUT = 120
+
+
+def build_options(device_profile: dict) -> AppiumOptions:
+    """
+    Build Appium capabilities using AppiumOptions for UiAutomator2.
+
+    AppiumOptions.load_capabilities() is used instead of UiAutomator2Options
+    because Appium-Python-Client 3.1.0 does not re-export UiAutomator2Options
+    from appium.options — it only exists deep in the submodule tree and the
+    top-level __init__.py is empty. AppiumOptions is the stable public API.
+    """
+    caps = {
+        # W3C standard
+        "platformName": "Android",
+        # Appium-prefixed caps
+        "appium:deviceName": device_profile["device_name"],
+        "appium:platformVersion": device_profile["platform_version"],
+        "appium:avd": device_profile["avd_name"],
+        "appium:automationName": "UiAutomator2",
+        # App under test — debug variant
+        "appium:appPackage": APP_PACKAGE,
+        "appium:appActivity": APP_ACTIVITY,
+        # Don't reinstall / reset between sessions — speeds up iteration
+        "appium:noReset": True,
+        "appium:fullReset": False,
+        # Auto-grant all runtime permissions (location, etc.)
+        "appium:autoGrantPermissions": True,
+        # Timeouts
+        "appium:newCommandTimeout": 120,
+        "appium:uiautomator2ServerLaunchTimeout": 60000,
+    }
+    # Parallel sessions on one Appium server each need their own
+    # UiAutomator2 port, otherwise they hijack each other's server
+    if "system_port" in device_profile:
+        caps["appium:systemPort"] = device_profile["system_port"]
+    if "chromedriver_port" in device_profile:
+        caps["appium:chromedriverPort"] = device_profile["chromedriver_port"]
+    # A pool lease names a running emulator; with appium:avd as well, Appium
+    # would try to find or launch the AVD itself
+    if "udid" in device_profile:
+        caps["appium:udid"] = device_profile["udid"]
+        del caps["appium:avd"]
+    return AppiumOptions().load_capabilities(caps)
+
+
+def create_session(device_profile: dict, appium_host: str = APPIUM_HOST) -> webdriver.Remote:
+    """Open a brand-new Appium session for a device profile."""
+    return webdriver.Remote(appium_host, options=build_options(device_profile))
+
+
+class AttachedDriver(webdriver.Remote):
+    """
+    A driver bound to an existing session instead of creating one.
+
+    Commands go straight to the Appium server with the given session id;
+    nothing is sent at construction time.
+    """
+
+    def __init__(self, appium_host: str, session_id: str, capabilities: dict) -> None:
+        self._attach_to = (session_id, capabilities)
+        super().__init__(appium_host, options=AppiumOptions(), direct_connection=False)
+
+    def start_session(self, capabilities, browser_profile=None) -> None:
+        self.session_id, self.caps = self._attach_to
+
+
+def attach_session(session_id: str, capabilities: dict, appium_host: str = APPIUM_HOST) -> AttachedDriver:
+    return AttachedDriver(appium_host, session_id, capabilities)
+
+
+def broker_url() -> str | None:
+    """The broker URL from $TIDERUNNER_SESSION_BROKER, or None when disabled."""
+    value = os.environ.get(SESSION_BROKER_ENV)
+    if not value:
+        return None
+    return DEFAULT_BROKER_URL if value == "1" else value.rstrip("/")
+
+
+def acquire_session(device_profile: dict, url: str) -> AttachedDriver:
+    """
+    Ask the broker for the profile's warm session and attach to it.
+
+    Raises:
+        ConnectionError: If the broker is unreachable or cannot provide a session.
+    """
+    request = urllib.request.Request(f"{url}/session/{device_profile['output_folder']}")
+    try:
+        with urllib.request.urlopen(request, timeout=_BROKER_TIMEOUT) as resp:
+            lease = json.loads(resp.read())
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        raise ConnectionError(f"Session broker at {url} unavailable: {e}") from e
+
+    state = "new" if lease["created"] else "warm"
+    print(f"[session] Attached to {state} session {lease['session_id'][:8]}… from broker")
+    return attach_session(lease["session_id"], lease["capabilities"], lease["appium_host"])
@@ -0,0 +1,106 @@
+"""
+UI settle detection.
+
+Replaces fixed time.sleep() calls with waits that end as soon as the
+device is observably idle, bounded by a ceiling so a stuck screen can
+never hang the suite. Signals:
+
+  - hierarchy: the page source content hash is unchanged between polls
+               (covers Compose animations, scroll flings, panel expansion)
+  - spinner:   no android.widget.ProgressBar is on screen
+
+Pixels that settle without the hierarchy changing (OSMDroid tiles, graph
+drawing, fades) are waited on in helpers/stability.py instead.
+
+Typical use after an interaction:
+
+    element.click()
+    wait_for_ui_idle(driver)
+"""
+
+import time
+from typing import Callable
+
+from appium.webdriver import Remote as AppiumDriver
+
+from helpers.hierarchy import HierarchySnapshot
+
+# Delay between consecutive polls (seconds). Each poll is itself one
+# Appium round trip, so the effective sampling period is a little longer.
+DEFAULT_POLL_INTERVAL = 0.2
+
+# How many consecutive identical polls count as "settled"
+DEFAULT_STABLE_POLLS = 2
+
+# Default upper bound for a single settle wait (seconds)
+DEFAULT_CEILING = 3.0
+
+
+def wait_until(
+    predicate: Callable[[], bool],
+    ceiling: float = DEFAULT_CEILING,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> bool:
+    """
+    Poll `predicate` until it returns True or `ceiling` seconds pass.
+
+    Returns True as soon as the predicate holds, False on timeout.
+    """
+    deadline = time.monotonic() + ceiling
+    while True:
+        if predicate():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def wait_for_ui_idle(
+    driver: AppiumDriver,
+    ceiling: float = DEFAULT_CEILING,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stable_polls: int = DEFAULT_STABLE_POLLS,
+    require_no_spinner: bool = True,
+    label: str = "ui",
+) -> HierarchySnapshot | None:
+    """
+    Block until the UI stops changing, or until `ceiling` seconds pass.
+
+    Args:
+        driver:             Active Appium WebDriver.
+        ceiling:            Maximum time to wait (seconds).
+        poll_interval:      Delay between polls (seconds).
+        stable_polls:       Consecutive unchanged polls needed to settle.
+        require_no_spinner: Also require that no ProgressBar is visible.
+        label:              Short name for log lines.
+
+    Returns:
+        The settled HierarchySnapshot (reusable for lookups against the
+        idle screen), or None if the ceiling was reached first.
+    """
+    start = time.monotonic()
+    deadline = start + ceiling
+    previous = None
+    unchanged = 0
+
+    while True:
+        snapshot = HierarchySnapshot.capture(driver)
+        fingerprint = snapshot.content_hash()
+
+        busy = require_no_spinner and snapshot.has_progress_bar()
+        if fingerprint == previous and not busy:
+            unchanged += 1
+        else:
+            unchanged = 0
+        previous = fingerprint
+
+        # `unchanged` counts repeats, so N identical polls == N - 1 repeats
+        if not busy and unchanged >= stable_polls - 1:
+            elapsed = time.monotonic() - start
+            print(f"[settle] {label} idle after {elapsed:.2f}s")
+            return snapshot
+
+        if time.monotonic() >= deadline:
+            print(f"[settle] ⚠️  {label} still changing after {ceiling:.1f}s ceiling")
+            return None
+        time.sleep(poll_interval)
@@ -0,0 +1,294 @@
+"""
+Generic executor for shots from the manifest (see helpers/shot_plan.py).
+
+Drives MapScreen and ConditionsPanel from whatever state the app is
+actually in to the state a shot needs, checks the required elements and
+captures. It tracks app state itself, so any single shot or subset of the
+plan (`pytest -k tide`, or a resumed run) performs every transition it
+needs — no shot depends on another having run first.
+
+Every transition is timed; report() prints estimated vs actual cost per
+transition kind at the end of a run.
+
+With a list of locales, each shot is captured once per locale at the same
+settled state: the executor navigates once and then switches the app's
+locale (helpers/app_locale.py) between captures, saving to
+<output_folder>/<locale>/. The date strip labels are formatted in the app
+locale, so a date change is made with the app back in the system locale.
+
+Themes work the same way: with ["light", "dark"], every state is captured
+in both (helpers/ui_mode.py), saved as <filename>_light / <filename>_dark.
+The theme order alternates from one locale to the next, so each switch
+serves two captures.
+"""
+
+import time
+from pathlib import Path
+
+from appium.webdriver import Remote as AppiumDriver
+
+from config.devices import APP_PACKAGE
+from helpers.app_guard import restart_count, verify_screen_elements
+from helpers.app_locale import AppLocale
+from helpers.capture import device_serial
+from helpers.driver_utils import find_by_text_contains
+from helpers.screenshot import take_screenshot
+from helpers.settle import wait_for_ui_idle
+from helpers.stability import DEFAULT_CEILING
+from helpers.ui_mode import NightMode
+from helpers.shot_plan import (
+    TRANSITION_COST,
+    Plan,
+    Shot,
+    apply,
+    initial_state,
+    output_names,
+    transitions,
+)
+from screens.conditions_panel import ConditionsPanel
+from screens.map_screen import MapScreen
+
+
+# Transitions that find on-screen text formatted by the app's locale
+_SYSTEM_LOCALE_TRANSITIONS = {"date"}
+
+
+class LocationLoadError(Exception):
+    """The conditions for a shot's location never loaded (network / API)."""
+
+
+class MissingElementsError(Exception):
+    """The screen did not show a shot's required elements."""
+
+
+class ShotExecutor:
+    """
+    Runs planned shots on one driver, keeping track of app state between them.
+    """
+
+    def __init__(self, driver: AppiumDriver, device_profile: dict, plan: Plan | None = None,
+                 locales: list[str] | None = None, themes: list[str] | None = None) -> None:
+        self._driver = driver
+        self._profile = device_profile
+        self._map = MapScreen(driver)
+        self._panel = ConditionsPanel(driver, device_profile)
+        self._plan = plan
+        self._state = initial_state()
+        self._restarts = restart_count()
+        self._first_launch_done = False
+        self._locales = list(locales or [])
+        self._app_locale: AppLocale | None = None
+        self._locale: str | None = None
+        self._themes = list(themes or [])
+        self._night_mode: NightMode | None = None
+        self._theme: str | None = None
+        # kind -> [(estimated, actual)]
+        self._costs: dict[str, list[tuple[float, float]]] = {}
+
+    @property
+    def state(self) -> dict:
+        return dict(self._state)
+
+    # ------------------------------------------------------------------
+    # Transitions
+    # ------------------------------------------------------------------
+
+    def _select_species(self, species: str) -> None:
+        self._map.open_species_filter()
+        if not self._map.select_species(species):
+            # Names can drift slightly between app versions — match on the first word
+            elem = find_by_text_contains(self._driver, species.split(" (")[0])
+            if elem:
+                elem.click()
+            else:
+                self._driver.back()
+            wait_for_ui_idle(self._driver, label="species fallback")
+
+    def _load_location(self, shot: Shot) -> None:
+        lat, lon = shot.coords
+        self._map.set_location_and_tap_my_location_fab(lat, lon)
+        if not self._map.wait_for_conditions_to_load():
+            # Unknown state now: the next shot at this location must reload
+            self._state["location"] = None
+            raise LocationLoadError(
+                f"{shot.location} conditions did not load — check network / API availability"
+            )
+        self._state.update(location=shot.location, expanded=None, scroll=None)
+
+    def _set_expanded(self, shot: Shot) -> None:
+        if shot.expanded:
+            self._panel.ensure_expanded()
+        else:
+            self._panel.collapse()
+        self._state["expanded"] = shot.expanded
+
+    def _perform(self, kind: str, shot: Shot) -> None:
+        if kind == "species_list":
+            self._map.open_species_filter()
+        elif kind == "species":
+            self._select_species(shot.species)
+            self._state["species"] = shot.species
+        elif kind == "location":
+            self._load_location(shot)
+        elif kind == "date":
+            self._panel.select_forecast_date(shot.date)
+        elif kind == "panel":
+            self._set_expanded(shot)
+        elif kind == "scroll":
+            self._panel.scroll_to_section(shot.section)
+
+    def prepare(self, shot: Shot) -> None:
+        """
+        Bring the app into the state `shot` needs.
+
+        Raises:
+            LocationLoadError: If the shot's location never finished loading.
+        """
+        if restart_count() != self._restarts:
+            print("[shots] App was restarted — starting from a clean state")
+            self._restarts = restart_count()
+            self._state = initial_state()
+
+        if not self._first_launch_done:
+            self._map.handle_first_launch()
+            self._first_launch_done = True
+
+        for kind, estimate in transitions(self._state, shot):
+            start = time.perf_counter()
+            try:
+                self._perform(kind, shot)
+            finally:
+                actual = time.perf_counter() - start
+                self._costs.setdefault(kind, []).append((estimate, actual))
+                print(f"[shots] {kind}: {actual:.1f}s (estimated {estimate:.1f}s)")
+
+        if shot.view == "map" and shot.tile_wait:
+            # The map's pixels are waited on at capture (shot.stable)
+            self._map.wait_for_tile_traffic(seconds=shot.tile_wait)
+
+        self._state = apply(self._state, shot)
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+
+    def output_names(self, shot: Shot) -> list[str]:
+        """The PNGs a shot produces, relative to the output folder, without extension."""
+        return output_names(shot, self._locales, self._themes)
+
+    def _switch_locale(self, locale: str | None) -> bool:
+        """Put the app in `locale`; False if it already was."""
+        if self._app_locale is None:
+            self._app_locale = AppLocale(device_serial(self._driver), APP_PACKAGE)
+            # Clear anything an interrupted run left set
+            self._app_locale.switch(self._driver, None)
+        if locale == self._locale:
+            return False
+        actual = self._app_locale.switch(self._driver, locale)
+        self._costs.setdefault("locale", []).append((TRANSITION_COST["locale"], actual))
+        self._locale = locale
+        return True
+
+    def _switch_theme(self, theme: str) -> bool:
+        """Put the device in `theme`; False if it already was."""
+        if self._night_mode is None:
+            self._night_mode = NightMode(device_serial(self._driver))
+            self._theme = {"yes": "dark", "no": "light"}.get(self._night_mode.original)
+        if theme == self._theme:
+            return False
+        actual = self._night_mode.switch(self._driver, theme)
+        self._costs.setdefault("theme", []).append((TRANSITION_COST["theme"], actual))
+        self._theme = theme
+        return True
+
+    def _variants(self) -> list[tuple[str | None, str | None]]:
+        """
+        (locale, theme) pairs to capture, ordered for the fewest switches:
+        the current locale and theme first, and the theme order reversed
+        for each locale so the next one starts where the last one ended.
+        """
+        locales = sorted(self._locales, key=lambda locale: locale != self._locale) or [None]
+        themes = sorted(self._themes, key=lambda theme: theme != self._theme) or [None]
+        variants = []
+        for locale in locales:
+            variants.extend((locale, theme) for theme in themes)
+            themes = themes[::-1]
+        return variants
+
+    def _verify_and_save(self, shot: Shot, locale: str | None, theme: str | None) -> Path:
+        missing = verify_screen_elements(self._driver, shot.require)
+        if missing:
+            raise MissingElementsError(
+                f"{shot.filename}: missing {missing} in view '{shot.view}'"
+                + (f", section '{shot.section}'" if shot.section else "")
+                + (f", locale {locale}" if locale else "")
+                + (f", {theme} theme" if theme else "")
+            )
+        return take_screenshot(
+            self._driver, filename=shot.filename + (f"_{theme}" if theme else ""),
+            device_profile=self._profile,
+            stable_regions=shot.stable,
+            stable_ceiling=shot.tile_wait or DEFAULT_CEILING,
+            subfolder=locale,
+        )
+
+    def capture(self, shot: Shot) -> list[Path]:
+        """
+        Prepare, verify and capture one shot — once per locale and theme
+        when the executor has them, all from the one settled state.
+
+        Returns:
+            The PNG paths saved; their writes finish in the background.
+
+        Raises:
+            LocationLoadError:   The shot's location never loaded.
+            MissingElementsError: Required elements were not on screen.
+        """
+        if self._locales and (
+            self._app_locale is None
+            or any(kind in _SYSTEM_LOCALE_TRANSITIONS for kind, _ in transitions(self._state, shot))
+        ):
+            self._switch_locale(None)
+        self.prepare(shot)
+        written = []
+        try:
+            for locale, theme in self._variants():
+                switched = locale is not None and self._switch_locale(locale)
+                switched = (theme is not None and self._switch_theme(theme)) or switched
+                if switched:
+                    # The activity was recreated: reopen anything that is not saved state
+                    self.prepare(shot)
+                written.append(self._verify_and_save(shot, locale, theme))
+        finally:
+            if shot.view == "species_list":
+                self._driver.back()
+                wait_for_ui_idle(self._driver, label="dropdown close")
+        return written
+
+    def close(self) -> None:
+        """Undo what the variant captures changed: app locale and night mode."""
+        if self._app_locale is not None:
+            self._switch_locale(None)
+        if self._night_mode is not None:
+            self._night_mode.restore()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(self) -> None:
+        """Print estimated vs actual transition cost for this run."""
+        if not self._costs:
+            return
+        print("\n[shots] Transition      count  estimated    actual")
+        total_est = total_act = 0.0
+        for kind, samples in self._costs.items():
+            est = sum(e for e, _ in samples)
+            act = sum(a for _, a in samples)
+            total_est += est
+            total_act += act
+            print(f"[shots] {kind:<14} {len(samples):>6} {est:>9.1f}s {act:>8.1f}s")
+        print(f"[shots] {'total':<14} {'':>6} {total_est:>9.1f}s {total_act:>8.1f}s")
+        if self._plan is not None:
+            print(f"[shots] Plan estimate for all {len(self._plan.steps)} shots: "
+                  f"{self._plan.estimated_cost:.1f}s")
@@ -0,0 +1,414 @@
+"""
+Declarative shot manifest and capture planner.
+
+shots.toml describes every Play Store shot by the app state it needs —
+location preset, species, forecast date, panel section — and the elements
+that must be on screen. The planner compiles it into an execution order
+that keeps expensive transitions to a minimum:
+
+  1. location changes (a full API load each) — one per distinct location
+  2. species switches — shots sharing a species are grouped per location
+  3. forecast date changes
+  4. scroll distance — sections are visited top to bottom
+
+Shots without a location (the bare map, the species list) run before any
+location is loaded, since the app cannot go back to "no location".
+
+No shot relies on an earlier one having run. transitions() rebuilds the
+state a shot needs from whatever the current state is, and a state value of
+None means "unknown": after launch, after a restart, or after a data
+reload. Unknown values are always re-established, never assumed.
+
+The plan carries an estimated cost per transition; helpers/shot_executor.py
+measures the real ones so the two can be compared after a run.
+
+Sharding splits one profile's shots across several identical devices by
+location group: the location-free shots form one group and each location
+another, so no location is loaded on two devices. Groups are dealt to
+shards by estimated cost, and each shard is planned from the launch state
+on its own. A worker picks its shard from $TIDERUNNER_SHARD ("2/3" = the
+second of three).
+"""
+
+import hashlib
+import json
+import os
+import tomllib
+from pathlib import Path
+
+import config.locations as locations
+from helpers.stability import FULL_SCREEN
+
+MANIFEST_PATH = Path(__file__).parent.parent / "shots.toml"
+
+SHARD_ENV = "TIDERUNNER_SHARD"
+
+# Views a shot can be taken in
+VIEWS = ("map", "species_list", "panel")
+
+# Theme variants a shot can be captured in (helpers/ui_mode.py)
+THEMES = ("light", "dark")
+
+# Panel sections in scroll order. None = outside the scrolling column
+# (always visible while the panel is expanded), so no scrolling needed.
+SECTION_ORDER = {
+    "date_selector": None,
+    "suitability": 0,
+    "fishing_times": 1,
+    "marine_conditions": 2,
+    "tide_information": 3,
+    "sun_and_moon": 4,
+    "solunar_periods": 5,
+}
+
+# Estimated seconds per transition, used for planning and for the
+# estimated-vs-actual report. "scroll" is one positioning gesture (see
+# ConditionsPanel._scroll_to_header) whatever the distance.
+TRANSITION_COST = {
+    "location": 8.0,
+    "species": 2.5,
+    "date": 1.0,
+    "scroll": 1.2,
+    "panel": 0.6,
+    "species_list": 1.0,
+    # Not planned: one switch per extra locale / theme in a variant capture
+    "locale": 1.5,
+    "theme": 1.5,
+}
+
+
+class Shot:
+    """One entry of the manifest."""
+
+    def __init__(self, entry: dict, index: int) -> None:
+        self.filename = entry["filename"]
+        self.view = entry.get("view", "panel")
+        self.location = entry.get("location")
+        self.species = entry.get("species")
+        self.date = int(entry.get("date", 0))
+        self.section = entry.get("section", "suitability" if self.view == "panel" else None)
+        self.expanded = bool(entry.get("expanded", True))
+        self.require = list(entry.get("require", []))
+        self.tile_wait = float(entry.get("tile_wait", 0))
+        self.mask = _rects(entry.get("mask", []))
+        stable = entry.get("stable", True)
+        self.stable = list(FULL_SCREEN) if stable is True else _rects(stable or [])
+        self.description = entry.get("description", "")
+        self.index = index
+        self.fingerprint = hashlib.sha1(
+            json.dumps(entry, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+
+        if self.view not in VIEWS:
+            raise ValueError(f"{self.filename}: unknown view '{self.view}' (expected one of {VIEWS})")
+        if self.view == "panel" and self.location is None:
+            raise ValueError(f"{self.filename}: panel shots need a location")
+        if self.section is not None and self.section not in SECTION_ORDER:
+            raise ValueError(f"{self.filename}: unknown section '{self.section}'")
+        if self.location is not None:
+            self.coords  # validate the preset name early
+        for key, rects in (("mask", self.mask), ("stable", self.stable)):
+            for rect in rects:
+                if len(rect) != 4 or not (0 <= rect[0] < rect[2] <= 1 and 0 <= rect[1] < rect[3] <= 1):
+                    raise ValueError(f"{self.filename}: {key} {list(rect)} is not [x0, y0, x1, y1] in 0–1")
+
+    @property
+    def id(self) -> str:
+        return self.filename
+
+    @property
+    def coords(self) -> tuple[float, float]:
+        preset = getattr(locations, self.location, None)
+        if not isinstance(preset, dict):
+            raise ValueError(f"{self.filename}: unknown location preset '{self.location}'")
+        return preset["lat"], preset["lon"]
+
+    def __repr__(self) -> str:
+        return f"Shot({self.filename})"
+
+
+def _rects(value: list) -> list[tuple]:
+    return [tuple(float(v) for v in rect) for rect in value]
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> list[Shot]:
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    shots = [Shot(entry, i) for i, entry in enumerate(data.get("shot", []))]
+    names = [s.filename for s in shots]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate shot filenames in {path.name}: {sorted(duplicates)}")
+    return shots
+
+
+def output_names(shot: Shot, locales: list[str] | None = None,
+                 themes: list[str] | None = None) -> list[str]:
+    """
+    The PNGs a shot produces with the --locales / --themes variants,
+    relative to the output folder and without extension:
+    [<locale>/]<filename>[_<theme>].
+    """
+    return [
+        (f"{locale}/" if locale else "") + shot.filename + (f"_{theme}" if theme else "")
+        for locale in locales or [None]
+        for theme in themes or [None]
+    ]
+
+
+def find_captures(folder: Path, names: set[str]) -> list[tuple[Path, str, str | None, str | None]]:
+    """
+    (png, shot filename, locale, theme) of every PNG under `folder` that
+    output_names() could have produced for a shot in `names`, whichever
+    --locales / --themes the run used.
+    """
+    found = []
+    for png in sorted(folder.glob("*.png")) + sorted(folder.glob("*/*.png")):
+        locale = png.parent.name if png.parent != folder else None
+        shot, theme = png.stem, None
+        for variant in THEMES:
+            if shot.endswith(f"_{variant}") and shot[:-len(variant) - 1] in names:
+                shot, theme = shot[:-len(variant) - 1], variant
+        if shot in names:
+            found.append((png, shot, locale, theme))
+    return found
+
+
+# ---------------------------------------------------------------------------
+# State and transitions
+# ---------------------------------------------------------------------------
+
+def initial_state() -> dict:
+    """
+    App state right after launch: no location, no species, today. Panel
+    expansion and scroll position are unknown until a shot sets them.
+    """
+    return {"location": None, "species": None, "date": 0, "expanded": None, "scroll": None}
+
+
+def scroll_distance(current: int | None, section: str | None) -> int:
+    """
+    Sections between scroll position `current` and `section`; 0 means no
+    scroll is needed. From an unknown position a scroll is always needed.
+    """
+    target = SECTION_ORDER.get(section) if section else None
+    if target is None:
+        return 0
+    if current is None:
+        return target + 1
+    return abs(target - current)
+
+
+def transitions(state: dict, shot: Shot) -> list[tuple[str, float]]:
+    """
+    The (kind, estimated seconds) transitions needed to go from `state` to
+    the state `shot` needs, in the order the executor performs them.
+    """
+    steps = []
+    if shot.view == "species_list":
+        return [("species_list", TRANSITION_COST["species_list"])]
+    if shot.view == "map":
+        return steps
+    if shot.species is not None and shot.species != state["species"]:
+        steps.append(("species", TRANSITION_COST["species"]))
+    scroll_from, expanded = state["scroll"], state["expanded"]
+    if shot.location != state["location"]:
+        steps.append(("location", TRANSITION_COST["location"]))
+        # A reload re-lays out the panel; re-establish both
+        scroll_from, expanded = None, None
+    if shot.date != state["date"]:
+        steps.append(("date", TRANSITION_COST["date"]))
+    if expanded is not shot.expanded:
+        steps.append(("panel", TRANSITION_COST["panel"]))
+    if shot.expanded:
+        distance = scroll_distance(scroll_from, shot.section)
+        if distance:
+            steps.append(("scroll", TRANSITION_COST["scroll"]))
+    return steps
+
+
+def apply(state: dict, shot: Shot) -> dict:
+    """The state after capturing `shot`."""
+    if shot.view != "panel":
+        return dict(state)
+    new = dict(state)
+    scroll_from = None if shot.location != state["location"] else state["scroll"]
+    target = SECTION_ORDER.get(shot.section) if shot.expanded else None
+    new.update(
+        location=shot.location,
+        species=shot.species if shot.species is not None else state["species"],
+        date=shot.date,
+        expanded=shot.expanded,
+        scroll=target if target is not None else scroll_from,
+    )
+    return new
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+class PlannedStep:
+    def __init__(self, shot: Shot, steps: list[tuple[str, float]]) -> None:
+        self.shot = shot
+        self.transitions = steps
+
+    @property
+    def estimated_cost(self) -> float:
+        return sum(cost for _, cost in self.transitions)
+
+
+class Plan:
+    def __init__(self, steps: list[PlannedStep]) -> None:
+        self.steps = steps
+
+    @property
+    def shots(self) -> list[Shot]:
+        return [step.shot for step in self.steps]
+
+    @property
+    def estimated_cost(self) -> float:
+        return sum(step.estimated_cost for step in self.steps)
+
+    def count(self, kind: str) -> int:
+        return sum(1 for step in self.steps for k, _ in step.transitions if k == kind)
+
+    def describe(self) -> str:
+        lines = []
+        for step in self.steps:
+            kinds = ", ".join(k for k, _ in step.transitions) or "—"
+            lines.append(f"  {step.shot.filename:<64} {step.estimated_cost:>5.1f}s  {kinds}")
+        lines.append(
+            f"  {'estimated total':<64} {self.estimated_cost:>5.1f}s  "
+            f"({self.count('location')} location loads, {self.count('species')} species switches)"
+        )
+        return "\n".join(lines)
+
+
+def sequence(shots: list[Shot], state: dict | None = None) -> Plan:
+    """Cost a given shot order without reordering it."""
+    state = state or initial_state()
+    steps = []
+    for shot in shots:
+        steps.append(PlannedStep(shot, transitions(state, shot)))
+        state = apply(state, shot)
+    return Plan(steps)
+
+
+def _panel_order(group: list[Shot], state: dict) -> list[Shot]:
+    """Order one location's shots: species groups, then dates, then top-to-bottom sections."""
+    species_order = []
+    for shot in group:
+        if shot.species not in species_order:
+            species_order.append(shot.species)
+    # Keep the species already selected (if any shot wants it) first
+    if state["species"] in species_order:
+        species_order.remove(state["species"])
+        species_order.insert(0, state["species"])
+
+    ordered = []
+    for species in species_order:
+        same_species = [s for s in group if s.species == species]
+        dates = sorted({s.date for s in same_species}, key=lambda d: (d != state["date"], d))
+        for date in dates:
+            ordered.extend(sorted(
+                (s for s in same_species if s.date == date),
+                key=lambda s: (SECTION_ORDER[s.section] is not None, SECTION_ORDER[s.section] or 0, s.index),
+            ))
+    return ordered
+
+
+def plan(shots: list[Shot], state: dict | None = None) -> Plan:
+    """
+    Compile shots into a low-cost execution order. Location-free shots go
+    first (map before species list); each location is loaded once, and
+    the next location is chosen so its species matches the current one
+    whenever possible.
+    """
+    state = state or initial_state()
+    view_rank = {view: i for i, view in enumerate(VIEWS)}
+    ordered = sorted(
+        (s for s in shots if s.location is None), key=lambda s: (view_rank[s.view], s.index)
+    )
+    for shot in ordered:
+        state = apply(state, shot)
+
+    groups: dict[str, list[Shot]] = {}
+    for shot in shots:
+        if shot.location is not None:
+            groups.setdefault(shot.location, []).append(shot)
+
+    while groups:
+        # Prefer the current location, then one that keeps the selected species
+        if state["location"] in groups:
+            location = state["location"]
+        else:
+            location = next(
+                (loc for loc, group in groups.items()
+                 if any(s.species == state["species"] for s in group)),
+                next(iter(groups)),
+            )
+        for shot in _panel_order(groups.pop(location), state):
+            ordered.append(shot)
+            state = apply(state, shot)
+
+    return sequence(ordered)
+
+
+def location_groups(shots: list[Shot]) -> list[list[Shot]]:
+    """Shots grouped by location, location-free shots first, in manifest order."""
+    groups: dict[str | None, list[Shot]] = {}
+    for shot in sorted(shots, key=lambda s: (s.location is not None, s.index)):
+        groups.setdefault(shot.location, []).append(shot)
+    return list(groups.values())
+
+
+def shard_shots(shots: list[Shot], count: int) -> list[list[Shot]]:
+    """
+    Deal location groups to `count` shards, most expensive group first, each
+    to the shard with the least estimated work so far. Shards beyond the
+    number of groups stay empty.
+    """
+    shards: list[list[Shot]] = [[] for _ in range(count)]
+    costs = [0.0] * count
+    groups = sorted(location_groups(shots), key=lambda g: -plan(g).estimated_cost)
+    for group in groups:
+        target = costs.index(min(costs))
+        shards[target].extend(group)
+        costs[target] += plan(group).estimated_cost
+    return shards
+
+
+def current_shard() -> tuple[int, int] | None:
+    """(index, count) from $TIDERUNNER_SHARD, 1-based, or None when not sharded."""
+    value = os.environ.get(SHARD_ENV)
+    if not value:
+        return None
+    index, count = (int(part) for part in value.split("/"))
+    if not 1 <= index <= count:
+        raise ValueError(f"${SHARD_ENV}={value}: shard index must be between 1 and {count}")
+    return index, count
+
+
+def load_plan(path: Path = MANIFEST_PATH, shard: tuple[int, int] | None = None) -> Plan:
+    """The capture plan for the manifest, or for one (index, count) shard of it."""
+    shots = load_manifest(path)
+    if shard is not None:
+        index, count = shard
+        shots = shard_shots(shots, count)[index - 1]
+    return plan(shots)
+
+
+if __name__ == "__main__":
+    shots = load_manifest()
+    manifest_order = sequence(shots)
+    planned = plan(shots)
+    print(f"[plan] {len(shots)} shots from {MANIFEST_PATH.name}\n")
+    print(planned.describe())
+    print(f"\n[plan] Manifest order would cost {manifest_order.estimated_cost:.1f}s "
+          f"({manifest_order.count('location')} location loads)")
+    groups = len(location_groups(shots))
+    if groups > 1:
+        costs = [plan(shard).estimated_cost for shard in shard_shots(shots, groups)]
+        print(f"[plan] Sharded over {groups} devices: slowest shard {max(costs):.1f}s "
+              f"({', '.join(f'{c:.1f}s' for c in costs)})")
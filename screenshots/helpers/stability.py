@@ -0,0 +1,161 @@
+"""
+Frame-stability detection.
+
+Some of what a screenshot shows settles without the hierarchy changing:
+OSMDroid tile fades, Compose enter animations, the FishingTimesGraph
+drawing itself in. wait_for_stable_frames() watches the pixels instead:
+
+  - frames are grabbed back to back with the session's capture backend
+    (helpers/capture.py — raw adb screencap when available)
+  - each is reduced to luminance at 1/8 size (1080x2280 → 135x285)
+  - consecutive frames are compared per region of interest as one array
+    difference: a region is still while at most `threshold` of its sampled
+    pixels changed by more than _PIXEL_TOLERANCE levels
+  - the screen is stable once every region has stayed still for
+    `stable_frames` frames in a row
+
+The last frame is returned, so the caller can save exactly the frame that
+was judged stable instead of grabbing another one (see
+helpers/screenshot.take_screenshot).
+
+Regions are (x0, y0, x1, y1) fractions of the screen, like the visual-diff
+masks in shots.toml.
+"""
+
+import math
+import time
+
+import numpy as np
+from appium.webdriver import Remote as AppiumDriver
+
+from helpers.capture import CapturedFrame, capture_frame, get_capture_backend
+
+Region = tuple[float, float, float, float]
+
+# Everything below the status bar (its clock ticks once a minute)
+FULL_SCREEN: tuple[Region, ...] = ((0.0, 0.035, 1.0, 1.0),)
+
+# Consecutive still frames that count as stable (2 = one unchanged pair)
+DEFAULT_STABLE_FRAMES = 2
+
+# Fraction of a region's sampled pixels allowed to change between frames
+DEFAULT_THRESHOLD = 0.002
+
+# Pause between grabs (seconds). A grab itself takes 50–300 ms.
+DEFAULT_INTERVAL = 0.05
+
+# Default upper bound for a stability wait (seconds)
+DEFAULT_CEILING = 3.0
+
+# Per-side reduction of sampled frames
+_SAMPLE_REDUCTION = 8
+
+# Luminance change (0–255) below which a sampled pixel counts as unchanged:
+# above compression and dithering noise, below a tile fading in
+_PIXEL_TOLERANCE = 12
+
+
+def frame_luminance(frame: CapturedFrame) -> np.ndarray:
+    """Reduced luminance of a frame as a signed array (room for differences)."""
+    image = frame.to_image().convert("L").reduce(_SAMPLE_REDUCTION)
+    return np.asarray(image, dtype=np.int16)
+
+
+def moved_fractions(previous: np.ndarray, current: np.ndarray, regions) -> list[float]:
+    """Per region, the fraction of sampled pixels that changed between two frames."""
+    moved = np.abs(current - previous) > _PIXEL_TOLERANCE
+    h, w = moved.shape
+    return [
+        float(moved[int(y0 * h):math.ceil(y1 * h), int(x0 * w):math.ceil(x1 * w)].mean())
+        for x0, y0, x1, y1 in regions
+    ]
+
+
+def _grab(driver: AppiumDriver) -> CapturedFrame:
+    # Straight from the backend: samples stay out of the capture statistics
+    try:
+        return get_capture_backend(driver).grab()
+    except Exception:
+        return capture_frame(driver)  # lets capture_frame fall back to Appium
+
+
+def sample_frame(driver: AppiumDriver) -> np.ndarray:
+    """Reduced luminance of the screen as it is now, for wait_for_frame_change()."""
+    return frame_luminance(_grab(driver))
+
+
+def wait_for_frame_change(
+    driver: AppiumDriver,
+    before: np.ndarray,
+    regions=FULL_SCREEN,
+    threshold: float = 0.02,
+    interval: float = DEFAULT_INTERVAL,
+    ceiling: float = DEFAULT_CEILING,
+    label: str = "frames",
+) -> bool:
+    """
+    Grab frames until some region differs from `before` (a sample_frame())
+    in more than `threshold` of its sampled pixels. A positive signal that a
+    redraw the hierarchy does not show (a theme change) has reached the
+    screen, before waiting for it to hold still.
+
+    Returns:
+        True once the screen changed, False if the ceiling was reached first.
+    """
+    start = time.monotonic()
+    deadline = start + ceiling
+    while True:
+        current = sample_frame(driver)
+        if current.shape != before.shape or max(moved_fractions(before, current, regions)) > threshold:
+            print(f"[stable] {label} redrawn after {time.monotonic() - start:.2f}s")
+            return True
+        if time.monotonic() >= deadline:
+            print(f"[stable] ⚠️  {label} not redrawn within {ceiling:.1f}s")
+            return False
+        time.sleep(interval)
+
+
+def wait_for_stable_frames(
+    driver: AppiumDriver,
+    regions=FULL_SCREEN,
+    stable_frames: int = DEFAULT_STABLE_FRAMES,
+    threshold: float = DEFAULT_THRESHOLD,
+    interval: float = DEFAULT_INTERVAL,
+    ceiling: float = DEFAULT_CEILING,
+    label: str = "frames",
+) -> CapturedFrame | None:
+    """
+    Grab frames until every region has held still for `stable_frames`
+    consecutive frames, or `ceiling` seconds pass.
+
+    Returns:
+        The last (stable) frame, or None if the ceiling was reached first.
+    """
+    start = time.monotonic()
+    deadline = start + ceiling
+    regions = list(regions)
+    still = [0] * len(regions)
+    previous = None
+    grabs = 0
+
+    while True:
+        frame = _grab(driver)
+        grabs += 1
+        current = frame_luminance(frame)
+        if previous is not None and previous.shape == current.shape:
+            for i, moved in enumerate(moved_fractions(previous, current, regions)):
+                still[i] = still[i] + 1 if moved <= threshold else 0
+        previous = current
+
+        # `still` counts unchanged pairs, so N still frames == N - 1 pairs
+        if all(n >= stable_frames - 1 for n in still):
+            elapsed = time.monotonic() - start
+            print(f"[stable] {label} still after {elapsed:.2f}s ({grabs} frame(s))")
+            return frame
+
+        if time.monotonic() >= deadline:
+            moving = [i for i, n in enumerate(still) if n < stable_frames - 1]
+            print(f"[stable] ⚠️  {label} still moving after {ceiling:.1f}s ceiling "
+                  f"(region(s) {moving})")
+            return None
+        time.sleep(interval)
@@ -0,0 +1,104 @@
+"""
+The app's string resources, for matching on-screen text in any locale.
+
+Locators in screens/ and the `require` lists in shots.toml are written in
+English, the app's default resources. While a locale is active
+(set_locale), every text lookup goes through localize(). If the English
+text is a string resource in app/src/main/res/values/strings.xml, it
+becomes that resource's translation in values-<locale>/. Text the app
+does not take from resources is shown untranslated, so it is matched
+unchanged.
+
+Resource directories are searched the way Android resolves them: "pt-BR"
+tries values-b+pt+BR, values-pt-rBR and values-pt, then falls back to the
+default values.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+RES_DIR = Path(__file__).parent.parent.parent / "app" / "src" / "main" / "res"
+
+# aapt escapes: \' \" \n \t \\ and \@ / \?
+_ESCAPE_RE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "t": "\t"}
+
+_ACTIVE_STRINGS: "AppStrings | None" = None
+
+
+def _unescape(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def read_strings(path: Path) -> dict[str, str]:
+    """name -> text of the <string> entries in one strings.xml (empty if missing)."""
+    if not path.exists():
+        return {}
+    strings = {}
+    for elem in ET.parse(path).getroot().iter("string"):
+        if elem.get("translatable") == "false":
+            continue
+        strings[elem.get("name")] = _unescape("".join(elem.itertext()))
+    return strings
+
+
+def resource_qualifiers(locale: str) -> list[str]:
+    """values-* directories for a BCP 47 tag, most specific first."""
+    parts = locale.replace("_", "-").split("-")
+    language, rest = parts[0].lower(), parts[1:]
+    dirs = []
+    if rest:
+        dirs.append("values-b+" + "+".join([language, *rest]))
+        region = next((p for p in rest if len(p) == 2 or p.isdigit()), None)
+        if region:
+            dirs.append(f"values-{language}-r{region.upper()}")
+    dirs.append(f"values-{language}")
+    return dirs
+
+
+class AppStrings:
+    """English text -> text in one locale, for every string resource."""
+
+    def __init__(self, locale: str, res_dir: Path = RES_DIR) -> None:
+        self.locale = locale
+        default = read_strings(res_dir / "values" / "strings.xml")
+        localized: dict[str, str] = {}
+        for qualifier in reversed(resource_qualifiers(locale)):
+            localized.update(read_strings(res_dir / qualifier / "strings.xml"))
+        self.translated = sum(1 for name in default if name in localized)
+        self._by_english = {
+            text: localized.get(name, text) for name, text in default.items() if "%" not in text
+        }
+
+    def localize(self, text: str) -> str:
+        """
+        The on-screen form of `text` in this locale. An exact resource value
+        is translated; so is a substring of exactly one resource (the whole
+        translated resource is returned, which contains-matching still finds).
+        """
+        if text in self._by_english:
+            return self._by_english[text]
+        containing = [english for english in self._by_english if text in english]
+        if len(containing) == 1:
+            return self._by_english[containing[0]]
+        return text
+
+
+def set_locale(locale: str | None) -> AppStrings | None:
+    """Resolve lookups for `locale` from now on; None goes back to plain English."""
+    global _ACTIVE_STRINGS
+    _ACTIVE_STRINGS = AppStrings(locale) if locale else None
+    return _ACTIVE_STRINGS
+
+
+def active_strings() -> AppStrings | None:
+    return _ACTIVE_STRINGS
+
+
+def localize(text: str) -> str:
+    """`text` as the app shows it in the active locale (unchanged without one)."""
+    return _ACTIVE_STRINGS.localize(text) if _ACTIVE_STRINGS is not None else text
@@ -0,0 +1,459 @@
+"""
+Local map tile archive for the OSMDroid base map and OpenSeaMap overlay.
+
+Three parts, so map shots never depend on the network:
+
+  build — download every tile the shots can show into one MBTiles file per
+          layer (fixtures/tiles/<layer>.mbtiles). Coverage is the launch
+          view plus a viewport around every preset in config/locations.py,
+          at the zoom levels MapScreen.kt uses.
+  seed  — write those tiles into osmdroid's own SQLite tile cache
+          (cache/tiles/cache.db) on the device before the session, so the
+          map draws from disk on the first frame.
+  serve — an HTTP tile server for anything the cache misses. Debug builds
+          made with -Ptiderunner.tileBaseUrl=http://10.0.2.2:8766/ fetch
+          tiles from it instead of tile.openstreetmap.org /
+          tiles.openseamap.org. Misses are fetched upstream once and added
+          to the archive.
+
+The server also tells the harness when tile traffic has stopped
+(wait_for_tiles_idle), which replaces sleeping for tiles.
+
+Usage (from the screenshots/ directory):
+    python -m helpers.tile_archive build
+    python -m helpers.tile_archive seed --serial emulator-5554
+    python -m helpers.tile_archive serve
+"""
+
+import argparse
+import math
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import adbutils
+
+SCRIPT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import ALL_DEVICE_PROFILES, APP_PACKAGE
+from config.locations import ALL_LOCATIONS
+
+TILE_ARCHIVE_ENV = "TIDERUNNER_TILE_ARCHIVE"
+TILE_ROOT = SCRIPT_DIR / "fixtures" / "tiles"
+DEFAULT_PORT = 8766
+
+# Layer name (URL prefix on the tile server) -> osmdroid provider name and
+# upstream URL. The provider name is the tile source name in MapScreen.kt;
+# osmdroid keys its cache on it, so they must match exactly.
+LAYERS = {
+    "osm": {
+        "provider": "Mapnik",
+        "upstream": "https://tile.openstreetmap.org/{z}/{x}/{y}.png",
+    },
+    "seamark": {
+        "provider": "OpenSeaMap",
+        "upstream": "https://tiles.openseamap.org/seamark/{z}/{x}/{y}.png",
+    },
+}
+
+# Views the shots show (see ui/MapScreen.kt): the launch view, then
+# animateTo(preset) at the launch zoom followed by setZoom(13.0)
+LAUNCH_VIEW = (35.0, -75.0, 8)
+LAUNCH_ZOOM = 8
+LOCATION_ZOOM = 13
+
+TILE_SIZE = 256
+
+# osmdroid's MapTileIndex packs (zoom, x, y) into one long, 29 bits each
+_OSMDROID_INDEX_BITS = 29
+
+# osmdroid cache path inside the app's data dir, and a far-future expiry
+# so seeded tiles are never treated as stale
+_DEVICE_CACHE_DB = "cache/tiles/cache.db"
+_NEVER_EXPIRES_MS = 4102444800000   # 2100-01-01
+
+# Politeness for tile.openstreetmap.org's usage policy
+_USER_AGENT = "TideRunner-screenshots/1.0 (tile archive for Play Store captures)"
+_DOWNLOAD_WORKERS = 2
+
+# Server started by start_in_background(), if any
+_ACTIVE_SERVER: ThreadingHTTPServer | None = None
+
+
+def lat_lon_to_tile(lat: float, lon: float, zoom: int) -> tuple[float, float]:
+    """Fractional slippy-map tile coordinates of a point."""
+    n = 2 ** zoom
+    x = (lon + 180.0) / 360.0 * n
+    lat_rad = math.radians(lat)
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tiles_for_view(lat: float, lon: float, zoom: int, width_px: int, height_px: int) -> set[tuple[int, int, int]]:
+    """Every (z, x, y) visible in a viewport centred on (lat, lon), plus a one-tile margin."""
+    cx, cy = lat_lon_to_tile(lat, lon, zoom)
+    half_w = width_px / 2 / TILE_SIZE + 1
+    half_h = height_px / 2 / TILE_SIZE + 1
+    n = 2 ** zoom
+    return {
+        (zoom, x % n, y)
+        for x in range(math.floor(cx - half_w), math.floor(cx + half_w) + 1)
+        for y in range(max(0, math.floor(cy - half_h)), min(n - 1, math.floor(cy + half_h)) + 1)
+    }
+
+
+def shot_coverage(profiles: list[dict] | None = None) -> set[tuple[int, int, int]]:
+    """All tiles needed by the launch view and every location preset, on every profile."""
+    tiles = set()
+    for profile in profiles or ALL_DEVICE_PROFILES:
+        size = (profile["screen_width"], profile["screen_height"])
+        tiles |= tiles_for_view(*LAUNCH_VIEW, *size)
+        for loc in ALL_LOCATIONS:
+            tiles |= tiles_for_view(loc["lat"], loc["lon"], LAUNCH_ZOOM, *size)
+            tiles |= tiles_for_view(loc["lat"], loc["lon"], LOCATION_ZOOM, *size)
+    return tiles
+
+
+class MBTiles:
+    """
+    Minimal MBTiles 1.3 store (one file per layer). Rows use the spec's
+    TMS y axis; the methods here take and return slippy-map (XYZ) y.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER,"
+            " tile_row INTEGER, tile_data BLOB,"
+            " PRIMARY KEY (zoom_level, tile_column, tile_row));"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO metadata VALUES ('name', ?), ('format', 'png')", (path.stem,)
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _tms_row(z: int, y: int) -> int:
+        return (2 ** z - 1) - y
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, self._tms_row(z, y)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, z: int, x: int, y: int, data: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)",
+                (z, x, self._tms_row(z, y), data),
+            )
+            self._conn.commit()
+
+    def has(self, z: int, x: int, y: int) -> bool:
+        return self.get(z, x, y) is not None
+
+    def all_tiles(self):
+        """Yield (z, x, y, data) for every stored tile, y in XYZ."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+            ).fetchall()
+        for z, x, row, data in rows:
+            yield z, x, self._tms_row(z, row), data
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_archive(layer: str, root: Path = TILE_ROOT) -> MBTiles:
+    return MBTiles(root / f"{layer}.mbtiles")
+
+
+def fetch_upstream(layer: str, z: int, x: int, y: int) -> bytes | None:
+    """Download one tile from the layer's public server. None if it does not exist."""
+    url = LAYERS[layer]["upstream"].format(z=z, x=x, y=y)
+    request = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            return resp.read()
+    except urllib.error.HTTPError as e:
+        # OpenSeaMap answers 404 for tiles with no seamarks — that's "empty", not an error
+        if e.code == 404:
+            return None
+        raise
+
+
+def build_archive(layers: list[str] | None = None, root: Path = TILE_ROOT) -> dict[str, int]:
+    """
+    Download every tile in shot_coverage() that is not archived yet.
+    Returns the number of tiles added per layer.
+    """
+    wanted = sorted(shot_coverage())
+    added = {}
+    for layer in layers or list(LAYERS):
+        archive = open_archive(layer, root)
+        missing = [t for t in wanted if not archive.has(*t)]
+        print(f"[tiles] {layer}: {len(wanted) - len(missing)}/{len(wanted)} archived, fetching {len(missing)}")
+
+        def _download(tile, layer=layer, archive=archive):
+            data = fetch_upstream(layer, *tile)
+            if data is not None:
+                archive.put(*tile, data)
+            return data is not None
+
+        with ThreadPoolExecutor(_DOWNLOAD_WORKERS) as pool:
+            added[layer] = sum(pool.map(_download, missing))
+        print(f"[tiles] {layer}: {archive.count()} tiles in {archive.path.name}")
+        archive.close()
+    return added
+
+
+# ---------------------------------------------------------------------------
+# Device cache seeding
+# ---------------------------------------------------------------------------
+
+def osmdroid_tile_key(z: int, x: int, y: int) -> int:
+    """osmdroid MapTileIndex.getTileIndex(z, x, y) — the cache's primary key."""
+    return (z << (_OSMDROID_INDEX_BITS * 2)) + (x << _OSMDROID_INDEX_BITS) + y
+
+
+def build_osmdroid_cache(db_path: Path, root: Path = TILE_ROOT) -> int:
+    """
+    Write every archived tile into a SQLite file with osmdroid's
+    SqlTileWriter schema. Returns the number of tiles written.
+    """
+    db_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE tiles (key INTEGER, provider TEXT, tile BLOB, expires INTEGER,"
+        " PRIMARY KEY (key, provider))"
+    )
+    written = 0
+    for layer, spec in LAYERS.items():
+        path = root / f"{layer}.mbtiles"
+        if not path.exists():
+            continue
+        archive = MBTiles(path)
+        conn.executemany(
+            "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)",
+            (
+                (osmdroid_tile_key(z, x, y), spec["provider"], data, _NEVER_EXPIRES_MS)
+                for z, x, y, data in archive.all_tiles()
+            ),
+        )
+        written += archive.count()
+        archive.close()
+    conn.commit()
+    conn.close()
+    return written
+
+
+def seed_device_cache(serial: str | None = None, package: str = APP_PACKAGE, root: Path = TILE_ROOT) -> int:
+    """
+    Replace the app's osmdroid tile cache with the archived tiles.
+
+    The app is force-stopped first (osmdroid holds the database open) and
+    the file is copied in with run-as, so this needs a debuggable build.
+    Returns the number of tiles seeded.
+    """
+    device = adbutils.adb.device(serial=serial)
+    with tempfile.TemporaryDirectory() as tmp:
+        local_db = Path(tmp) / "cache.db"
+        count = build_osmdroid_cache(local_db, root)
+        if count == 0:
+            print(f"[tiles] ⚠️  No archived tiles under {root} — run `python -m helpers.tile_archive build`")
+            return 0
+        remote_tmp = f"/data/local/tmp/{package}-tiles.db"
+        device.sync.push(str(local_db), remote_tmp)
+
+    device.shell(f"am force-stop {package}")
+    cache_dir = _DEVICE_CACHE_DB.rsplit("/", 1)[0]
+    output = device.shell(
+        f"run-as {package} sh -c 'mkdir -p {cache_dir} && "
+        f"rm -f {_DEVICE_CACHE_DB}-journal {_DEVICE_CACHE_DB}-wal {_DEVICE_CACHE_DB}-shm && "
+        f"cp {remote_tmp} {_DEVICE_CACHE_DB} && echo ok'"
+    )
+    device.shell(f"rm -f {remote_tmp}")
+    if "ok" not in output:
+        raise RuntimeError(f"Could not seed osmdroid cache for {package}: {output.strip()}")
+    print(f"[tiles] Seeded {count} tiles into {package}/{_DEVICE_CACHE_DB}")
+    return count
+
+
+# ---------------------------------------------------------------------------
+# Tile server
+# ---------------------------------------------------------------------------
+
+class _TileHandler(BaseHTTPRequestHandler):
+    root: Path = TILE_ROOT
+    offline = False
+    archives: dict[str, MBTiles] = {}
+    stats: dict[str, int] = {}
+    lock = threading.Lock()
+    in_flight = 0
+    last_request = 0.0
+
+    def log_message(self, fmt, *args):
+        pass
+
+    @classmethod
+    def _track(cls, delta: int, outcome: str | None = None) -> None:
+        with cls.lock:
+            cls.in_flight += delta
+            cls.last_request = time.monotonic()
+            if outcome:
+                cls.stats[outcome] = cls.stats.get(outcome, 0) + 1
+
+    def _tile(self) -> tuple[str, int, int, int] | None:
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 4 or parts[0] not in LAYERS or not parts[3].endswith(".png"):
+            return None
+        try:
+            return parts[0], int(parts[1]), int(parts[2]), int(parts[3][:-4])
+        except ValueError:
+            return None
+
+    def do_GET(self) -> None:
+        type(self)._track(+1)
+        outcome = "miss"
+        try:
+            tile = self._tile()
+            data = None
+            if tile is not None:
+                layer, z, x, y = tile
+                archive = self.archives[layer]
+                data = archive.get(z, x, y)
+                if data is not None:
+                    outcome = "hit"
+                elif not self.offline:
+                    data = fetch_upstream(layer, z, x, y)
+                    if data is not None:
+                        archive.put(z, x, y, data)
+                        outcome = "fetched"
+            if data is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            type(self)._track(-1, outcome)
+
+
+def make_tile_server(port: int = DEFAULT_PORT, offline: bool = False, root: Path = TILE_ROOT) -> ThreadingHTTPServer:
+    """
+    Build (but do not start) a tile server answering /<layer>/<z>/<x>/<y>.png
+    from the archive. With `offline`, misses get a 404 instead of an
+    upstream fetch.
+    """
+    handler = type("TileHandler", (_TileHandler,), {
+        "root": root,
+        "offline": offline,
+        "archives": {layer: open_archive(layer, root) for layer in LAYERS},
+        "stats": {},
+        "lock": threading.Lock(),
+        "in_flight": 0,
+        "last_request": 0.0,
+    })
+    return ThreadingHTTPServer(("0.0.0.0", port), handler)
+
+
+def start_in_background(port: int = DEFAULT_PORT, offline: bool = False) -> ThreadingHTTPServer:
+    """Start a tile server on a daemon thread and return it."""
+    global _ACTIVE_SERVER
+    server = make_tile_server(port=port, offline=offline)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[tiles] Serving map tiles on port {port}")
+    _ACTIVE_SERVER = server
+    return server
+
+
+def active_server() -> ThreadingHTTPServer | None:
+    """The tile server started for this run, or None when using live tiles."""
+    return _ACTIVE_SERVER
+
+
+def stop_active_server() -> None:
+    global _ACTIVE_SERVER
+    if _ACTIVE_SERVER is not None:
+        print(f"[tiles] Tile server: {_ACTIVE_SERVER.RequestHandlerClass.stats}")
+        _ACTIVE_SERVER.shutdown()
+        _ACTIVE_SERVER = None
+
+
+def wait_for_tiles_idle(server: ThreadingHTTPServer, quiet: float = 0.5, ceiling: float = 5.0) -> bool:
+    """
+    Wait until the tile server has had no request in flight for `quiet`
+    seconds. With a seeded cache this returns after `quiet`; it only waits
+    longer while osmdroid is still fetching misses.
+
+    Returns True if tile traffic went quiet within `ceiling`.
+    """
+    handler = server.RequestHandlerClass
+    deadline = time.monotonic() + ceiling
+    while time.monotonic() < deadline:
+        with handler.lock:
+            idle_for = time.monotonic() - handler.last_request
+            busy = handler.in_flight > 0
+        if not busy and idle_for >= quiet:
+            return True
+        time.sleep(min(0.1, quiet))
+    return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    build = sub.add_parser("build", help="download the shot coverage into fixtures/tiles/")
+    build.add_argument("--layers", nargs="+", choices=list(LAYERS))
+
+    seed = sub.add_parser("seed", help="push the archive into the app's osmdroid cache")
+    seed.add_argument("--serial", help="adb serial (default: the only connected device)")
+    seed.add_argument("--package", default=APP_PACKAGE)
+
+    serve = sub.add_parser("serve", help="serve tiles to a -Ptiderunner.tileBaseUrl debug build")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--offline", action="store_true", help="404 on misses instead of fetching upstream")
+    args = parser.parse_args()
+
+    if args.mode == "build":
+        build_archive(args.layers)
+    elif args.mode == "seed":
+        seed_device_cache(args.serial, args.package)
+    else:
+        server = make_tile_server(port=args.port, offline=args.offline)
+        print(f"[tiles] Serving map tiles on port {args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print(f"[tiles] {server.RequestHandlerClass.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Light / dark theme switching over adb.
+
+`cmd uimode night yes|no` flips the device's night mode. The app follows it
+(MainActivity picks dark or light Material colours from the system setting),
+and the change recreates its activity like any configuration change: the
+ViewModel and the saveable panel and date state survive, so the screen
+returns to the same state, redrawn in the other theme.
+
+The hierarchy is the same in both themes, so idle and stability waits
+started right after the command could settle on frames from before the
+recreation. switch() first waits for positive signs that it happened: the
+watchdog seeing the activity relaunched, then the screen's pixels changing.
+
+Night mode is a device setting. NightMode remembers the mode it found, and
+restore() puts it back at the end of a run.
+"""
+
+import re
+import time
+
+import adbutils
+from appium.webdriver import Remote as AppiumDriver
+
+from helpers import watchdog
+from helpers.settle import wait_for_ui_idle
+from helpers.shot_plan import THEMES
+from helpers.stability import sample_frame, wait_for_frame_change
+
+_NIGHT_RE = re.compile(r"Night mode:\s*(\w+)")
+
+# Longest to wait for the activity relaunch, and then for the redraw (seconds)
+_RELAUNCH_TIMEOUT = 5.0
+_REDRAW_TIMEOUT = 5.0
+
+
+def device_night_mode(serial: str | None) -> str | None:
+    """The device's night mode ("yes", "no", "auto", …), or None without adb."""
+    try:
+        output = adbutils.adb.device(serial=serial).shell("cmd uimode night")
+    except Exception:
+        return None
+    match = _NIGHT_RE.search(output)
+    return match.group(1) if match else None
+
+
+class NightMode:
+    """Switches one device between the light and dark themes."""
+
+    def __init__(self, serial: str | None) -> None:
+        self._device = adbutils.adb.device(serial=serial)
+        self._serial = serial
+        self.original = device_night_mode(serial)
+
+    def switch(self, driver: AppiumDriver, theme: str) -> float:
+        """
+        Put the device in `theme` ("light" or "dark") and wait for the app
+        to redraw.
+
+        Returns:
+            Seconds the switch took.
+        """
+        if theme not in THEMES:
+            raise ValueError(f"Unknown theme '{theme}' (expected one of {THEMES})")
+        start = time.monotonic()
+        wanted = "yes" if theme == "dark" else "no"
+        if device_night_mode(self._serial) != wanted:
+            wd = watchdog.active_watchdog()
+            relaunches = wd.relaunch_count if wd is not None else 0
+            before = sample_frame(driver)
+            self._device.shell(f"cmd uimode night {wanted}")
+            if wd is not None and not wd.wait_for_relaunch(relaunches, _RELAUNCH_TIMEOUT):
+                print(f"[theme] ⚠️  No activity relaunch within {_RELAUNCH_TIMEOUT:.0f}s")
+            wait_for_frame_change(driver, before, ceiling=_REDRAW_TIMEOUT, label=f"{theme} theme")
+            wait_for_ui_idle(driver, label=f"{theme} theme")
+        elapsed = time.monotonic() - start
+        print(f"[theme] {theme.capitalize()} theme ({elapsed:.1f}s)")
+        return elapsed
+
+    def restore(self) -> None:
+        if self.original and device_night_mode(self._serial) != self.original:
+            self._device.shell(f"cmd uimode night {self.original}")
+            print(f"[theme] Night mode restored to '{self.original}'")
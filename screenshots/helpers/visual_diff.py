@@ -0,0 +1,308 @@
+"""
+Visual regression check of captures against committed baselines.
+
+Compares every manifest capture in output/<output_folder>/ with the same
+file in baselines/<output_folder>/, for every device profile, and says which
+shots changed and where. Locale folders and theme variants
+(<locale>/<filename>_dark.png) are found the same way the compositor finds
+them (shot_plan.find_captures), so each one is checked against its own
+baseline:
+
+  1. both images are reduced to luminance and downscaled 4x by block mean
+     (sub-pixel anti-aliasing noise averages out)
+  2. masked regions — the status bar on every shot, plus any `mask`
+     rectangles in the shot's shots.toml entry (live values, animations) —
+     are copied from the baseline, so they can never differ
+  3. the image is cut into tiles and each tile gets an SSIM score and an
+     RMSE, all tiles at once as array operations
+  4. a tile below SSIM_THRESHOLD, or above RMSE_THRESHOLD, is changed; a
+     shot with any changed tile is "changed" and gets a heatmap overlay in
+     output/diff/<output_folder>/
+
+SSIM alone misses flat shifts: structure is compared relative to the
+tile's own brightness, so a uniform 250 → 215 change still scores ~0.99.
+The RMSE bound catches those (a changed background or theme colour).
+
+Shots are compared in a process pool. The verdict for the whole set goes to
+output/diff/verdict.json, and the exit code is 1 if anything changed, so
+the check can gate a Play Store refresh.
+
+Usage (from the screenshots/ directory):
+    python -m helpers.visual_diff                      # all profiles
+    python -m helpers.visual_diff --profile phone
+    python -m helpers.visual_diff --update-baselines   # accept the current captures
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+SCRIPT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import ALL_DEVICE_PROFILES, get_device_profile
+from helpers import screenshot
+from helpers.shot_plan import find_captures, load_manifest
+
+BASELINE_ROOT = SCRIPT_DIR / "baselines"
+DIFF_DIR = "diff"
+VERDICT_NAME = "verdict.json"
+
+# Tiles scoring below this SSIM, or above this RMSE (8-bit luminance, after
+# downscaling), count as changed
+SSIM_THRESHOLD = 0.98
+RMSE_THRESHOLD = 10.0
+
+# Downscale factor, and tile edge in downscaled pixels (32 → 128 device px)
+_DOWNSCALE = 4
+_TILE = 32
+
+# Masked on every shot: the status bar clock, battery and notification icons
+_STATUS_BAR = (0.0, 0.0, 1.0, 0.035)
+
+# SSIM stabilising constants for 8-bit luminance
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+# Statuses that fail the check
+FAILING = ("changed", "resized", "missing")
+
+
+def _luma(path: Path) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("L"), dtype=np.float32)
+
+
+def _downscale(pixels: np.ndarray, factor: int) -> np.ndarray:
+    h, w = pixels.shape[0] // factor * factor, pixels.shape[1] // factor * factor
+    return pixels[:h, :w].reshape(h // factor, factor, w // factor, factor).mean(axis=(1, 3))
+
+
+def _mask(shape: tuple[int, int], rects: list[tuple]) -> np.ndarray:
+    """Boolean array, True where the image is ignored."""
+    h, w = shape
+    mask = np.zeros(shape, dtype=bool)
+    for x0, y0, x1, y1 in rects:
+        mask[int(y0 * h):int(np.ceil(y1 * h)), int(x0 * w):int(np.ceil(x1 * w))] = True
+    return mask
+
+
+def _tiles(pixels: np.ndarray) -> np.ndarray:
+    """(rows, cols, _TILE * _TILE) view of an image padded to whole tiles."""
+    h, w = pixels.shape
+    padded = np.pad(pixels, ((0, -h % _TILE), (0, -w % _TILE)), mode="edge")
+    rows, cols = padded.shape[0] // _TILE, padded.shape[1] // _TILE
+    return padded.reshape(rows, _TILE, cols, _TILE).swapaxes(1, 2).reshape(rows, cols, -1)
+
+
+def tile_scores(baseline: np.ndarray, capture: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-tile (SSIM, RMSE) of two equally sized luminance images."""
+    a, b = _tiles(baseline), _tiles(capture)
+    mu_a, mu_b = a.mean(axis=-1), b.mean(axis=-1)
+    var_a, var_b = a.var(axis=-1), b.var(axis=-1)
+    cov = ((a - mu_a[..., None]) * (b - mu_b[..., None])).mean(axis=-1)
+    ssim = ((2 * mu_a * mu_b + _C1) * (2 * cov + _C2)) / (
+        (mu_a ** 2 + mu_b ** 2 + _C1) * (var_a + var_b + _C2)
+    )
+    rmse = np.sqrt(((a - b) ** 2).mean(axis=-1))
+    return ssim, rmse
+
+
+def _write_heatmap(capture_path: Path, diff: np.ndarray, mask: np.ndarray,
+                   changed: np.ndarray, dest: Path) -> None:
+    """Capture dimmed to grey, differences in red, masks in blue, changed tiles boxed."""
+    with Image.open(capture_path) as image:
+        base = np.asarray(image.convert("L"), dtype=np.float32) * 0.5
+    h, w = base.shape
+    scale = lambda a: np.repeat(np.repeat(a, _DOWNSCALE, axis=0), _DOWNSCALE, axis=1)
+    heat = np.zeros((h, w), dtype=np.float32)
+    masked = np.zeros((h, w), dtype=bool)
+    sh, sw = diff.shape[0] * _DOWNSCALE, diff.shape[1] * _DOWNSCALE
+    heat[:sh, :sw] = scale(np.clip(diff / 64.0, 0.0, 1.0))
+    masked[:sh, :sw] = scale(mask)
+
+    rgb = np.stack([base, base, base], axis=-1)
+    rgb[..., 0] = rgb[..., 0] * (1 - heat) + 255 * heat
+    rgb[..., 1] *= 1 - heat
+    rgb[..., 2] *= 1 - heat
+    rgb[masked, 2] = np.minimum(255, rgb[masked, 2] + 90)
+    overlay = Image.fromarray(rgb.astype(np.uint8), "RGB")
+
+    draw = ImageDraw.Draw(overlay)
+    edge = _TILE * _DOWNSCALE
+    for row, col in zip(*np.nonzero(changed)):
+        draw.rectangle(
+            (col * edge, row * edge, min(w, (col + 1) * edge) - 1, min(h, (row + 1) * edge) - 1),
+            outline=(255, 220, 0), width=3,
+        )
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    overlay.save(dest)
+
+
+def compare_shot(job: dict) -> dict:
+    """
+    Compare one capture with its baseline. Runs in a worker process, so the
+    job and the result are plain dicts.
+    """
+    capture, baseline = Path(job["capture"]), Path(job["baseline"])
+    result = {"profile": job["profile"], "shot": job["shot"], "status": "unchanged"}
+    if not capture.exists():
+        result["status"] = "missing"
+        return result
+    if not baseline.exists():
+        result["status"] = "new"
+        return result
+
+    before, after = _luma(baseline), _luma(capture)
+    if before.shape != after.shape:
+        result.update(status="resized", baseline_size=before.shape[::-1], capture_size=after.shape[::-1])
+        return result
+
+    before, after = _downscale(before, _DOWNSCALE), _downscale(after, _DOWNSCALE)
+    mask = _mask(before.shape, [_STATUS_BAR, *job["mask"]])
+    after = np.where(mask, before, after)
+
+    ssim, rmse = tile_scores(before, after)
+    # Tiles that are entirely masked carry no signal
+    ignored = _tiles(mask.astype(np.float32)).min(axis=-1) > 0
+    changed = ((ssim < SSIM_THRESHOLD) | (rmse > RMSE_THRESHOLD)) & ~ignored
+    compared = ~ignored
+
+    result.update(
+        min_ssim=round(float(ssim[compared].min()), 4) if compared.any() else 1.0,
+        max_tile_rmse=round(float(rmse[compared].max()), 2) if compared.any() else 0.0,
+        changed_tiles=int(changed.sum()),
+        changed_fraction=round(float(changed.sum() / max(1, compared.sum())), 4),
+    )
+    if changed.any():
+        result["status"] = "changed"
+        edge = _TILE * _DOWNSCALE
+        rows, cols = np.nonzero(changed)
+        result["changed_region"] = [
+            int(cols.min() * edge), int(rows.min() * edge),
+            int((cols.max() + 1) * edge), int((rows.max() + 1) * edge),
+        ]
+        heatmap = Path(job["heatmap"])
+        _write_heatmap(capture, np.abs(after - before), mask, changed, heatmap)
+        result["heatmap"] = str(heatmap)
+    return result
+
+
+def _jobs(profiles: list[dict]) -> list[dict]:
+    """One job per capture or baseline variant, e.g. "de-DE/01_map_dark"."""
+    shots = {shot.filename: shot for shot in load_manifest()}
+    diff_root = screenshot.OUTPUT_ROOT / DIFF_DIR
+    jobs = []
+    for profile in profiles:
+        folder = profile["output_folder"]
+        images: dict[str, str] = {}
+        for root in (screenshot.OUTPUT_ROOT / folder, BASELINE_ROOT / folder):
+            for png, shot, _, _ in find_captures(root, set(shots)):
+                images.setdefault(png.relative_to(root).with_suffix("").as_posix(), shot)
+        jobs.extend(
+            {
+                "profile": folder,
+                "shot": image,
+                "mask": shots[shot].mask,
+                "capture": str(screenshot.OUTPUT_ROOT / folder / f"{image}.png"),
+                "baseline": str(BASELINE_ROOT / folder / f"{image}.png"),
+                "heatmap": str(diff_root / folder / f"{image}.png"),
+            }
+            for image, shot in sorted(images.items())
+        )
+    return jobs
+
+
+def compare_all(profiles: list[dict], workers: int | None = None) -> dict:
+    """Compare every manifest capture of `profiles`; returns the verdict dict."""
+    jobs = _jobs(profiles)
+    diff_root = screenshot.OUTPUT_ROOT / DIFF_DIR
+    for profile in profiles:
+        shutil.rmtree(diff_root / profile["output_folder"], ignore_errors=True)
+
+    started = time.perf_counter()
+    results = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(compare_shot, jobs))
+
+    counts: dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {
+        "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+        "ssim_threshold": SSIM_THRESHOLD,
+        "rmse_threshold": RMSE_THRESHOLD,
+        "seconds": round(time.perf_counter() - started, 2),
+        "passed": not any(r["status"] in FAILING for r in results),
+        "counts": counts,
+        "shots": results,
+    }
+
+
+def update_baselines(profiles: list[dict]) -> int:
+    """Copy the current captures over the baselines; drop baselines of removed shots."""
+    names = {shot.filename for shot in load_manifest()}
+    copied = 0
+    for profile in profiles:
+        source = screenshot.OUTPUT_ROOT / profile["output_folder"]
+        target = BASELINE_ROOT / profile["output_folder"]
+        for png, _, _, _ in find_captures(source, names):
+            dest = target / png.relative_to(source)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(png, dest)
+            copied += 1
+        current = {png for png, _, _, _ in find_captures(target, names)}
+        for stale in sorted(target.rglob("*.png")):
+            if stale not in current:
+                stale.unlink()
+    return copied
+
+
+_ICONS = {"unchanged": "✅", "new": "🆕", "changed": "❌", "resized": "❌", "missing": "⚠️ "}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", action="append", help="output folder of a device profile (repeatable)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--update-baselines", action="store_true", help="accept the current captures")
+    args = parser.parse_args()
+
+    profiles = [get_device_profile(p) for p in args.profile] if args.profile else ALL_DEVICE_PROFILES
+
+    if args.update_baselines:
+        copied = update_baselines(profiles)
+        print(f"[diff] Updated {copied} baseline(s) in {BASELINE_ROOT.relative_to(SCRIPT_DIR)}/")
+        return 0
+
+    verdict = compare_all(profiles, args.workers)
+    for r in verdict["shots"]:
+        detail = ""
+        if r["status"] == "changed":
+            detail = (f"  {r['changed_tiles']} tile(s), min SSIM {r['min_ssim']:.3f}, "
+                      f"max RMSE {r['max_tile_rmse']:.1f} → {Path(r['heatmap']).relative_to(SCRIPT_DIR)}")
+        elif r["status"] == "resized":
+            detail = f"  {r['baseline_size']} → {r['capture_size']}"
+        print(f"[diff] {_ICONS[r['status']]} {r['profile']}/{r['shot']}: {r['status']}{detail}")
+
+    path = screenshot.OUTPUT_ROOT / DIFF_DIR / VERDICT_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(verdict, indent=2), encoding="utf-8")
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(verdict["counts"].items()))
+    print(f"\n[diff] {len(verdict['shots'])} shot(s) in {verdict['seconds']:.1f}s: {summary or 'nothing to compare'}")
+    print(f"[diff] Verdict: {path.relative_to(SCRIPT_DIR)}")
+    return 0 if verdict["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Out-of-band app health watchdog.
+
+Follows the system's activity-manager event log over adb instead of asking
+Appium whether the app is still in front before every test:
+
+    am_proc_start            the app's process started (new pid)
+    am_proc_died             the app's process is gone
+    am_crash                 uncaught exception in the app
+    am_anr                   the app stopped responding
+    wm_set_resumed_activity  an activity came to the front (Android 10+;
+    am_set_resumed_activity  am_… on older releases)
+    wm_relaunch_*activity    an activity is recreated for a configuration
+                             change (night mode, locale); am_… on older releases
+
+Crashes and ANRs are reported the moment they are logged, and stay flagged
+until the guard has recovered from them. `healthy` is a local flag: checking
+it costs no device round trip, so the per-test guard in conftest.py is
+free while nothing is wrong. Recovery in helpers/app_guard.py waits on
+these events instead of sleeping for fixed times.
+"""
+
+import re
+import threading
+import time
+
+import adbutils
+
+from helpers import logcat
+
+_EVENT_TAGS = (
+    "am_proc_start",
+    "am_proc_died",
+    "am_crash",
+    "am_anr",
+    "wm_set_resumed_activity",
+    "am_set_resumed_activity",
+    "wm_relaunch_resume_activity",
+    "am_relaunch_resume_activity",
+    "wm_relaunch_activity",
+    "am_relaunch_activity",
+)
+
+# "topResumedActivity=ActivityRecord{8a1c2f0 u0 com.fishing.conditions.debug/…MainActivity t12}"
+_RESUMED_RECORD = re.compile(r"(?:mResumedActivity|topResumedActivity)\S*\s*ActivityRecord\{\S+ u\d+ ([^/\s]+)/")
+
+_ACTIVE_WATCHDOG: "AppWatchdog | None" = None
+
+
+class AppWatchdog:
+    """
+    Tracks one app's process, foreground state and crashes on a background thread.
+    """
+
+    def __init__(self, serial: str | None, package: str) -> None:
+        self._device = adbutils.adb.device(serial=serial)
+        self.package = package
+        self._cond = threading.Condition()
+        self._pid: int | None = None
+        self._foreground = False
+        self._problem: str | None = None
+        self._incidents: list[str] = []
+        self._relaunches = 0
+        self._conn = None
+        self._stream = None
+        self._alive = False
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    @property
+    def alive(self) -> bool:
+        return self._alive
+
+    @property
+    def healthy(self) -> bool:
+        """Process running, app in front, no unhandled crash or ANR."""
+        with self._cond:
+            return self._pid is not None and self._foreground and self._problem is None
+
+    @property
+    def running(self) -> bool:
+        return self._pid is not None
+
+    @property
+    def problem(self) -> str | None:
+        """The crash or ANR flagged since the last recovery, if any."""
+        return self._problem
+
+    @property
+    def incident_count(self) -> int:
+        return len(self._incidents)
+
+    @property
+    def relaunch_count(self) -> int:
+        """Activity recreations of the app seen so far (see wait_for_relaunch)."""
+        return self._relaunches
+
+    def incidents_since(self, count: int) -> list[str]:
+        return self._incidents[count:]
+
+    def describe(self) -> str:
+        if self._problem:
+            return self._problem
+        if self._pid is None:
+            return "process not running"
+        return "in foreground" if self._foreground else "in background"
+
+    def acknowledge(self) -> None:
+        """Clear the flagged problem once the app has been restarted."""
+        with self._cond:
+            self._problem = None
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def start(self) -> "AppWatchdog":
+        self._conn, self._stream = logcat.open_stream(
+            self._device, "-b events -s " + " ".join(_EVENT_TAGS)
+        )
+        # Events only describe changes; read the current state once
+        pid = self._device.shell(f"pidof {self.package}").split()
+        resumed = _RESUMED_RECORD.search(self._device.shell("dumpsys activity activities"))
+        with self._cond:
+            self._pid = int(pid[0]) if pid else None
+            self._foreground = bool(resumed) and resumed.group(1) == self.package
+        self._alive = True
+        threading.Thread(target=self._run, name="app-watchdog", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            logcat.close_stream(conn)
+
+    def _run(self) -> None:
+        try:
+            for raw in self._stream:
+                parsed = logcat.parse_line(raw.decode("utf-8", "replace"))
+                if parsed is not None:
+                    self._handle(parsed[1], parsed[2])
+        except (OSError, ValueError, AttributeError):
+            pass  # connection closed by stop() or adb went away
+        finally:
+            with self._cond:
+                self._alive = False
+                self._cond.notify_all()
+
+    def _handle(self, tag: str, message: str) -> None:
+        # Event log payloads are bracketed lists: "[0,4321,com.example,…]"
+        fields = message.strip().strip("[]").split(",")
+        with self._cond:
+            if tag.endswith("_set_resumed_activity"):
+                if len(fields) > 1:
+                    self._foreground = fields[1].split("/")[0] == self.package
+            elif "_relaunch_" in tag:
+                # [user, token, task id, component, …]
+                if len(fields) > 3 and fields[3].split("/")[0] == self.package:
+                    self._relaunches += 1
+            elif tag == "am_proc_start":
+                # [user, pid, uid, process, type, component]
+                if len(fields) > 3 and fields[3] == self.package:
+                    self._pid = int(fields[1])
+            elif len(fields) > 2 and fields[2] == self.package:
+                self._on_app_event(tag, fields)
+            self._cond.notify_all()
+
+    def _on_app_event(self, tag: str, fields: list[str]) -> None:
+        if tag == "am_proc_died":
+            self._pid = None
+            self._foreground = False
+            return
+        if tag == "am_crash":
+            # [user, pid, process, flags, exception, message, file, line, …]
+            detail = ": ".join(f for f in fields[4:6] if f)
+            self._flag(f"crashed ({detail})" if detail else "crashed")
+        elif tag == "am_anr":
+            # [user, pid, package, flags, reason]
+            reason = ",".join(fields[4:]).strip()
+            self._flag(f"not responding ({reason})" if reason else "not responding")
+
+    def _flag(self, problem: str) -> None:
+        self._problem = problem
+        self._incidents.append(problem)
+        print(f"\n[watchdog] 💥 {self.package} {problem}")
+
+    # ------------------------------------------------------------------
+    # Waiting
+    # ------------------------------------------------------------------
+
+    def _wait(self, predicate, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not predicate():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._alive:
+                    return predicate()
+                self._cond.wait(remaining)
+            return True
+
+    def wait_until_foreground(self, timeout: float = 10.0) -> bool:
+        """Block until the app's process is up and one of its activities is resumed."""
+        return self._wait(lambda: self._pid is not None and self._foreground, timeout)
+
+    def wait_for_relaunch(self, after: int, timeout: float = 5.0) -> bool:
+        """Block until an activity of the app has been recreated since `relaunch_count` was `after`."""
+        return self._wait(lambda: self._relaunches > after, timeout)
+
+    def wait_until_stopped(self, timeout: float = 5.0) -> bool:
+        """Block until the app's process has died."""
+        return self._wait(lambda: self._pid is None, timeout)
+
+
+def start_watchdog(serial: str | None, package: str) -> AppWatchdog | None:
+    """
+    Start the watchdog for this run. Returns None (and the guard asks
+    Appium before every test, as before) if adb is unavailable.
+    """
+    global _ACTIVE_WATCHDOG
+    stop_watchdog()
+    try:
+        _ACTIVE_WATCHDOG = AppWatchdog(serial, package).start()
+    except Exception as e:
+        print(f"[watchdog] adb unavailable ({e}) — checking the app through Appium")
+        return None
+    print(f"[watchdog] Watching {package} ({_ACTIVE_WATCHDOG.describe()})")
+    return _ACTIVE_WATCHDOG
+
+
+def active_watchdog() -> AppWatchdog | None:
+    """The running watchdog, or None when the guard must ask Appium."""
+    if _ACTIVE_WATCHDOG is not None and _ACTIVE_WATCHDOG.alive:
+        return _ACTIVE_WATCHDOG
+    return None
+
+
+def stop_watchdog() -> None:
+    global _ACTIVE_WATCHDOG
+    if _ACTIVE_WATCHDOG is not None:
+        _ACTIVE_WATCHDOG.stop()
+        _ACTIVE_WATCHDOG = None
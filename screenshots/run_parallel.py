@@ -0,0 +1,335 @@
+"""
+Parallel multi-device screenshot capture.
+
+Fans the shot suite out to one pytest worker process per device profile in
+config/devices.ALL_DEVICE_PROFILES. Each worker:
+
+  - selects its profile via $TIDERUNNER_DEVICE_PROFILE
+  - opens its own Appium session on its own UiAutomator2 systemPort
+  - writes PNGs to output/<output_folder>/ and a JUnit XML next to them
+
+With --emulators N, the workers run on a pool of N headless emulators
+(helpers/emulator_pool.py) instead of devices started by hand: each worker
+leases one, gets that emulator's udid and ports, and hands it back when
+done.
+
+With --shards K, each profile's shots are also split by location group
+(helpers/shot_plan.shard_shots) across K workers on K emulators, so
+different locations are captured at the same time. Every shard plans from
+the app's launch state and writes into the profile's usual output folder;
+their JUnit results are merged into one junit.xml and one report entry.
+
+With $TIDERUNNER_API_FIXTURES or $TIDERUNNER_TILE_ARCHIVE set, the API
+fixtures and map tiles are served once, from this process, for all workers.
+
+When every worker has exited, the per-device results are merged into a
+single report at output/parallel_report.json and summarised on stdout.
+Wall time is that of the slowest device, not the sum of all of them.
+
+Usage (from the screenshots/ directory, with Appium already running):
+    python run_parallel.py                      # every profile
+    python run_parallel.py --profiles phone     # a subset, by output folder
+    python run_parallel.py --emulators 2        # on two pool emulators
+    python run_parallel.py --shards 3           # each profile split over 3 emulators
+    python run_parallel.py -- -k tide        # extra args go to pytest
+"""
+
+import argparse
+import json
+import contextlib
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import ALL_DEVICE_PROFILES, DEVICE_PROFILE_ENV, get_device_profile
+from helpers import fixture_server, tile_archive
+from helpers.emulator_pool import DeviceLease, EmulatorPool
+from helpers.screenshot import OUTPUT_ROOT, clear_output_folder
+from helpers.shot_plan import SHARD_ENV, load_manifest, location_groups, output_names
+
+SUITE = "tests/test_capture_screenshots.py"
+REPORT_PATH = OUTPUT_ROOT / "parallel_report.json"
+
+
+def _check_unique_ports(profiles: list[dict]) -> None:
+    """Two sessions sharing a systemPort would steal each other's server."""
+    seen: dict[int, str] = {}
+    for profile in profiles:
+        port = profile.get("system_port")
+        if port is None:
+            raise ValueError(f"Profile '{profile['output_folder']}' has no system_port")
+        if port in seen:
+            raise ValueError(
+                f"Profiles '{seen[port]}' and '{profile['output_folder']}' "
+                f"share system_port {port}"
+            )
+        seen[port] = profile["output_folder"]
+
+
+def _worker_label(profile: dict, shard: tuple[int, int] | None) -> str:
+    return profile["output_folder"] + (f"[{shard[0]}/{shard[1]}]" if shard else "")
+
+
+def _launch_worker(profile: dict, pytest_args: list[str], lease: DeviceLease | None = None,
+                   shard: tuple[int, int] | None = None):
+    """
+    Start one pytest process for a profile (or one shard of it), on a pool
+    device if given a lease.
+    Returns (process, open log file, junit path, log path).
+    """
+    folder = OUTPUT_ROOT / profile["output_folder"]
+    folder.mkdir(parents=True, exist_ok=True)
+    suffix = f".shard-{shard[0]}" if shard else ""
+    junit_path = folder / f"junit{suffix}.xml"
+    log_path = folder / f"pytest{suffix}.log"
+
+    env = dict(os.environ)
+    env[DEVICE_PROFILE_ENV] = profile["output_folder"]
+    env[fixture_server.SHARED_SERVERS_ENV] = "1"
+    if lease is not None:
+        env.update(lease.to_env())
+    if shard is not None:
+        env[SHARD_ENV] = f"{shard[0]}/{shard[1]}"
+    system_port = lease.system_port if lease is not None else profile["system_port"]
+    cmd = [
+        sys.executable, "-m", "pytest", SUITE,
+        f"--junitxml={junit_path}",
+        "-p", "no:cacheprovider",
+        *pytest_args,
+    ]
+    log_file = open(log_path, "w", encoding="utf-8")
+    proc = subprocess.Popen(
+        cmd, cwd=SCRIPT_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT
+    )
+    device = f", {lease.udid}" if lease is not None else ""
+    print(f"[parallel] Started {_worker_label(profile, shard)} (pid {proc.pid}, "
+          f"systemPort {system_port}{device}) → {log_path.relative_to(SCRIPT_DIR)}")
+    return proc, log_file, junit_path, log_path
+
+
+def _run_worker(profile: dict, pytest_args: list[str], pool: EmulatorPool | None,
+                shard: tuple[int, int] | None = None) -> dict:
+    """Run one worker to completion and return its report entry."""
+    instance = pool.lease() if pool is not None else None
+    lease = instance.lease if instance is not None else None
+    try:
+        proc, log_file, junit_path, log_path = _launch_worker(profile, pytest_args, lease, shard)
+        returncode = proc.wait()
+        log_file.close()
+    finally:
+        if instance is not None:
+            pool.release(instance)
+    tests = _parse_junit(junit_path)
+    print(f"[parallel] {_worker_label(profile, shard)} finished with exit code {returncode}")
+    return {
+        "device_name": profile["device_name"],
+        "system_port": lease.system_port if lease is not None else profile["system_port"],
+        **({"udid": lease.udid} if lease is not None else {}),
+        "returncode": returncode,
+        "wall_time_s": round(sum(t["duration_s"] for t in tests), 2),
+        "log": str(log_path.relative_to(SCRIPT_DIR)),
+        "junit": junit_path,
+        "tests": tests,
+    }
+
+
+def _variant_options(pytest_args: list[str]) -> tuple[list[str] | None, list[str] | None]:
+    """The --locales and --themes values forwarded to pytest, if any."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--locales", nargs="+")
+    parser.add_argument("--themes", nargs="+")
+    known, _ = parser.parse_known_args(pytest_args)
+    return known.locales, known.themes
+
+
+def _merge_shards(profile: dict, shards: list[dict], pytest_args: list[str]) -> dict:
+    """
+    Combine a profile's shard entries into one: every test, the worst exit
+    code, and the slowest shard's time. Also writes the profile's junit.xml
+    from the shards' and removes PNGs no longer in the manifest, which the
+    shards leave alone. The PNGs kept are the ones the shards produce, locale
+    and theme variants included.
+    """
+    folder = OUTPUT_ROOT / profile["output_folder"]
+    merged = ET.Element("testsuites")
+    for shard in shards:
+        if shard["junit"].exists():
+            root = ET.parse(shard["junit"]).getroot()
+            merged.extend(list(root) if root.tag == "testsuites" else [root])
+    ET.ElementTree(merged).write(folder / "junit.xml", encoding="utf-8", xml_declaration=True)
+    locales, themes = _variant_options(pytest_args)
+    keep = {name for shot in load_manifest() for name in output_names(shot, locales, themes)}
+    clear_output_folder(profile, keep=keep)
+
+    return {
+        "device_name": profile["device_name"],
+        "returncode": max(shard["returncode"] for shard in shards),
+        "wall_time_s": max(shard["wall_time_s"] for shard in shards),
+        "shards": [{k: v for k, v in shard.items() if k not in ("tests", "junit")} for shard in shards],
+        "tests": sorted((t for shard in shards for t in shard["tests"]), key=lambda t: t["test"]),
+    }
+
+
+def _parse_junit(junit_path: Path) -> list[dict]:
+    """Flatten a JUnit XML file into one dict per test case."""
+    if not junit_path.exists():
+        return []
+    results = []
+    for case in ET.parse(junit_path).getroot().iter("testcase"):
+        outcome = "passed"
+        message = ""
+        for tag in ("failure", "error", "skipped"):
+            child = case.find(tag)
+            if child is not None:
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[tag]
+                message = child.get("message", "")
+                break
+        results.append({
+            "test": case.get("name"),
+            "outcome": outcome,
+            "duration_s": float(case.get("time", 0.0)),
+            "message": message,
+        })
+    return results
+
+
+def shard_count(requested: int) -> int:
+    """Shards worth running: no more than the manifest has location groups."""
+    return max(1, min(requested, len(location_groups(load_manifest()))))
+
+
+@contextlib.contextmanager
+def _shared_servers():
+    """
+    Serve the API fixtures ($TIDERUNNER_API_FIXTURES) and map tiles
+    ($TIDERUNNER_TILE_ARCHIVE) once, from this process, for every worker.
+    Each worker's session fixtures would otherwise bind the same ports, and
+    all but the first would fail at setup. Workers still seed their own
+    device's tile cache; with no tile server in their process, their map
+    waits rely on frame stability alone.
+    """
+    fixtures = None
+    setting = os.environ.get(fixture_server.FIXTURE_ENV)
+    if setting:
+        fixtures = fixture_server.start_in_background(date=None if setting == "latest" else setting)
+        for name in fixture_server.missing_locations(fixtures.fixture_date):
+            print(f"[fixture] ⚠️  No API fixtures for {name} — its shots will show errors")
+    setting = os.environ.get(tile_archive.TILE_ARCHIVE_ENV)
+    if setting:
+        tile_archive.start_in_background(offline=setting == "offline")
+    try:
+        yield
+    finally:
+        if fixtures is not None:
+            print(f"[fixture] API fixture hits: {fixtures.RequestHandlerClass.stats}")
+            fixtures.shutdown()
+        tile_archive.stop_active_server()
+
+
+def run(profiles: list[dict], pytest_args: list[str], pool: EmulatorPool | None = None,
+        shards: int = 1) -> dict:
+    """
+    Run the suite on every profile concurrently and return the merged report.
+
+    Without a pool every worker starts at once on the profile's own device.
+    With one, each worker leases an emulator and waits while all are busy.
+    With shards > 1 (pool required), each profile's shots are split across
+    that many workers, and their results are merged per profile.
+    """
+    if pool is None:
+        if shards > 1:
+            raise ValueError("Sharding needs an emulator pool (--emulators)")
+        _check_unique_ports(profiles)
+    start = time.monotonic()
+
+    tasks = [
+        (profile, (i, shards) if shards > 1 else None)
+        for profile in profiles
+        for i in range(1, shards + 1)
+    ]
+    with _shared_servers(), \
+            ThreadPoolExecutor(max_workers=len(pool) if pool is not None else len(tasks)) as executor:
+        futures = [
+            (profile, executor.submit(_run_worker, profile, pytest_args, pool, shard))
+            for profile, shard in tasks
+        ]
+        results: dict[str, list[dict]] = {}
+        for profile, future in futures:
+            results.setdefault(profile["output_folder"], []).append(future.result())
+
+    report = {"devices": {}, "wall_time_s": 0.0}
+    for profile in profiles:
+        entries = results[profile["output_folder"]]
+        if shards > 1:
+            report["devices"][profile["output_folder"]] = _merge_shards(profile, entries, pytest_args)
+        else:
+            entries[0].pop("junit")
+            report["devices"][profile["output_folder"]] = entries[0]
+
+    report["wall_time_s"] = round(time.monotonic() - start, 2)
+    OUTPUT_ROOT.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def print_summary(report: dict) -> None:
+    print("")
+    print(f"{'device':<12} {'passed':>6} {'failed':>6} {'skipped':>7} {'time':>8}")
+    for name, device in report["devices"].items():
+        outcomes = [t["outcome"] for t in device["tests"]]
+        failed = outcomes.count("failed") + outcomes.count("error")
+        print(
+            f"{name:<12} {outcomes.count('passed'):>6} {failed:>6} "
+            f"{outcomes.count('skipped'):>7} {device['wall_time_s']:>7.1f}s"
+        )
+        for i, shard in enumerate(device.get("shards", []), start=1):
+            print(f"  shard {i:<4} {shard['udid']:>20} {'':>7} {shard['wall_time_s']:>7.1f}s")
+    print(f"\nTotal wall time: {report['wall_time_s']:.1f}s")
+    print(f"Report: {REPORT_PATH.relative_to(SCRIPT_DIR)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--profiles", nargs="+", metavar="FOLDER",
+        help="output_folder names of the profiles to run (default: all)",
+    )
+    parser.add_argument(
+        "--emulators", type=int, default=0, metavar="N",
+        help="boot N headless emulators for the run instead of using running devices",
+    )
+    parser.add_argument(
+        "--shards", type=int, default=1, metavar="K",
+        help="split each profile's shots by location group across K emulators "
+             "(boots K unless --emulators is given)",
+    )
+    parser.add_argument("pytest_args", nargs="*", help="extra arguments passed to pytest")
+    args = parser.parse_args()
+
+    if args.profiles:
+        profiles = [get_device_profile(name) for name in args.profiles]
+    else:
+        profiles = list(ALL_DEVICE_PROFILES)
+
+    shards = shard_count(args.shards)
+    if shards < args.shards:
+        print(f"[parallel] The manifest has {shards} location group(s) — running {shards} shard(s)")
+    emulators = args.emulators or (shards if shards > 1 else 0)
+    if emulators:
+        with EmulatorPool(emulators) as pool:
+            report = run(profiles, args.pytest_args, pool, shards)
+    else:
+        report = run(profiles, args.pytest_args)
+    print_summary(report)
+    return 0 if all(d["returncode"] == 0 for d in report["devices"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
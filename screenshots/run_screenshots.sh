@@ -63,7 +63,8 @@ fi
 
 if ! adb devices 2>/dev/null | grep -q "emulator"; then
     echo ""
-    echo "⚠️   No emulator detected via adb. Make sure your Pixel 4 AVD is running."
+    echo "⚠️   No emulator detected via adb. Make sure your Pixel 4 AVD is running,"
+    echo "    or let the pool boot headless ones:  .venv/bin/python run_parallel.py --emulators 2"
     echo "    Continuing anyway in case adb path differs..."
     echo ""
 fi
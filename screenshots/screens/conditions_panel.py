@@ -5,29 +5,92 @@ Handles interactions with the slide-up conditions panel that appears
 after tapping a location on the map. Supports:
   - Expanding / collapsing the panel
   - Scrolling to reveal specific data sections
-  - Reading the fishing suitability score
+  - Reading the fishing suitability score and the panel's values
 """
 
-import time
+import datetime
+import math
+import re
 
 from appium.webdriver import Remote as AppiumDriver
 from helpers.driver_utils import (
+    drag,
     find_by_text,
-    find_by_text_contains,
     find_by_accessibility_id,
-    scroll_down,
-    scroll_up,
+    scroll_into_view,
     wait_for_text,
 )
+from helpers.hierarchy import HierarchySnapshot
+from helpers.section_layout import SECTION_HEADERS, SectionLayout
+from helpers.settle import wait_for_ui_idle
+
+# Section name (as used in shots.toml) -> ConditionsPanel method that brings it into view
+SECTION_SCROLLERS = {
+    "date_selector": "scroll_to_date_selector",
+    "suitability": "scroll_to_top",
+    "fishing_times": "scroll_to_fishing_times_graph",
+    "marine_conditions": "scroll_to_marine_conditions",
+    "tide_information": "scroll_to_tide_information",
+    "sun_and_moon": "scroll_to_sun_and_moon",
+    "solunar_periods": "scroll_to_solunar_periods",
+}
+
+
+SUITABILITY_RATINGS = ("EXCELLENT", "GOOD", "FAIR", "POOR")
+
+# Label in the panel -> field name in read_conditions(). Each label is a
+# Text followed, in the hierarchy, by the Text holding its value.
+CONDITION_LABELS = {
+    "Water Temp": "water_temp_f",
+    "Wave Height": "wave_height_ft",
+    "Current": "current_mph",
+    "Wind Speed": "wind_speed_mph",
+    "Air Temp": "air_temp_f",
+    "Pressure": "pressure_hpa",
+    "Next High Tide": "next_high_tide",
+    "Next Low Tide": "next_low_tide",
+    "Sunrise": "sunrise",
+    "Sunset": "sunset",
+    "Moon Phase": "moon_phase",
+}
+
+# Fields read as numbers (units stripped); the rest are kept as shown
+_NUMERIC_FIELDS = {"water_temp_f", "wave_height_ft", "current_mph", "wind_speed_mph",
+                   "air_temp_f", "pressure_hpa"}
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+# Where a section header is placed, as a fraction of the scrolling column's
+# height below its top edge
+_LANDING_FRACTION = 0.03
+
+# A header already this close (px) to its landing spot is left where it is
+_LANDING_TOLERANCE = 48
+
+# Drag strokes stay this fraction of the column height inside its edges.
+# The column runs to the bottom of the screen, and a stroke starting in
+# the gesture-navigation strip would send the app home.
+_DRAG_MARGIN = 0.15
+
+# Larger landing errors than this per stroke are not touch slop (the
+# content hit its end, or the layout changed) and are not learned from
+_MAX_LOSS_PER_STROKE = 60
 
 
 class ConditionsPanel:
     """
     Encapsulates all interactions with the ConditionsPanel composable.
+
+    Pass the device profile to keep the learned section layout (see
+    helpers/section_layout.py) across runs; without one it is learned
+    afresh for this instance.
     """
 
-    def __init__(self, driver: AppiumDriver) -> None:
+    def __init__(self, driver: AppiumDriver, device_profile: dict | None = None) -> None:
         self._driver = driver
+        self._layout = (
+            SectionLayout.for_profile(device_profile) if device_profile else SectionLayout()
+        )
 
     # ------------------------------------------------------------------
     # Panel visibility
@@ -44,7 +107,7 @@ class ConditionsPanel:
         expand_icon = find_by_accessibility_id(self._driver, "Expand")
         if expand_icon:
             expand_icon.click()
-            time.sleep(0.8)
+            wait_for_ui_idle(self._driver, label="panel expand")
             print("[panel] Expanded conditions panel")
         else:
             print("[panel] Panel already expanded (no 'Expand' icon found)")
@@ -56,7 +119,7 @@ class ConditionsPanel:
         collapse_icon = find_by_accessibility_id(self._driver, "Collapse")
         if collapse_icon:
             collapse_icon.click()
-            time.sleep(0.8)
+            wait_for_ui_idle(self._driver, label="panel collapse")
             print("[panel] Collapsed conditions panel")
 
     def ensure_expanded(self) -> None:
@@ -74,46 +137,90 @@ class ConditionsPanel:
         """
         Scroll back to the top of the conditions panel (suitability score).
         """
-        scroll_up(self._driver, swipes=4)
-        time.sleep(0.5)
+        self._scroll_to_header("Fishing Suitability")
 
     def scroll_to_marine_conditions(self) -> None:
         """
-        Scroll until the "Marine Conditions" section header is visible.
+        Scroll the "Marine Conditions" section header to the top of the panel.
         This section contains water temp, wave height, wind, and pressure.
         """
-        self._scroll_until_text_visible("Marine Conditions", max_swipes=5)
+        self._scroll_to_header("Marine Conditions")
 
     def scroll_to_tide_information(self) -> None:
         """
-        Scroll until the "Tide Information" section is visible.
+        Scroll the "Tide Information" section to the top of the panel.
         """
-        self._scroll_until_text_visible("Tide Information", max_swipes=6)
+        self._scroll_to_header("Tide Information")
 
     def scroll_to_sun_and_moon(self) -> None:
         """
-        Scroll until the "Sun & Moon" section is visible.
+        Scroll the "Sun & Moon" section to the top of the panel.
         """
-        self._scroll_until_text_visible("Sun & Moon", max_swipes=7)
+        self._scroll_to_header("Sun & Moon")
 
     def scroll_to_solunar_periods(self) -> None:
         """
-        Scroll until the "Solunar Periods" section is visible.
+        Scroll the "Solunar Periods" section into view (it is the last
+        section, so it may stop short of the top).
         """
-        self._scroll_until_text_visible("Solunar Periods", max_swipes=8)
+        self._scroll_to_header("Solunar Periods")
 
     def scroll_to_fishing_times_graph(self) -> None:
         """
         Scroll to show the "Best Fishing Times Today" graph.
         The graph sits just below the suitability score.
         """
-        self._scroll_until_text_visible("Best Fishing Times Today", max_swipes=4)
+        self._scroll_to_header("Best Fishing Times Today")
 
     def scroll_to_date_selector(self) -> None:
         """
-        Scroll to show the 10-day date forecast strip.
+        The 10-day date strip sits above the scrolling column, so it is
+        visible whenever the panel is expanded — nothing to scroll.
+        """
+        if HierarchySnapshot.capture(self._driver).find_text_contains("Select Forecast Date") is None:
+            print("[panel] ⚠️  'Select Forecast Date' not on screen — is the panel expanded?")
+
+    def scroll_to_section(self, section: str) -> None:
         """
-        self._scroll_until_text_visible("Select Forecast Date", max_swipes=4)
+        Bring a section into view by its manifest name (see SECTION_SCROLLERS).
+        """
+        getattr(self, SECTION_SCROLLERS[section])()
+
+    # ------------------------------------------------------------------
+    # Forecast date
+    # ------------------------------------------------------------------
+
+    def select_forecast_date(self, day_offset: int) -> bool:
+        """
+        Tap a card in the 10-day date strip. Cards read "Today" or the
+        short date ("Oct 18"), matching DateCard in ConditionsPanel.kt.
+
+        Returns True if the card was found and tapped.
+        """
+        if day_offset == 0:
+            label = "Today"
+        else:
+            day = datetime.date.today() + datetime.timedelta(days=day_offset)
+            label = f"{day:%b} {day.day}"
+
+        for _ in range(3):
+            snapshot = HierarchySnapshot.capture(self._driver)
+            card = snapshot.find_text(label)
+            if card:
+                card.click()
+                wait_for_ui_idle(self._driver, label="forecast date")
+                print(f"[panel] Selected forecast date '{label}'")
+                return True
+            # Later days are off-screen to the right of the strip
+            strip = snapshot.find_text_contains("Select Forecast Date")
+            if strip is None or strip.bounds is None:
+                break
+            width = self._driver.get_window_size()["width"]
+            y = strip.bounds[3] + 100
+            self._driver.swipe(int(width * 0.8), y, int(width * 0.2), y, 300)
+            wait_for_ui_idle(self._driver, label="date strip")
+        print(f"[panel] Forecast date '{label}' not found in the date strip")
+        return False
 
     # ------------------------------------------------------------------
     # Data reads
@@ -124,8 +231,9 @@ class ConditionsPanel:
         Read the numeric suitability score from the score badge (0–100).
         The badge is a Box containing a Text with the integer score.
         """
+        snapshot = HierarchySnapshot.capture(self._driver)
         for rating in ["EXCELLENT", "GOOD", "FAIR", "POOR"]:
-            elem = find_by_text(self._driver, rating)
+            elem = find_by_text(self._driver, rating, snapshot=snapshot)
             if elem:
                 return rating
         return None
@@ -136,23 +244,164 @@ class ConditionsPanel:
         """
         return self.get_suitability_score_text()
 
+    def read_conditions(self, snapshot: HierarchySnapshot | None = None) -> dict:
+        """
+        Read the rating, score and every labelled value in the panel from a
+        single hierarchy dump — no scrolling, no screenshots.
+
+        Sections below the visible part of the column are only in the dump
+        if the session reports invisible elements (the UiAutomator2 setting
+        allowInvisibleElements); otherwise their fields come back None.
+
+        Returns a dict with "rating", "score", "shown_date", "data_source"
+        and one key per CONDITION_LABELS value.
+        """
+        snapshot = snapshot or HierarchySnapshot.capture(self._driver)
+        texts = [node.text for node in snapshot.nodes if node.text]
+        positions: dict[str, int] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(text, i)
+
+        def after(label: str) -> str | None:
+            i = positions.get(label)
+            return texts[i + 1] if i is not None and i + 1 < len(texts) else None
+
+        values: dict = {"rating": None, "score": None}
+        rating_at = next((positions[r] for r in SUITABILITY_RATINGS if r in positions), None)
+        if rating_at is not None:
+            values["rating"] = texts[rating_at]
+            # The score badge is the first bare integer after the rating label
+            score = next((t for t in texts[rating_at + 1:rating_at + 4] if t.isdigit()), None)
+            values["score"] = int(score) if score is not None else None
+
+        # The header's second line is the selected date ("Saturday, October 18, 2026")
+        shown = after("Fishing Conditions")
+        values["shown_date"] = shown if shown and re.search(r"\b\d{4}\b", shown) else None
+        values["data_source"] = next(
+            (t[len("Data: "):] for t in texts if t.startswith("Data: ")), None
+        )
+        for label, field in CONDITION_LABELS.items():
+            raw = after(label)
+            if field in _NUMERIC_FIELDS and raw is not None:
+                match = _NUMBER_RE.search(raw)
+                values[field] = float(match.group()) if match else None
+            else:
+                values[field] = raw
+        return values
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _scroll_until_text_visible(self, text: str, max_swipes: int = 8) -> bool:
+    def _column(self, snapshot: HierarchySnapshot) -> tuple[int, tuple[int, int, int, int]]:
+        """
+        (UiSelector instance, bounds) of the panel's vertical scrolling
+        column: the tallest scrollable container. The date strip above it
+        scrolls sideways and is much shorter.
         """
-        Scroll down one swipe at a time until the given text is on screen,
-        up to max_swipes attempts.
+        candidates = [
+            (i, node.bounds) for i, node in enumerate(snapshot.scrollables()) if node.bounds
+        ]
+        if candidates:
+            return max(candidates, key=lambda c: c[1][3] - c[1][1])
+        # No scrollable reported — assume the column fills the lower part of the screen
+        size = self._driver.get_window_size()
+        strip = snapshot.find_text_contains("Select Forecast Date")
+        top = strip.bounds[3] if strip and strip.bounds else int(size["height"] * 0.35)
+        return 0, (0, top, size["width"], size["height"])
+
+    @staticmethod
+    def _visible_headers(snapshot: HierarchySnapshot, column: tuple[int, int, int, int]) -> dict[str, int]:
+        """Screen tops of the section headers fully inside the column."""
+        found = {}
+        for header in SECTION_HEADERS:
+            node = snapshot.find_text_contains(header)
+            if node and node.bounds and node.bounds[1] >= column[1] and node.bounds[3] <= column[3]:
+                found[header] = node.bounds[1]
+        return found
 
-        Returns True if text found, False if not found after max swipes.
+    def _offset_to(self, header: str, visible: dict[str, int], landing: int) -> int | None:
         """
-        for i in range(max_swipes):
-            if find_by_text(self._driver, text) or find_by_text_contains(self._driver, text):
-                print(f"[panel] Found '{text}' after {i} swipe(s)")
-                return True
-            scroll_down(self._driver, swipes=1)
-            time.sleep(0.4)
-        print(f"[panel] Could not find '{text}' after {max_swipes} swipes")
-        return False
+        Pixels the content must move up for `header` to sit at `landing`,
+        from its position on screen or via the nearest visible header and
+        the learned layout. None if neither is possible.
+        """
+        if header in visible:
+            return visible[header] - landing
+        target = SECTION_HEADERS.index(header)
+        for anchor in sorted(visible, key=lambda h: abs(SECTION_HEADERS.index(h) - target)):
+            distance = self._layout.distance(anchor, header)
+            if distance is not None:
+                return visible[anchor] + distance - landing
+        return None
+
+    def _drag_by(self, delta: int, column: tuple[int, int, int, int]) -> tuple[HierarchySnapshot | None, int]:
+        """
+        Move the content up by `delta` pixels (down if negative) in one
+        gesture. Returns the settled snapshot and the number of strokes.
+        """
+        left, top, right, bottom = column
+        margin = int((bottom - top) * _DRAG_MARGIN)
+        reach = (bottom - top) - 2 * margin - int(self._layout.drag_loss)
+        count = max(1, math.ceil(abs(delta) / reach))
+        chunk = abs(delta) / count
+        travel = int(chunk + self._layout.drag_loss)
+        if delta > 0:
+            strokes = [(bottom - margin, bottom - margin - travel)] * count
+        else:
+            strokes = [(top + margin, top + margin + travel)] * count
+        return drag(self._driver, (left + right) // 2, strokes), count
+
+    def _scroll_to_header(self, header: str) -> bool:
+        """
+        Place a section header just below the top of the scrolling column.
+
+        One drag when the header, or any header the learned layout can
+        relate it to, is on screen; otherwise a single UiScrollable
+        scrollIntoView, after which the layout knows the way next time.
+
+        Returns True if the header is on screen afterwards.
+        """
+        snapshot = HierarchySnapshot.capture(self._driver)
+        instance, column = self._column(snapshot)
+        landing = column[1] + int((column[3] - column[1]) * _LANDING_FRACTION)
+        visible = self._visible_headers(snapshot, column)
+        self._layout.learn(visible)
+        gestures = 0
+
+        delta = self._offset_to(header, visible, landing)
+        if delta is None:
+            gestures += 1
+            if not scroll_into_view(self._driver, header, instance):
+                print(f"[panel] Could not find '{header}'")
+                return False
+            snapshot = HierarchySnapshot.capture(self._driver)
+            visible = self._visible_headers(snapshot, column)
+            self._layout.learn(visible)
+            delta = self._offset_to(header, visible, landing)
+
+        if delta is not None and abs(delta) > _LANDING_TOLERANCE:
+            gestures += 1
+            snapshot, strokes = self._drag_by(delta, column)
+            visible = self._visible_headers(
+                snapshot or HierarchySnapshot.capture(self._driver), column
+            )
+            self._layout.learn(visible)
+            if header in visible:
+                shortfall = (visible[header] - landing) * (1 if delta > 0 else -1)
+                if abs(shortfall) <= _MAX_LOSS_PER_STROKE * strokes:
+                    self._layout.record_drag(strokes, shortfall)
+            else:
+                # The layout was off by more than a screen — let UiAutomator find it
+                gestures += 1
+                scroll_into_view(self._driver, header, instance)
+                snapshot = HierarchySnapshot.capture(self._driver)
+                visible = self._visible_headers(snapshot, column)
+                self._layout.learn(visible)
 
+        self._layout.save()
+        if header not in visible:
+            print(f"[panel] Could not bring '{header}' into view")
+            return False
+        print(f"[panel] '{header}' at y={visible[header]} after {gestures} gesture(s)")
+        return True
@@ -11,21 +11,37 @@ Because Compose wraps it in a View, we interact with it via raw tap
 coordinates rather than accessibility IDs.
 """
 
+import os
 import time
 
 from appium.webdriver import Remote as AppiumDriver
-from appium.webdriver.common.appiumby import AppiumBy
-from selenium.common.exceptions import NoSuchElementException
 from helpers.driver_utils import (
     find_by_text,
     find_by_accessibility_id,
     grant_location_permissions,
     wait_for_text,
 )
+from helpers import logcat
 from helpers.adb_location import set_appium_location
+from helpers.fixture_server import FIXTURE_ENV
+from helpers.hierarchy import HierarchySnapshot
+from helpers.settle import wait_for_ui_idle
+from helpers.stability import wait_for_stable_frames
+from helpers.tile_archive import active_server, wait_for_tiles_idle
+
+# With local API fixtures (see helpers/fixture_server.py) responses arrive
+# in milliseconds, so a stuck load is reported much sooner
+_FIXTURES_ENABLED = bool(os.environ.get(FIXTURE_ENV))
 
 # How long to poll for the loading spinner to disappear after a tap (seconds)
-_POST_TAP_SETTLE_TIMEOUT = 15
+_POST_TAP_SETTLE_TIMEOUT = 5 if _FIXTURES_ENABLED else 15
+
+# How long to wait for the Conditions Panel after a location change (seconds)
+_CONDITIONS_LOAD_TIMEOUT = 5 if _FIXTURES_ENABLED else 15
+
+# How long the first load waits for any readiness marker before deciding
+# the installed APK does not log them (release build, or predates them)
+_MARKER_GRACE = 5.0
 
 
 class MapScreen:
@@ -35,6 +51,10 @@ class MapScreen:
 
     def __init__(self, driver: AppiumDriver) -> None:
         self._driver = driver
+        # Logcat position taken before the last location load (None = poll
+        # the UI instead) and the marker that ended that load, if any
+        self._load_since: int | None = None
+        self._load_event: logcat.ReadinessEvent | None = None
 
     # ------------------------------------------------------------------
     # Launch / startup
@@ -62,7 +82,9 @@ class MapScreen:
           2. Tap the FAB whose contentDescription is "My Location".
              The FAB calls getCurrentLocation() → FusedLocationProviderClient
              → viewModel.updateLocation(lat, lon) → API fetch starts.
-          3. Wait up to 15 s for the loading spinner to clear.
+          3. Wait for the load to finish (15 s, 5 s with fixtures) — on the
+             app's logcat readiness marker when helpers/logcat.py is
+             streaming, otherwise for the loading spinner to clear.
 
         See: https://appium.readthedocs.io/en/stable/en/commands/session/geolocation/set-geolocation/
 
@@ -70,6 +92,10 @@ class MapScreen:
             lat: Target latitude  (e.g. 35.0196).
             lon: Target longitude (e.g. -76.6989).
         """
+        reader = logcat.active_reader()
+        self._load_since = reader.mark() if reader else None
+        self._load_event = None
+
         # Step 1 — inject location via Appium geolocation command
         set_appium_location(self._driver, lat, lon)
 
@@ -87,28 +113,91 @@ class MapScreen:
             self._driver.tap([(tap_x, tap_y)])
             print(f"[map] Tapped FAB fallback position ({tap_x}, {tap_y})")
 
-        # Step 3 — wait for the loading spinner to disappear
-        self._wait_for_loading_to_finish(timeout=_POST_TAP_SETTLE_TIMEOUT)
+        # Step 3 — wait for the load to finish
+        if not self._wait_for_load_marker(lat, lon, timeout=_POST_TAP_SETTLE_TIMEOUT):
+            self._wait_for_loading_to_finish(timeout=_POST_TAP_SETTLE_TIMEOUT)
 
-    def wait_for_conditions_to_load(self, timeout: int = 15) -> bool:
+    def wait_for_conditions_to_load(self, timeout: int | None = None) -> bool:
         """
         Wait until the Conditions Panel header text appears, confirming
         that the API call completed and the UI has updated.
 
-        Polls every 500 ms for up to `timeout` seconds (default 15 s).
-        Returns True if loaded, False on timeout.
+        With logcat readiness markers this is decided by the
+        conditions-loaded / conditions-error marker of the last location
+        load; otherwise polls every 500 ms for up to `timeout` seconds
+        (default 15 s, or 5 s when serving API fixtures). Either way it
+        then waits for the panel content to settle.
+        Returns True if loaded, False on error or timeout.
         """
+        if timeout is None:
+            timeout = _CONDITIONS_LOAD_TIMEOUT
+        reader = logcat.active_reader()
+        if reader is not None and self._load_since is not None:
+            event = self._load_event or reader.wait_for(
+                logcat.LOAD_OUTCOMES, since=self._load_since, timeout=timeout
+            )
+            if event is None or event.name != "conditions-loaded":
+                print(f"[map] ⚠️  Conditions did not load ({event.name if event else 'timed out'})")
+                return False
+            wait_for_ui_idle(self._driver, label="conditions panel")
+            print("[map] Conditions panel loaded ✅")
+            return True
+
         print(f"[map] Waiting up to {timeout}s for 'Fishing Conditions'...")
         deadline = time.time() + timeout
         while time.time() < deadline:
             if find_by_text(self._driver, "Fishing Conditions"):
-                time.sleep(1.0)
+                wait_for_ui_idle(self._driver, label="conditions panel")
                 print("[map] Conditions panel loaded ✅")
                 return True
             time.sleep(0.5)
         print("[map] ⚠️  Timed out waiting for conditions panel")
         return False
 
+    def _wait_for_load_marker(self, lat: float, lon: float, timeout: float) -> bool:
+        """
+        Wait for the logcat marker that ends the location load started by
+        the last FAB tap, keeping it for wait_for_conditions_to_load().
+
+        Returns False if markers are not available, so the caller falls
+        back to watching the spinner. If the very first load logs nothing
+        within _MARKER_GRACE, the APK does not emit markers and the reader
+        is stopped for the rest of the run.
+        """
+        reader = logcat.active_reader()
+        if reader is None or self._load_since is None:
+            return False
+
+        start = time.monotonic()
+        first = reader.wait_for(
+            ("loading",) + logcat.LOAD_OUTCOMES,
+            since=self._load_since,
+            timeout=timeout if reader.markers_seen else min(_MARKER_GRACE, timeout),
+        )
+        if first is None and not reader.markers_seen:
+            print("[map] No readiness markers in logcat (release build or older APK?) — polling the UI")
+            logcat.stop_reader()
+            self._load_since = None
+            return False
+
+        if first is not None and first.name in logcat.LOAD_OUTCOMES:
+            self._load_event = first
+        else:
+            remaining = max(0.0, timeout - (time.monotonic() - start))
+            self._load_event = reader.wait_for(
+                logcat.LOAD_OUTCOMES, since=self._load_since, timeout=remaining
+            )
+
+        event = self._load_event
+        if event is None:
+            print(f"[map] ⚠️  Loading did not finish within {timeout}s")
+        else:
+            coords = event.coords
+            if coords and (abs(coords[0] - lat) > 1e-3 or abs(coords[1] - lon) > 1e-3):
+                print(f"[map] ⚠️  Loaded {coords}, expected ({lat}, {lon})")
+            print(f"[map] {event.name} after {time.monotonic() - start:.2f}s (logcat)")
+        return True
+
     def _wait_for_loading_to_finish(self, timeout: int = 15) -> None:
         """
         Wait up to `timeout` seconds for the CircularProgressIndicator
@@ -117,26 +206,15 @@ class MapScreen:
         Falls back gracefully if no spinner was shown (fast response).
         """
         print(f"[map] Waiting up to {timeout}s for loading to finish...")
-        deadline = time.time() + timeout
-        spinner_seen = False
+        spinner_seen = HierarchySnapshot.capture(self._driver).has_progress_bar()
+        settled = wait_for_ui_idle(self._driver, ceiling=timeout, label="loading")
 
-        while time.time() < deadline:
-            try:
-                self._driver.find_element(
-                    AppiumBy.ANDROID_UIAUTOMATOR,
-                    'new UiSelector().className("android.widget.ProgressBar")',
-                )
-                spinner_seen = True
-                time.sleep(0.5)
-            except NoSuchElementException:
-                if spinner_seen:
-                    print("[map] Loading spinner gone — UI settled ✅")
-                else:
-                    print("[map] No spinner detected — response was immediate")
-                time.sleep(0.5)
-                return
-
-        print(f"[map] ⚠️  Loading did not finish within {timeout}s")
+        if settled is None:
+            print(f"[map] ⚠️  Loading did not finish within {timeout}s")
+        elif spinner_seen:
+            print("[map] Loading spinner gone — UI settled ✅")
+        else:
+            print("[map] No spinner detected — response was immediate")
 
     # ------------------------------------------------------------------
     # Species selection
@@ -150,12 +228,11 @@ class MapScreen:
         elem = find_by_text(self._driver, "Filter by Species")
         if elem:
             elem.click()
-            time.sleep(0.8)
         else:
             print("[map] 'Filter by Species' card not found — trying coordinate tap")
             size = self._driver.get_window_size()
             self._driver.tap([(size["width"] // 2, int(size["height"] * 0.10))])
-            time.sleep(0.8)
+        wait_for_ui_idle(self._driver, label="species dropdown")
 
     def select_species(self, species_name: str) -> bool:
         """
@@ -166,7 +243,7 @@ class MapScreen:
         elem = find_by_text(self._driver, species_name)
         if elem:
             elem.click()
-            time.sleep(1.0)
+            wait_for_ui_idle(self._driver, label="species select")
             print(f"[map] Selected species: {species_name}")
             return True
         print(f"[map] Species '{species_name}' not found in dropdown")
@@ -179,6 +256,28 @@ class MapScreen:
     def is_conditions_panel_visible(self) -> bool:
         return find_by_text(self._driver, "Fishing Conditions") is not None
 
-    def wait_for_map_tiles(self, seconds: float = 3.0) -> None:
-        """Wait for OSMDroid tiles to finish rendering."""
-        time.sleep(seconds)
+    def wait_for_tile_traffic(self, seconds: float = 3.0) -> bool:
+        """
+        With the local tile pipeline (helpers/tile_archive.py), wait for
+        tile requests to the local tile server to stop. Returns True at once
+        without it.
+        """
+        server = active_server()
+        if server is not None and not wait_for_tiles_idle(server, ceiling=seconds):
+            print("[map] ⚠️  Tile server still busy — map may be incomplete")
+            return False
+        return True
+
+    def wait_for_map_tiles(self, seconds: float = 3.0) -> bool:
+        """
+        Wait for OSMDroid tiles to finish rendering.
+
+        Waits for tile traffic to stop, then — since the map is a single
+        AndroidView whose tile loads and fades never show up in the
+        hierarchy — for the map's pixels to hold still. `seconds` is the
+        ceiling, not a fixed delay.
+
+        Returns True if the map settled within the ceiling.
+        """
+        self.wait_for_tile_traffic(seconds)
+        return wait_for_stable_frames(self._driver, ceiling=seconds, label="map tiles") is not None
@@ -0,0 +1,196 @@
+"""
+Warm Appium session broker.
+
+Keeps one Appium session per device profile alive across pytest runs so
+iterating on a single shot (`run_screenshots.sh -k tide`) skips the
+UiAutomator2 server launch and app launch — reattaching takes a single
+local HTTP round trip.
+
+  GET    /session/<output_folder>  → {"session_id", "capabilities", "appium_host", "created"}
+  DELETE /session/<output_folder>  → quit that profile's session
+  GET    /status                   → sessions currently held
+
+On every GET the held session is health-checked with one cheap command and
+recreated only if it is dead. A keep-alive thread pings each session well
+inside Appium's newCommandTimeout so idle sessions are not reaped between
+runs.
+
+Usage (from the screenshots/ directory, with Appium already running):
+    python session_broker.py &
+    TIDERUNNER_SESSION_BROKER=1 bash run_screenshots.sh -k tide
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from config.devices import APPIUM_HOST, get_device_profile
+from helpers.session import DEFAULT_BROKER_URL, create_session
+
+DEFAULT_PORT = int(DEFAULT_BROKER_URL.rsplit(":", 1)[1])
+
+# Half of the newCommandTimeout in helpers/session.build_options
+_KEEP_ALIVE_INTERVAL = 60
+
+
+class SessionPool:
+    """
+    One warm session per profile, created on demand and replaced when dead.
+    """
+
+    def __init__(self, appium_host: str = APPIUM_HOST) -> None:
+        self.appium_host = appium_host
+        self._drivers: dict[str, object] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @staticmethod
+    def _alive(driver) -> bool:
+        try:
+            driver.current_package
+            return True
+        except Exception as e:
+            print(f"[broker] Session {driver.session_id[:8]}… is dead: {str(e).splitlines()[0]}")
+            return False
+
+    def lease(self, name: str) -> tuple[object, bool]:
+        """Return (driver, created) for a profile, creating a session only if needed."""
+        with self._lock_for(name):
+            driver = self._drivers.get(name)
+            if driver is not None and self._alive(driver):
+                return driver, False
+            if driver is not None:
+                self._quit(driver)
+            start = time.monotonic()
+            driver = create_session(get_device_profile(name), self.appium_host)
+            print(f"[broker] Created session {driver.session_id[:8]}… for '{name}' "
+                  f"in {time.monotonic() - start:.1f}s")
+            self._drivers[name] = driver
+            return driver, True
+
+    def release(self, name: str) -> bool:
+        with self._lock_for(name):
+            driver = self._drivers.pop(name, None)
+        if driver is None:
+            return False
+        self._quit(driver)
+        return True
+
+    @staticmethod
+    def _quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def keep_alive(self) -> None:
+        """Ping every held session; drop the ones that no longer answer."""
+        for name in list(self._drivers):
+            with self._lock_for(name):
+                driver = self._drivers.get(name)
+                if driver is not None and not self._alive(driver):
+                    self._drivers.pop(name, None)
+
+    def status(self) -> dict[str, str]:
+        return {name: d.session_id for name, d in self._drivers.items()}
+
+    def close(self) -> None:
+        for name in list(self._drivers):
+            self.release(name)
+
+
+class _BrokerHandler(BaseHTTPRequestHandler):
+    pool: SessionPool = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _profile_name(self) -> str | None:
+        parts = self.path.strip("/").split("/")
+        return parts[1] if len(parts) == 2 and parts[0] == "session" else None
+
+    def do_GET(self) -> None:
+        if self.path == "/status":
+            self._reply(200, {"sessions": self.pool.status()})
+            return
+        name = self._profile_name()
+        if name is None:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            driver, created = self.pool.lease(name)
+        except KeyError as e:
+            self._reply(404, {"error": str(e)})
+            return
+        except Exception as e:
+            self._reply(503, {"error": f"Could not create session: {e}"})
+            return
+        self._reply(200, {
+            "session_id": driver.session_id,
+            "capabilities": driver.caps,
+            "appium_host": self.pool.appium_host,
+            "created": created,
+        })
+
+    def do_DELETE(self) -> None:
+        name = self._profile_name()
+        released = name is not None and self.pool.release(name)
+        self._reply(200 if released else 404, {"released": released})
+
+
+def _keep_alive_loop(pool: SessionPool, stop: threading.Event) -> None:
+    while not stop.wait(_KEEP_ALIVE_INTERVAL):
+        pool.keep_alive()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--appium-host", default=APPIUM_HOST)
+    parser.add_argument(
+        "--warm", nargs="*", metavar="FOLDER", default=[],
+        help="create sessions for these profiles at startup",
+    )
+    args = parser.parse_args()
+
+    pool = SessionPool(args.appium_host)
+    for name in args.warm:
+        pool.lease(name)
+
+    stop = threading.Event()
+    threading.Thread(target=_keep_alive_loop, args=(pool, stop), daemon=True).start()
+    handler = type("BrokerHandler", (_BrokerHandler,), {"pool": pool})
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"[broker] Brokering sessions on {args.appium_host} at port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        print("[broker] Quitting held sessions")
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())